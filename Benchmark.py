@@ -0,0 +1,26 @@
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Benchmark suite: short-horizon runs of LiftBoom, OptimisedLiftBoom and PatuCrane,
+# rigid and flexible, for several nModes and step counts, see Models/Benchmark.py.
+# Results are appended to benchmark/history.jsonl and gated against the baseline
+# results in benchmark/baseline (stored on the first run of a case).
+#   python Benchmark.py                     run the matrix, exit code 1 if a gate fails
+#   python Benchmark.py --update-baseline   store the current results as new baseline
+#   python Benchmark.py --quick             smallest step count and nModes only
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from Models.Container import *
+
+updateBaseline  = '--update-baseline' in sys.argv
+quick           = '--quick' in sys.argv
+
+Variants        = benchmarkVariants     # 'LiftBoom', 'OptimisedLiftBoom', 'PatuCrane'
+NModes          = benchmarkNModes[:1] if quick else benchmarkNModes
+Steps           = benchmarkSteps[:1] if quick else benchmarkSteps
+Repeats         = benchmarkRepeats
+
+
+if __name__ == '__main__': #cases run in separate processes
+    cases   = BenchmarkCases(Variants, NModes, Steps)
+    report  = RunBenchmarks(cases, repeats=Repeats, updateBaseline=updateBaseline, label='quick' if quick else '')
+    PrintBenchmarkReport(report)
+    sys.exit(0 if report['passed'] else 1)
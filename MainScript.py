@@ -22,6 +22,7 @@ Flexible        = True
 Plotting        = True
 loadFromSavedNPY= True
 solutionViewer  = True
+resultCache     = not solutionViewer    #reuse stored results of identical runs; runs with solutionViewer are simulated
 
 
 if OptimisedLB:
@@ -32,7 +33,7 @@ else:
     
 
 model       = NNHydraulics(nStepsTotal=ns, endTime=T,  mL    = LiftLoad,Flexible=Flexible, 
-                           nModes=4, loadFromSavedNPY=loadFromSavedNPY, system=Patu, verboseMode=1)
+                           nModes=4, loadFromSavedNPY=loadFromSavedNPY, system=Patu, verboseMode=1, resultCache=resultCache)
 
 inputVec    = model.CreateInputVector( ns,  angleInit1,angleInit2,system=Patu)
 
@@ -41,21 +42,17 @@ if OptimisedLB:
     data1 = model.ComputeModel(inputVec,system=Patu,  solutionViewer = solutionViewer, OptimisedLB = False) #solutionViewer: for visualization
     data2 = model.ComputeModel(inputVec,system=Patu,  solutionViewer = solutionViewer, OptimisedLB = True) #solutionViewer: for visualization
     
-    data_array1 = np.array(data1, dtype=object)
-    data_array2 = np.array(data2, dtype=object)
-
-    np.save(dataFile1, data_array1)
-    np.save(dataFile2, data_array2)
+    data1.Save(dataFile1)       #dataFile1.result, read with LoadSimulationResult(dataFile1)
+    data2.Save(dataFile2)
     
     if Plotting:
-        model.PlottingLB(data_array1,data_array2)   
+        model.PlottingLB(data1,data2)   
          
 else:
     data1 = model.ComputeModel(inputVec,system=Patu,  solutionViewer = True, OptimisedLB = False) #solutionViewer: for visualization
-    data_array1 = np.array(data1, dtype=object)
-    np.save(dataFile1, data_array1)
+    data1.Save(dataFile1)
     
     if Plotting:
-        model.Plotting(data_array1)
+        model.Plotting(data1)
 
 
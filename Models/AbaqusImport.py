@@ -0,0 +1,155 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #ABAQUS IMPORT
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Fast replacement of FEMinterface.ImportFromAbaqusInputFile and
+# Read{Mass,Stiffness}MatrixFromAbaqus for the Abaqus exports of the booms.
+# Files are read in chunks split at line ends; the *Node/*Element blocks and the
+# COO matrix triplets are parsed with NumPy text parsing, and the mesh surface
+# is found by counting sorted element faces instead of comparing neighbour
+# elements in Python. Mass and stiffness matrix are parsed in parallel processes.
+# The resulting FEMinterface data is the same as with the exudyn functions.
+
+from Models.Container import *
+import re
+import scipy.sparse
+
+
+abaqusChunkSize         = 1<<24                 # characters per chunk of text
+abaqusKeywordPattern    = re.compile(r'^\*.*$', re.MULTILINE)
+
+abaqusElementTypes      = {'C3D20': 'Hex20', 'C3D20R': 'Hex20', 'C3D8': 'Hex8', 'C3D8R': 'Hex8',
+                           'C3D4': 'Tet4', 'C3D10': 'Tet10', 'C3D10H': 'Tet10', 'C3D10MH': 'Tet10', 'C3D10HS': 'Tet10'}
+elementNodeCount        = {'Hex20': 20, 'Hex8': 8, 'Tet4': 4, 'Tet10': 10}
+
+# element faces as in FEMinterface.VolumeToSurfaceElements (corner nodes only)
+elementFaceIndices      = {'Hex8':  [[0,1,2,3],[7,6,5,4],[0,4,5,1],[1,5,6,2],[2,6,7,3],[3,7,4,0]],
+                           'Hex20': [[0,1,2,3],[7,6,5,4],[0,4,5,1],[1,5,6,2],[2,6,7,3],[3,7,4,0]],
+                           'Tet4':  [[0,1,2],[0,3,1],[1,3,2],[2,3,0]],
+                           'Tet10': [[0,1,2],[0,3,1],[1,3,2],[2,3,0]]}
+
+
+#text of fileName in chunks of about chunkSize characters, each ending with a complete line
+def ReadTextChunks(fileName, chunkSize=abaqusChunkSize):
+    rest = ''
+    with open(fileName, 'r') as f:
+        for block in iter(lambda: f.read(chunkSize), ''):
+            block   = rest + block
+            cut     = block.rfind('\n') + 1
+            rest    = block[cut:]
+            if cut:
+                yield block[:cut]
+    if rest:
+        yield rest + '\n'
+
+
+#all numbers in text separated by commas and/or whitespace
+def ParseNumbers(text, dtype=float):
+    return np.fromstring(text.replace(',', ' '), dtype=dtype, sep=' ')
+
+
+#keyword lines of .inp file and parsed data of the *Node and *Element blocks:
+#returns list of [keywordLine, values] with values=None for other blocks
+def ReadAbaqusInputBlocks(fileName):
+    blocks  = [['', None]]
+    data    = [[]]
+
+    def AddData(text):
+        keyword = blocks[-1][0]
+        if keyword.startswith('*Node') or keyword.startswith('*Element'):
+            data[-1].append(ParseNumbers(text, dtype=float if keyword.startswith('*Node') else int))
+
+    for chunk in ReadTextChunks(fileName):
+        pos = 0
+        for match in abaqusKeywordPattern.finditer(chunk):
+            AddData(chunk[pos:match.start()])
+            blocks.append([match.group(0).strip(), None])
+            data.append([])
+            pos = match.end()
+        AddData(chunk[pos:])
+
+    for block, values in zip(blocks, data):
+        if len(values):
+            block[1] = np.concatenate(values)
+    return blocks[1:]
+
+
+#boundary faces of one element list: faces which occur only once in the mesh, in element/face order;
+#quads are split into two consecutive triangles as in VolumeToSurfaceElements
+def SurfaceTrigsFromElements(elements, elementType):
+    faceIndices = np.array(elementFaceIndices[elementType])
+    faces       = elements[:, faceIndices].reshape(-1, faceIndices.shape[1])
+    [unique, inverse, counts] = np.unique(np.sort(faces, axis=1), axis=0, return_inverse=True, return_counts=True)
+    surface     = faces[counts[inverse.reshape(-1)] == 1]
+
+    if surface.shape[1] == 4:
+        return np.stack((surface[:, [0,1,2]], surface[:, [0,2,3]]), axis=1).reshape(-1, 3)
+    return surface
+
+
+#import nodes and first element block after *<typeName> into fem, as fem.ImportFromAbaqusInputFile
+@Profiled('femLoad')
+def ImportAbaqusInputFile(fem, fileName, typeName='Part', verbose=False, createSurfaceTrigs=True):
+    blocks  = ReadAbaqusInputBlocks(fileName)
+    keys    = [keyword for keyword, values in blocks]
+    iPart   = next((i for i, keyword in enumerate(keys) if keyword.startswith('*'+typeName)), None)
+    if iPart is None:
+        raise ValueError("ImportAbaqusInputFile: did not find keyword '*"+typeName+"'")
+    if iPart+1 >= len(blocks) or not keys[iPart+1].startswith('*Node'):
+        raise ValueError("ImportAbaqusInputFile: expected *Node after *"+typeName)
+    iElement = next((i for i in range(iPart+2, len(blocks)) if keys[i].startswith('*Element')), None)
+    if iElement is None:
+        raise ValueError("ImportAbaqusInputFile: did not find keyword *Element ")
+
+    abaqusType  = keys[iElement].split(',')[1].split('=')[1].strip()
+    if abaqusType not in abaqusElementTypes:
+        raise ValueError("ImportAbaqusInputFile: element type '"+abaqusType+"' can not yet be imported")
+    elementType = abaqusElementTypes[abaqusType]
+    nNodes      = elementNodeCount[elementType]
+
+    nodeData    = blocks[iPart+1][1]
+    elementData = blocks[iElement][1]
+    if nodeData is None or len(nodeData) % 4 != 0:
+        raise ValueError("ImportAbaqusInputFile: Expected node number and 3 coordinates per node")
+    if elementData is None or len(elementData) % (nNodes+1) != 0:
+        raise ValueError("ImportAbaqusInputFile: Expected element and "+str(nNodes)+" node numbers per element")
+
+    nodes       = nodeData.reshape(-1, 4)[:, 1:].copy()
+    elements    = elementData.reshape(-1, nNodes+1)[:, 1:] - 1
+    if verbose:
+        print('ImportAbaqusInputFile: imported', len(nodes), 'nodes and', len(elements), elementType, 'elements')
+
+    fem.elements        += [{'Name': 'elements', elementType: elements}]
+    fem.nodes['Position'] = nodes
+
+    if createSurfaceTrigs:
+        trigs   = np.vstack([SurfaceTrigsFromElements(elementDict[key], key) for elementDict in fem.elements
+                             for key in elementFaceIndices if key in elementDict])
+        surface = [s for s in fem.surface if s['Name'] == 'meshSurface']
+        if surface:
+            surface[0]['Trigs'] = trigs
+        else:
+            fem.surface += [{'Name': 'meshSurface', 'Trigs': trigs}]
+
+    return nodes
+
+
+#sparse matrix from Abaqus COORDINATE export (1-based row, column, value per line) as scipy CSR,
+#same as FEMinterface.ReadMassMatrixFromAbaqus
+def ReadAbaqusMatrix(fileName):
+    triplets    = np.concatenate([ParseNumbers(chunk) for chunk in ReadTextChunks(fileName)]).reshape(-1, 3)
+    return scipy.sparse.csr_matrix((triplets[:,2], (triplets[:,0].astype(int)-1, triplets[:,1].astype(int)-1)))
+
+
+#read mass and stiffness matrix into fem; parsed in two processes if more than one CPU is available
+@Profiled('femLoad')
+def ReadAbaqusMatrices(fem, massFileName, stiffnessFileName, parallel=None):
+    if parallel is None:
+        parallel = (os.cpu_count() or 1) > 1
+
+    if parallel:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            [fem.massMatrix, fem.stiffnessMatrix] = executor.map(ReadAbaqusMatrix, [massFileName, stiffnessFileName])
+    else:
+        fem.massMatrix      = ReadAbaqusMatrix(massFileName)
+        fem.stiffnessMatrix = ReadAbaqusMatrix(stiffnessFileName)
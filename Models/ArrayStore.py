@@ -0,0 +1,109 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #ARRAY STORE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Versioned on-disk format for FEMinterface and reduced-order data: a directory
+# with one .npy file per array and a JSON manifest describing the structure
+# (dicts, lists, scipy CSR matrices, exudyn OutputVariableType, scalars).
+# Arrays are opened with np.load(mmap_mode='r'), so parallel simulations on one
+# node share the physical pages of node coordinates, mode shapes and stress modes.
+
+from Models.Container import *
+import json, shutil
+import scipy.sparse
+
+
+arrayStoreVersion       = 1
+arrayStoreManifest      = 'manifest.json'
+arrayStoreExtension     = '.arrays'
+
+
+def IsArrayStore(path):
+    return os.path.isfile(os.path.join(path, arrayStoreManifest))
+
+
+def SaveArrayStore(path, data):
+    tmpPath     = path + '.%d.tmp' % os.getpid()
+    shutil.rmtree(tmpPath, ignore_errors=True)
+    os.makedirs(tmpPath)
+    fileNames   = set()
+
+    def WriteArray(name, value):
+        fileName = name.replace(os.sep, '_') + '.npy'
+        i = 1
+        while fileName in fileNames:
+            fileName = name + '_%d.npy' % i
+            i += 1
+        fileNames.add(fileName)
+        np.save(os.path.join(tmpPath, fileName), np.ascontiguousarray(value), allow_pickle=False)
+        return fileName
+
+    def Encode(name, value):
+        if isinstance(value, np.ndarray):
+            return {'array': WriteArray(name, value)}
+        if scipy.sparse.issparse(value):
+            value = value.tocsr()
+            return {'csr': {'data':     WriteArray(name + '.data', value.data),
+                            'indices':  WriteArray(name + '.indices', value.indices),
+                            'indptr':   WriteArray(name + '.indptr', value.indptr)},
+                    'shape': list(value.shape)}
+        if isinstance(value, exu.OutputVariableType):
+            return {'enum': 'OutputVariableType', 'name': value.name}
+        if isinstance(value, dict):
+            return {'dict': {str(k): Encode(name + '.' + str(k), v) for k, v in value.items()}}
+        if isinstance(value, (list, tuple)):
+            return {'list': [Encode(name + '.%d' % i, v) for i, v in enumerate(value)]}
+        if isinstance(value, np.generic):
+            value = value.item()
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return {'value': value}
+        raise ValueError('SaveArrayStore: cannot store ' + name + ' of type ' + str(type(value)))
+
+    manifest = {'format': 'ArrayStore', 'version': arrayStoreVersion, 'root': Encode('root', data)}
+    with open(os.path.join(tmpPath, arrayStoreManifest), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmpPath, path)
+
+
+def LoadArrayStore(path, mmapMode='r'):
+    with open(os.path.join(path, arrayStoreManifest), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != 'ArrayStore' or manifest.get('version') != arrayStoreVersion:
+        raise ValueError('LoadArrayStore: unsupported format/version in ' + path)
+
+    def ReadArray(fileName):
+        return np.load(os.path.join(path, fileName), mmap_mode=mmapMode, allow_pickle=False)
+
+    def Decode(node):
+        if 'array' in node:
+            return ReadArray(node['array'])
+        if 'csr' in node:
+            csr = node['csr']
+            return scipy.sparse.csr_matrix((ReadArray(csr['data']), ReadArray(csr['indices']), ReadArray(csr['indptr'])),
+                                           shape=tuple(node['shape']), copy=False)
+        if 'enum' in node:
+            return getattr(exu.OutputVariableType, node['name'])
+        if 'dict' in node:
+            return {k: Decode(v) for k, v in node['dict'].items()}
+        if 'list' in node:
+            return [Decode(v) for v in node['list']]
+        return node['value']
+
+    return Decode(manifest['root'])
+
+
+#save FEMinterface (mesh, matrices, modes) as array store filePath+'.arrays'
+@Profiled('femLoad')
+def SaveFEM(fem, filePath):
+    SaveArrayStore(filePath + arrayStoreExtension, fem.GetDictionary())
+
+
+#load FEMinterface memory-mapped from filePath+'.arrays'; a legacy filePath+'.pkl' is converted once
+@Profiled('femLoad')
+def LoadFEM(fem, filePath, mmapMode='r'):
+    storePath = filePath + arrayStoreExtension
+    if not IsArrayStore(storePath) and os.path.isfile(filePath + '.pkl'):
+        fem.LoadFromFile(filePath, mode='PKL')
+        SaveFEM(fem, filePath)
+    fem.SetWithDictionary(LoadArrayStore(storePath, mmapMode), warn=False)
@@ -0,0 +1,191 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #BENCHMARK
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Reproducible matrix of short-horizon runs (LiftBoom, OptimisedLiftBoom,
+# PatuCrane; rigid and flexible with several nModes; several step counts) for
+# performance regressions. Every case runs in a fresh process with empty on-disk
+# caches (graphics, reduced models, spectra, equilibria, results) in a temporary
+# directory, so peak memory and the first run (incl. the complete model build)
+# do not depend on earlier runs; wall time of the first and of repeated runs,
+# steps per second of the dynamic solve, Newton iterations and peak RSS are
+# appended to a JSON-lines history. Output channels are compared with stored
+# baseline results (tolerance gates), steps per second of the dynamic solve
+# (best of the repeated runs) with the baseline if it was measured on the same
+# machine; cases are repeated until their solves took benchmarkMinSolveTime.
+
+from Models.Container import *
+import json, platform, datetime, subprocess, multiprocessing, tempfile
+
+
+benchmarkDir            = 'benchmark'
+benchmarkHistoryFile    = os.path.join(benchmarkDir, 'history.jsonl')
+benchmarkBaselineDir    = os.path.join(benchmarkDir, 'baseline')
+
+benchmarkVariants       = ['LiftBoom', 'OptimisedLiftBoom', 'PatuCrane']
+benchmarkNModes         = [4, 8]        # flexible cases
+benchmarkSteps          = [400, 800]
+benchmarkEndTime        = 4             # s; valves open at 2 s, see Control.py
+benchmarkRepeats        = 5             # min. runs per case; the first includes the model build
+benchmarkMinSolveTime   = 2.            # s; more runs until the dynamic solves of the repeated runs took this long
+benchmarkIsolatedCaches = True          # False: cases use the shared on-disk caches as normal runs do
+benchmarkTolerance      = {'rtol': 1e-6, 'atol': 1e-12}    # channel gate: max|x-x0| <= atol + rtol*max|x0|
+benchmarkChannelTolerances = {}         # channel name -> {'rtol', 'atol'}, overrides benchmarkTolerance
+benchmarkMaxSlowdown    = 1.5           # speed gate: stepsPerSecond >= baseline stepsPerSecond/benchmarkMaxSlowdown
+
+
+def BenchmarkCases(variants=benchmarkVariants, nModesList=benchmarkNModes, stepsList=benchmarkSteps,
+                   endTime=benchmarkEndTime, mL=200):
+    cases = []
+    for variant in variants:
+        for [flexible, nModes] in [[False, nModesList[0]]] + [[True, nModes] for nModes in nModesList]:
+            for nSteps in stepsList:
+                cases += [{'name':      '%s-%s-%dsteps' % (variant, 'flexible%d' % nModes if flexible else 'rigid', nSteps),
+                           'variant':   variant, 'Flexible': flexible, 'nModes': nModes, 'nStepsTotal': nSteps,
+                           'endTime':   endTime, 'mL': mL}]
+    return cases
+
+
+def BenchmarkEnvironment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'exudyn': exu.__version__, 'numpy': np.__version__, 'python': platform.python_version(),
+            'platform': platform.platform(), 'host': platform.node(), 'cpus': os.cpu_count(), 'commit': commit or None}
+
+
+#point the on-disk caches of this process (a benchmark worker) to empty directories below directory
+def IsolateCaches(directory):
+    import Models.Graphics, Models.Cache, Models.Eigenmodes, Models.Equilibrium, Models.ResultCache, Models.Checkpoint
+    Models.Graphics.graphicsCacheDir        = os.path.join(directory, 'GraphicsCache')
+    Models.Equilibrium.equilibriumCacheDir  = os.path.join(directory, 'EquilibriumCache')
+    Models.Cache.reducedModelCache          = FileCache(os.path.join(directory, 'ReducedModelCache'),
+                                                        reducedModelCacheMaxBytes)
+    Models.Eigenmodes.spectrumCache         = FileCache(os.path.join(directory, 'SpectrumCache'), spectrumCacheMaxBytes)
+    Models.ResultCache.resultCache          = FileCache(os.path.join(directory, 'ResultCache'), resultCacheMaxBytes)
+    Models.Checkpoint.checkpointDir         = os.path.join(directory, 'Checkpoints')
+
+
+#run one case with one persistent model, repeats times and further until the dynamic solves of the runs after the
+#first took minSolveTime; returns [record, SimulationResult of the last run]
+def RunBenchmarkCase(case, repeats=benchmarkRepeats, minSolveTime=benchmarkMinSolveTime):
+    system      = case['variant'] == 'PatuCrane'
+    model       = NNHydraulics(nStepsTotal=case['nStepsTotal'], endTime=case['endTime'], Flexible=case['Flexible'],
+                               nModes=case['nModes'], mL=case['mL'], loadFromSavedNPY=True, system=system,
+                               headless=True, persistentModel=True, profiling=True)
+    inputVec    = model.CreateInputVector(case['nStepsTotal'], np.deg2rad(14.6), np.deg2rad(-58.8), system=system)
+
+    [wallTimes, solveTimes, profiles] = [[], [], []]
+    while len(wallTimes) < repeats or sum(solveTimes[1:]) < minSolveTime:
+        start_time  = time.perf_counter()
+        result      = model.ComputeModel(np.array(inputVec), system=system,
+                                         OptimisedLB=case['variant'] == 'OptimisedLiftBoom')
+        wallTimes  += [time.perf_counter() - start_time]
+        solveTimes += [result.metadata['profile']['phases']['dynamicSolve']['time']]
+        profiles   += [result.metadata['profile']]
+
+    dynamic = profiles[-1]['solvers'].get('dynamic', {})
+    record  = {'name':              case['name'], 'case': case, 'repeats': len(wallTimes),
+               'wallTimeFirst':     wallTimes[0],
+               'wallTime':          min(wallTimes[1:] or wallTimes),
+               'stepsPerSecond':    case['nStepsTotal']/min(solveTimes[1:] or solveTimes),
+               'newtonSteps':       dynamic.get('newtonStepsCount'),
+               'jacobians':         dynamic.get('newtonJacobiCount'),
+               'peakRSSBytes':      profiles[-1]['peakRSSBytes'],
+               'phasesFirst':       {name: phase['time'] for name, phase in profiles[0]['phases'].items()}}
+    return [record, result]
+
+
+#run a case in a benchmark process, with empty on-disk caches in a temporary directory if isolatedCaches
+def BenchmarkWorker(case, repeats, isolatedCaches=benchmarkIsolatedCaches):
+    try:
+        if not isolatedCaches:
+            return RunBenchmarkCase(case, repeats)
+        with tempfile.TemporaryDirectory(prefix='benchmarkCaches') as directory:
+            IsolateCaches(directory)
+            return RunBenchmarkCase(case, repeats)
+    except Exception as e:
+        return [{'name': case['name'], 'case': case, 'error': repr(e)}, None]
+
+
+#max. deviation and gate limit per output channel; failed: channels outside the tolerance
+def CompareWithBaseline(result, baseline):
+    channels = {}
+    for name in baseline.channelNames:
+        tolerance   = {**benchmarkTolerance, **benchmarkChannelTolerances.get(name, {})}
+        reference   = np.asarray(baseline[name])
+        value       = np.asarray(result[name]) if name in result.channels else np.array([])
+        if value.shape != reference.shape:
+            channels[name] = {'error': None, 'limit': None, 'passed': False}
+            continue
+        error       = float(np.max(np.abs(value - reference), initial=0))
+        limit       = tolerance['atol'] + tolerance['rtol']*float(np.max(np.abs(reference), initial=0))
+        channels[name] = {'error': error, 'limit': limit, 'passed': bool(error <= limit)}
+    return {'channels': channels, 'failed': [name for name, c in channels.items() if not c['passed']]}
+
+
+def BaselinePath(name, baselineDir=benchmarkBaselineDir):
+    return os.path.join(baselineDir, name)
+
+
+#run cases (default: full matrix) one after the other, each in a fresh process; gates against the baseline
+#results in baselineDir, missing baselines (or all, with updateBaseline) are stored; appends to historyFile
+def RunBenchmarks(cases=None, repeats=benchmarkRepeats, updateBaseline=False, label='',
+                  historyFile=benchmarkHistoryFile, baselineDir=benchmarkBaselineDir, maxSlowdown=benchmarkMaxSlowdown):
+    if cases is None:
+        cases = BenchmarkCases()
+    environment = BenchmarkEnvironment()
+    records     = []
+
+    for case in cases:
+        with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+            [record, result] = pool.apply(BenchmarkWorker, (case, repeats))
+        records += [record]
+        if result is None:
+            record['passed'] = False
+            continue
+
+        path = BaselinePath(case['name'], baselineDir)
+        if updateBaseline or not IsArrayStore(path + resultExtension):
+            result.metadata['benchmark'] = {**record, 'environment': environment}
+            result.Save(path)
+            record['baseline'] = 'stored'
+            record['passed']   = True
+            continue
+
+        baseline            = LoadSimulationResult(path)
+        record['baseline']  = CompareWithBaseline(result, baseline)
+        record['passed']    = not record['baseline']['failed']
+        reference           = baseline.metadata.get('benchmark', {})
+        if 'stepsPerSecond' in reference:
+            record['slowdown'] = reference['stepsPerSecond']/record['stepsPerSecond']
+            if reference.get('environment', {}).get('host') == environment['host'] and record['slowdown'] > maxSlowdown:
+                record['passed'] = False
+
+    report = {'date': datetime.datetime.now().isoformat(timespec='seconds'), 'label': label,
+              'environment': environment, 'cases': records, 'passed': all(r['passed'] for r in records)}
+    os.makedirs(os.path.dirname(historyFile) or '.', exist_ok=True)
+    with open(historyFile, 'a') as f:
+        f.write(json.dumps(report) + '\n')
+    return report
+
+
+def ReadBenchmarkHistory(historyFile=benchmarkHistoryFile):
+    with open(historyFile, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def PrintBenchmarkReport(report):
+    print('%-40s %9s %9s %10s %8s %9s  %s' % ('case', 'first, s', 'wall, s', 'steps/s', 'Newton', 'RSS, MB', 'gate'))
+    for r in report['cases']:
+        if 'error' in r:
+            print('%-40s  failed: %s' % (r['name'], r['error']))
+            continue
+        baseline = r['baseline']
+        gate     = baseline if isinstance(baseline, str) else ('passed' if not baseline['failed'] else
+                                                              'channels ' + ', '.join(baseline['failed']))
+        if 'slowdown' in r:
+            gate += ', slowdown x%.2f' % r['slowdown']
+        print('%-40s %9.3f %9.3f %10.0f %8d %9.1f  %s' % (r['name'], r['wallTimeFirst'], r['wallTime'], r['stepsPerSecond'],
+                                                          r['newtonSteps'] or 0, (r['peakRSSBytes'] or 0)/1024**2, gate))
+    print('benchmark', 'passed' if report['passed'] else 'FAILED')
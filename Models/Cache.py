@@ -0,0 +1,366 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #CACHE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Content-addressed cache for Hurty-Craig-Bampton reduced models. Entries are
+# keyed by a hash of everything the reduced basis depends on (FE mesh, mass and
+# stiffness matrices, nModes, boundary node sets, static mode selection,
+# material and post-processing output variable), so a changed .inp/.mtx file
+# or boundary list invalidates the entry automatically. The cache directory is
+# bounded in size and evicts least recently used entries.
+
+from Models.Container import *
+import hashlib, json, shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None        # Windows: msvcrt.locking
+    import msvcrt
+
+
+reducedModelCacheDir        = 'AbaqusMesh/ReducedModelCache'
+reducedModelCacheMaxBytes   = 4*1024**3
+reducedModelCacheVersion    = 2
+
+
+def HashUpdate(h, value):
+    if value is None:
+        h.update(b'None')
+    elif isinstance(value, np.ndarray):
+        h.update(str(value.dtype).encode() + str(value.shape).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif hasattr(value, 'tocsr'):                                   # scipy sparse matrix
+        value = value.tocsr()
+        h.update(str(value.shape).encode())
+        for v in [value.data, value.indices, value.indptr]:
+            HashUpdate(h, v)
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            h.update(str(key).encode())
+            HashUpdate(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(b'[%d]' % len(value))
+        for v in value:
+            HashUpdate(h, v)
+    else:
+        h.update(repr(value).encode())
+
+
+def HashValues(*values):
+    h = hashlib.sha1()
+    for v in values:
+        HashUpdate(h, v)
+    return h.hexdigest()
+
+
+def HashFiles(fileNames, blockSize=1<<20):
+    h = hashlib.sha1()
+    for fileName in fileNames:
+        with open(fileName, 'rb') as f:
+            for block in iter(lambda: f.read(blockSize), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+modelSourceMeshDir          = 'AbaqusMesh'
+modelSourceKey              = [None, None]  # [file signature, key] of the last call, see ModelSourceKey
+
+
+#name, size and modification time of the files in directory (extension: only those ending with it)
+def FileSignature(directory, extension=''):
+    if not os.path.isdir(directory):
+        return []
+    fileNames = sorted(f for f in os.listdir(directory) if f.endswith(extension))
+    stats     = [[f, os.stat(os.path.join(directory, f))] for f in fileNames]
+    return [[f, stat.st_size, stat.st_mtime_ns] for [f, stat] in stats if os.path.isfile(os.path.join(directory, f))]
+
+
+#hash of the model code and parameters (Models/*.py, incl. Container.py) and of name, size and modification time
+#of the mesh files; part of the keys of results and equilibria computed with the model. The file signature is
+#checked on every call, so edits in a running session give new keys; the code is only rehashed if it changed
+def ModelSourceKey():
+    modelsDir   = os.path.dirname(os.path.abspath(__file__))
+    sources     = FileSignature(modelsDir, '.py')
+    meshFiles   = [[f, size, mtime//10**9] for [f, size, mtime] in FileSignature(modelSourceMeshDir)]
+    signature   = [sources, meshFiles]
+    if modelSourceKey[0] != signature:
+        key = HashValues(HashFiles([os.path.join(modelsDir, f) for [f, size, mtime] in sources]), meshFiles)
+        modelSourceKey[:] = [signature, key]
+    return modelSourceKey[1]
+
+
+def HashFEMesh(fem):
+    return HashValues(fem.nodes, fem.elements, fem.massMatrix, fem.stiffnessMatrix)
+
+
+#exclusive lock of a lock file across processes, used as context manager
+class FileLock():
+    def __init__(self, fileName):
+        self.fileName   = fileName
+        self.file       = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.fileName) or '.', exist_ok=True)
+        self.file = open(self.fileName, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:     # LK_LOCK gives up after 10 s
+                    pass
+        return self
+
+    def __exit__(self, *exception):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+class FileCache():
+    # entries are directories <cacheDir>/<key>; index.json keeps size, last use and statistics; every
+    # read-modify-write of the index holds index.lock, so processes sharing the cache do not drop entries
+    def __init__(self, cacheDir, maxBytes):
+        self.cacheDir       = cacheDir
+        self.maxBytes       = maxBytes
+        self.indexFile      = os.path.join(cacheDir, 'index.json')
+        self.lock           = FileLock(os.path.join(cacheDir, 'index.lock'))
+        self.stats          = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def ReadIndex(self):
+        try:
+            with open(self.indexFile, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'entries': {}, 'stats': {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}}
+
+    def WriteIndex(self, index):
+        os.makedirs(self.cacheDir, exist_ok=True)
+        tmpFile = self.indexFile + '.%d.tmp' % os.getpid()
+        with open(tmpFile, 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmpFile, self.indexFile)
+
+    def Count(self, index, name):
+        self.stats[name]            += 1
+        index['stats'][name]         = index['stats'].get(name, 0) + 1
+
+    def EntryPath(self, key):
+        return os.path.join(self.cacheDir, key)
+
+    def EntrySize(self, path):
+        return sum(os.path.getsize(os.path.join(root, f)) for root, dirs, files in os.walk(path) for f in files)
+
+    def Lookup(self, key):
+        with self.lock:
+            index   = self.ReadIndex()
+            path    = self.EntryPath(key)
+            if key in index['entries'] and os.path.isdir(path):
+                index['entries'][key]['lastUsed'] = time.time()
+                self.Count(index, 'hits')
+                self.WriteIndex(index)
+                return path
+
+            index['entries'].pop(key, None)
+            self.Count(index, 'misses')
+            self.WriteIndex(index)
+            return None
+
+    #the entry is written to a temporary directory without the lock and moved into place with the lock held
+    def Store(self, key, WriteEntry, info={}):
+        path    = self.EntryPath(key)
+        tmpPath = path + '.%d.tmp' % os.getpid()
+        shutil.rmtree(tmpPath, ignore_errors=True)
+        os.makedirs(tmpPath)
+        WriteEntry(tmpPath)
+        size    = self.EntrySize(tmpPath)
+
+        with self.lock:
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmpPath, path)
+
+            index   = self.ReadIndex()
+            index['entries'][key] = {'size': size, 'created': time.time(), 'lastUsed': time.time(), 'info': info}
+            self.Count(index, 'stores')
+            self.Evict(index, keep=key)
+            self.WriteIndex(index)
+        return path
+
+    #entry directories missing in the index (e.g. stored by an earlier version without lock) are added, so they
+    #count for maxBytes and can be evicted; called with the lock held
+    def AdoptEntries(self, index):
+        entries = index['entries']
+        for key in os.listdir(self.cacheDir):
+            path = self.EntryPath(key)
+            if key not in entries and not key.endswith('.tmp') and os.path.isdir(path):
+                entries[key] = {'size': self.EntrySize(path), 'created': os.path.getmtime(path),
+                                'lastUsed': os.path.getmtime(path), 'info': {}}
+
+    def Evict(self, index, keep=None):
+        self.AdoptEntries(index)
+        entries = index['entries']
+        total   = sum(e['size'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['lastUsed']):
+            if total <= self.maxBytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]['size']
+            shutil.rmtree(self.EntryPath(key), ignore_errors=True)
+            del entries[key]
+            self.Count(index, 'evictions')
+
+    def Clear(self):
+        with self.lock:
+            for name in os.listdir(self.cacheDir):
+                path = os.path.join(self.cacheDir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif name != 'index.lock':
+                    os.remove(path)
+
+    def Statistics(self):
+        with self.lock:
+            index   = self.ReadIndex()
+        return {'process': dict(self.stats), 'total': index['stats'], 'entries': len(index['entries']),
+                'bytes': sum(e['size'] for e in index['entries'].values()), 'maxBytes': self.maxBytes}
+
+
+reducedModelCache = FileCache(reducedModelCacheDir, reducedModelCacheMaxBytes)
+
+
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#maxFrequency (Hz): nModes is given by the fixed-interface modes below maxFrequency, see Eigenmodes.py
+def ReducedModelKey(fem, boundaryList, nModes, computationMode, mat, varType, maxFrequency=None):
+    return HashValues(reducedModelCacheVersion, exu.__version__, HashFEMesh(fem),
+                      [np.array(nodeList, dtype=int) for nodeList in boundaryList],
+                      int(nModes) if maxFrequency is None else ['maxFrequency', float(maxFrequency)],
+                      str(computationMode), str(varType),
+                      [mat.youngsModulus, mat.poissonsRatio, mat.density])
+
+
+def SaveReducedModel(fem, path):
+    SaveArrayStore(os.path.join(path, 'reducedModel' + arrayStoreExtension),
+                   {'modeBasis': fem.modeBasis, 'eigenValues': fem.eigenValues,
+                    'postProcessingModes': PackPostProcessingModes(fem.postProcessingModes)})
+
+
+def LoadReducedModel(fem, path):
+    data                    = LoadArrayStore(os.path.join(path, 'reducedModel' + arrayStoreExtension), mmapMode='r')
+    fem.modeBasis           = data['modeBasis']
+    fem.eigenValues         = data['eigenValues']
+    fem.postProcessingModes = UnpackPostProcessingModes(data['postProcessingModes'])
+
+
+#compute HCB modes and post-processing modes of fem in the current process, no cache lookup;
+#the fixed-interface spectrum is shared between nModes settings, see Eigenmodes.py;
+#post-processing modes only at postProcessingNodes if given, see PostProcessingModes.py
+def ReduceFEM(fem, boundaryList, nModes, mat, varType, computationMode, maxFrequency=None, postProcessingNodes=None):
+    from Models.Eigenmodes import ComputeHCBModes
+    ComputeHCBModes(fem, boundaryList, nModes, computationMode, maxFrequency)
+    if postProcessingNodes is None:
+        print("ComputePostProcessingModes ... (may take a while)")
+    fem.postProcessingModes = {}
+    ComputePostProcessingModesAtNodes(fem, mat, varType, postProcessingNodes)
+
+
+#worker process of ReductionPipeline: reduce fem and save the result to workPath; the fixed-interface spectrum
+#is stored into spectrumCache by the worker itself (ComputeHCBModes), concurrent workers are serialized by the
+#index lock of FileCache
+def ReduceFEMWorker(fem, boundaryList, nModes, mat, varType, computationMode, maxFrequency, postProcessingNodes,
+                    workPath):
+    ReduceFEM(fem, boundaryList, nModes, mat, varType, computationMode, maxFrequency, postProcessingNodes)
+    shutil.rmtree(workPath, ignore_errors=True)
+    os.makedirs(workPath)
+    SaveReducedModel(fem, workPath)
+    return workPath
+
+
+#reduction of any number of flexible bodies: register the bodies with Add, Run computes the
+#missing reduced models concurrently in worker processes (one per body) and gathers all of them
+#into their FEMinterfaces before the model is assembled; reducedModelCache is only written by this
+#process, spectrumCache also by the workers; with model.SensorPostProcessingModes,
+#post-processing modes are only computed at the postProcessingNodes of a body (e.g. strain sensor nodes)
+class ReductionPipeline():
+    def __init__(self, model):
+        self.model          = model
+        self.maxFrequency   = getattr(model, 'maxModeFrequency', None)
+        self.nodeSubset     = getattr(model, 'SensorPostProcessingModes', False) and not getattr(model, 'Visualization', False)
+        self.jobs           = []
+
+    def Add(self, fem, boundaryList, mat, varType, computationMode=HCBstaticModeSelection.RBE2, postProcessingNodes=None):
+        self.jobs += [{'fem': fem, 'boundaryList': boundaryList, 'mat': mat, 'varType': varType,
+                       'computationMode': computationMode,
+                       'postProcessingNodes': postProcessingNodes if self.nodeSubset else None}]
+
+    def StoreInfo(self, job):
+        return {'nModes': int(self.model.nModes), 'maxFrequency': self.maxFrequency,
+                'nNodes': int(job['fem'].NumberOfNodes()),
+                'boundaryNodes': [len(nodeList) for nodeList in job['boundaryList']],
+                'computationMode': str(job['computationMode']), 'outputVariableType': str(job['varType']),
+                'postProcessingNodes': 'all' if job['postProcessingNodes'] is None else len(job['postProcessingNodes'])}
+
+    #nWorkers=None: one process per missing reduced model, up to the number of CPUs; 1: in this process
+    @Profiled('reduction')
+    def Run(self, nWorkers=None):
+        nModes  = self.model.nModes
+        missing = []
+        for job in self.jobs:
+            job['key']  = ReducedModelKey(job['fem'], job['boundaryList'], nModes, job['computationMode'],
+                                          job['mat'], job['varType'], self.maxFrequency)
+            path        = reducedModelCache.Lookup(job['key'])
+            if path is not None:
+                LoadReducedModel(job['fem'], path)
+                if self.model.verboseMode:
+                    print('reduced model loaded from cache:', job['key'])
+                #post-processing modes of further nodes are added to the cache entry
+                if ComputePostProcessingModesAtNodes(job['fem'], job['mat'], job['varType'], job['postProcessingNodes']):
+                    reducedModelCache.Store(job['key'], lambda entryPath: SaveReducedModel(job['fem'], entryPath),
+                                            info=self.StoreInfo(job))
+            else:
+                missing += [job]
+
+        if nWorkers is None:
+            nWorkers = min(len(missing), os.cpu_count() or 1)
+
+        if nWorkers <= 1 or len(missing) <= 1:
+            for job in missing:
+                ReduceFEM(job['fem'], job['boundaryList'], nModes, job['mat'], job['varType'], job['computationMode'],
+                          self.maxFrequency, job['postProcessingNodes'])
+                reducedModelCache.Store(job['key'], lambda entryPath: SaveReducedModel(job['fem'], entryPath),
+                                        info=self.StoreInfo(job))
+        elif missing:
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(max_workers=nWorkers) as executor:
+                futures = [executor.submit(ReduceFEMWorker, job['fem'], job['boundaryList'], nModes, job['mat'],
+                                           job['varType'], job['computationMode'], self.maxFrequency,
+                                           job['postProcessingNodes'],
+                                           reducedModelCache.EntryPath(job['key']) + '.%d.work' % os.getpid())
+                           for job in missing]
+                workPaths = [future.result() for future in futures]
+
+            #move the worker results into the cache and load them memory-mapped
+            for job, workPath in zip(missing, workPaths):
+                MoveEntry   = lambda entryPath: os.replace(os.path.join(workPath, 'reducedModel' + arrayStoreExtension),
+                                                           os.path.join(entryPath, 'reducedModel' + arrayStoreExtension))
+                path        = reducedModelCache.Store(job['key'], MoveEntry, info=self.StoreInfo(job))
+                shutil.rmtree(workPath, ignore_errors=True)
+                LoadReducedModel(job['fem'], path)
+
+        self.model.reducedModelKeys += [job['key'] for job in self.jobs]
+        return [job['key'] for job in self.jobs]
+
+
+#compute HCB modes and post-processing modes of fem, or take them from the reduced model cache
+def ComputeReducedModel(self, fem, boundaryList, mat, varType, computationMode=HCBstaticModeSelection.RBE2,
+                        postProcessingNodes=None):
+    pipeline = ReductionPipeline(self)
+    pipeline.Add(fem, boundaryList, mat, varType, computationMode, postProcessingNodes)
+    return pipeline.Run(nWorkers=1)[0]
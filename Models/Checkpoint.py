@@ -0,0 +1,167 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #CHECKPOINT
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Checkpoint and restart of the dynamic solve (NNHydraulics(checkpointSteps=n)).
+# The run is integrated stepwise by one implicit solver (same as SolveDynamic
+# with TrapezoidalIndex2, see SolveModelStepwise); every n steps the full state
+# (ODE2 coordinates, velocities and accelerations, ODE1 coordinates and their
+# derivatives, algebraic and data coordinates), the stored sensor rows and the
+# step/time are written to checkpointDir/<key>.arrays, with the key of the
+# result cache (input vector, model settings, output profile, model code). A run
+# with the same key started again, e.g. after it was interrupted or diverged,
+# resumes from that checkpoint; the checkpoint is removed when the run finished.
+# ComputeBranches integrates the common prefix of several input vectors once
+# (e.g. the idle phase before the valves open) and continues the other input
+# vectors from a checkpoint at the end of the prefix, which is kept for later
+# sweeps. With the restored derivatives the trapezoidal rule continues as in the
+# uninterrupted run; results differ only within the Newton tolerance, as the
+# modified Newton method starts with a new Jacobian at every checkpoint.
+
+from Models.Container import *
+import shutil
+
+
+checkpointDir           = 'solution/Checkpoints'
+checkpointVersion       = 1
+
+# state vectors as in SystemData.SetSystemState, and the derivatives which the trapezoidal rule needs in addition
+checkpointStateNames    = ['ODE2Coords', 'ODE2Coords_t', 'ODE1Coords', 'AECoords', 'dataCoords']
+checkpointDerivativeNames = ['ODE2Coords_tt', 'ODE1Coords_t']
+
+
+def CheckpointPath(key):
+    return os.path.join(checkpointDir, key + arrayStoreExtension)
+
+
+#checkpoint of path loaded into memory (sensor rows are extended by the resumed run), None if there is none
+def LoadCheckpoint(path):
+    if not IsArrayStore(path):
+        return None
+    checkpoint = LoadArrayStore(path, mmapMode=None)
+    if checkpoint.get('version') != checkpointVersion:
+        return None
+    return checkpoint
+
+
+def RemoveCheckpoint(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+#remove all checkpoints, incl. the kept prefixes of ComputeBranches
+def ClearCheckpoints():
+    shutil.rmtree(checkpointDir, ignore_errors=True)
+
+
+#input vector entries read by the simulation: valve inputs per step and initial angles, see ComputeModel
+def SimulationInputIndices(n, system):
+    if system:
+        return [[np.arange(0, n), np.arange(n, 2*n)], [3*n, 4*n]]
+    return [[np.arange(0, n)], [2*n]]
+
+
+#number of leading steps with equal valve inputs in all input vectors (branchStep: requested number, checked);
+#initial angles must be equal
+def BranchStep(self, inputVectors, system, branchStep=None):
+    X       = np.array(inputVectors, dtype=float)
+    n       = self.nStepsTotal
+    [valves, angles] = SimulationInputIndices(n, system)
+    if np.any(X[:, angles] != X[0, angles]):
+        raise ValueError('BranchStep: input vectors must have the same initial angles')
+
+    differs = np.zeros(n, dtype=bool)
+    for indices in valves:
+        differs |= np.any(X[:, indices] != X[0, indices], axis=0)
+    commonSteps = int(np.argmax(differs)) if differs.any() else n
+    if branchStep is None:
+        return commonSteps
+    if branchStep < 0 or branchStep > commonSteps:
+        raise ValueError('BranchStep: valve inputs differ before step ' + str(branchStep))
+    return int(branchStep)
+
+
+#key of the state after branchStep steps of a run of inputData: only the simulated inputs before branchStep count
+def BranchPrefixKey(self, inputData, branchStep, system, OptimisedLB, outputProfile):
+    inputData   = np.asarray(inputData, dtype=float)
+    [valves, angles] = SimulationInputIndices(self.nStepsTotal, system)
+    prefixInput = np.full(len(inputData), np.nan)
+    for indices in valves:
+        prefixInput[indices[:branchStep]] = inputData[indices[:branchStep]]
+    prefixInput[angles] = inputData[angles]
+    prefixInput        += 0.       # -0. -> 0., e.g. scaled idle inputs
+    return HashValues('branchPrefix', int(branchStep),
+                      ResultCacheKey(self, prefixInput, system, OptimisedLB, outputProfile))
+
+
+#set the checkpoints of the next dynamic solve, called by ComputeModel: self.checkpointPath (periodic checkpoints),
+#self.resumedCheckpoint (checkpoint to start from) and self.branchCheckpoint ([step, path] of the prefix checkpoint
+#requested by ComputeBranches in self.branchRequest); sets self.stepwiseSolve
+def PrepareCheckpoints(self, inputData, system, OptimisedLB, outputProfile):
+    request, self.branchRequest = self.branchRequest, None
+    self.checkpointPath     = None
+    self.resumedCheckpoint  = None
+    self.branchCheckpoint   = None
+    if self.CheckpointSteps:
+        self.checkpointPath     = CheckpointPath(ResultCacheKey(self, inputData, system, OptimisedLB, outputProfile))
+        self.resumedCheckpoint  = LoadCheckpoint(self.checkpointPath)
+    if request is not None:
+        [branchStep, path] = request
+        if self.resumedCheckpoint is None or self.resumedCheckpoint['step'] < branchStep:
+            prefix = LoadCheckpoint(path)
+            if prefix is None:
+                self.branchCheckpoint   = request
+            else:
+                self.resumedCheckpoint  = prefix
+    self.stepwiseSolve = bool(self.ValveSchedule or self.checkpointPath or self.branchCheckpoint
+                              or self.resumedCheckpoint is not None)
+
+
+#step -> checkpoint paths at which the stepwise solve stops and writes checkpoints
+def CheckpointStops(self):
+    stops = {}
+    if self.checkpointPath is not None:
+        for step in range(self.CheckpointSteps, self.nStepsTotal, self.CheckpointSteps):
+            stops.setdefault(step, []).append(self.checkpointPath)
+    if self.branchCheckpoint is not None:
+        stops.setdefault(self.branchCheckpoint[0], []).append(self.branchCheckpoint[1])
+    return stops
+
+
+#write the state after step of the running solve to paths; sensorRows: name -> stored rows of the run so far
+@Profiled('checkpoint')
+def SaveCheckpoint(self, step, paths, sensorRows):
+    state       = self.mbs.systemData.GetSystemStateDict()
+    checkpoint  = {'version':   checkpointVersion, 'step': int(step), 'time': float(self.mbs.systemData.GetTime()),
+                   'state':     {name: np.array(state[name]) for name in checkpointStateNames + checkpointDerivativeNames},
+                   'sensors':   sensorRows}
+    for path in paths:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        SaveArrayStore(path, checkpoint)
+
+
+#InitializeSolver for settings, starting from checkpoint (None: initial state of the model): the checkpoint state is
+#set as initial state while the solver initializes (so the initial sensor values are those of the checkpoint) and the
+#derivatives of the trapezoidal rule are restored afterwards; the initial state of the model is kept
+def InitializeSolverFromCheckpoint(self, solver, settings, checkpoint=None):
+    mbs = self.mbs
+    if checkpoint is None:
+        solver.InitializeSolver(mbs, settings)
+        return
+
+    initial         = exu.ConfigurationType.Initial
+    initialState    = mbs.systemData.GetSystemState(initial)
+    state           = [np.array(checkpoint['state'][name], dtype=float) for name in checkpointStateNames]
+    if [len(v) for v in state] != [len(v) for v in initialState]:
+        raise ValueError('InitializeSolverFromCheckpoint: checkpoint does not match the system sizes')
+
+    generalizedAlpha = settings.timeIntegration.generalizedAlpha
+    computeInitialAccelerations = generalizedAlpha.computeInitialAccelerations
+    mbs.systemData.SetSystemState(state, initial)
+    generalizedAlpha.computeInitialAccelerations = False      # restored below
+    try:
+        solver.InitializeSolver(mbs, settings)
+    finally:
+        mbs.systemData.SetSystemState(initialState, initial)
+        generalizedAlpha.computeInitialAccelerations = computeInitialAccelerations
+    current = mbs.systemData.GetSystemStateDict(reference=True)
+    for name in checkpointDerivativeNames:
+        current[name][:] = checkpoint['state'][name]
@@ -6,6 +6,7 @@ import numpy as np
 from math import sin, cos, sqrt, pi, tanh, atan2, degrees
 import sys, os, time, math, scipy.io
 import math as mt
+importStartTime = time.time()
 
 #EXUDYN Libraries
 import exudyn as exu
@@ -22,10 +23,10 @@ from exudyn.FEM import *
 
 fileName1       = 'AbaqusMesh/Pillar.stl'
 fileName2       = 'AbaqusMesh/LiftBoom.stl'
-fileName3       = 'AbaqusMesh/TiltBoom.stl'
+fileName3       = 'AbaqusMesh/TiltBoom.STL'
 fileName4       = 'AbaqusMesh/Bracket1.stl'
 fileName5       = 'AbaqusMesh/Bracket2.stl'
-fileName6       = 'AbaqusMesh/ExtensionBoom.stl'
+fileName6       = 'AbaqusMesh/ExtensionBoom.STL'
 fileName7       = 'AbaqusMesh/Model-1_optimized0407_geom.stl'
 
 plane           = graphics.CheckerBoard(point=[2,0,-2], normal=[0,0,1], size=6, nTiles=16,
@@ -69,8 +70,6 @@ m1              = 93.26
 pMid1           = np.array([-0.017403, 0.577291, 0])  # center of mass, body0,0.004000,-0.257068
 Inertia1        = np.array([[16.328381,-1.276728, 0.000016],[-1.276728, 0.612003, -5.9e-5],[0.000016,  -5.9e-5  , 16.503728]])
 Mark3           = [0,0,0]
-graphicsBody1   = GraphicsDataFromSTLfile(fileName1, color4black,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody1   = AddEdgesAndSmoothenNormals(graphicsBody1, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 
 
 # Second Body: LiftBoom
@@ -81,8 +80,6 @@ W2              = 0.263342          # Width in z-direction
 pMid2           = np.array([1.229248, 0.055596, 0])
 m2              = 143.66
 Inertia2        = np.array([[1.055433, 1.442440,  -0.000003],[ 1.442440,  66.577004, 0],[ -0.000003,              0  ,  67.053707]])
-graphicsBody2   = GraphicsDataFromSTLfile(fileName2, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody2   = AddEdgesAndSmoothenNormals(graphicsBody2, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 LiftP           = np.array(Mark4)
 
 # Seventh Body: Optimised LiftBoom
@@ -93,8 +90,6 @@ W7              = 0.263342          # Width in z-direction
 pMid7           = np.array([1.024, 0.055, 0.0])
 m7              = 94.54
 Inertia7        = np.array([[0.684,  -2.292, -0.002],[-2.292, 68.278, -0.000],[-0.002, -0.000, 68.549]])
-graphicsBody7   = GraphicsDataFromSTLfile(fileName7, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody7   = AddEdgesAndSmoothenNormals(graphicsBody7, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 LiftP           = np.array(Mark4)
                           
 L3              = 2.580         # Length in x-direction
@@ -103,8 +98,6 @@ W3              = 0.220         # Width in z-direction
 m3              = 141.942729+ 15.928340
 pMid3           = np.array([ 0.659935,  0.251085, 0])  # center of mass
 Inertia3        = np.array([[1.055433, 1.442440,  -0.000003],[1.442440,  66.577004,    0],[ -0.000003, 0,        67.053707]])
-graphicsBody3   = GraphicsDataFromSTLfile(fileName3, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody3   = AddEdgesAndSmoothenNormals(graphicsBody3, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 
 L4              = 0.557227    # Length in x-direction
 H4              = 0.1425      # Height in y-direction
@@ -112,8 +105,6 @@ W4              = 0.15        # Width in z-direction
 pMid4           = np.array([0.257068, 0.004000 , 0])
 m4              = 11.524039
 Inertia4        = np.array([[0.333066, 0.017355, 0],[0.017355, 0.081849, 0],[0,              0, 0.268644]])
-graphicsBody4   = GraphicsDataFromSTLfile(fileName4, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody4   = AddEdgesAndSmoothenNormals(graphicsBody4, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 
 L5              = 0.569009       # Length in x-direction
 H5              = 0.078827       # Height in y-direction
@@ -121,14 +112,10 @@ W5              = 0.15           # Width in z-direction
 pMid5           = np.array([0.212792, 0, 0])
 m5              = 7.900191
 Inertia5        = np.array([[0.052095, 0, 0],[0,  0.260808, 0],[0,              0,  0.216772]])
-graphicsBody5   = GraphicsDataFromSTLfile(fileName5, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody5   = AddEdgesAndSmoothenNormals(graphicsBody5, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 
 pMid6           = np.array([1.15, 0.06, 0])
 m6              = 58.63
 Inertia6        = np.array([[0.13, 0, 0],[0.10,  28.66, 0],[0,              0,  28.70]])
-graphicsBody6   = GraphicsDataFromSTLfile(fileName6, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-graphicsBody6   = AddEdgesAndSmoothenNormals(graphicsBody6, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
 
 
 
@@ -151,13 +138,33 @@ from scipy.optimize import fsolve, newton
 
 import random
 
+from Models.Profiling import *
 from Models.Control import *
+from Models.Graphics import *
+from Models.Friction import *
+from Models.ArrayStore import *
+from Models.PostProcessingModes import *
+from Models.FieldRecovery import *
+from Models.Cache import *
+from Models.Eigenmodes import *
+from Models.NodeIndex import *
+from Models.AbaqusImport import *
+from Models.Equilibrium import *
+from Models.Results import *
+from Models.SolutionFile import *
+from Models.OutputProfile import *
+from Models.ResultCache import *
+from Models.Checkpoint import *
+from Models.Report import *
 from Models.FlexibleMultibody import *
 from Models.ExudynModels import *
+from Models.Benchmark import *
 
 pMid1           = np.array([-0.017403, 0.577291, 0])  # center of mass, body0
 TiltL           = LiftP + np.array([2.879420180699481, -0.040690041435711005, 0])
 
+SetModuleImportTime(time.time() - importStartTime)
+
 
 
 
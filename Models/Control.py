@@ -2,98 +2,57 @@ from Models.Container import *
 
 
 
-# Control signal 1
-def uref(t):
-    
-    
-    # Define time intervals for motion
-    Idle_Time_1_Start   = 0
-    Idle_Time_1_End     = 2
-    Lifting_Time_Start  = 2
-    Lifting_Time_End    = 6
-    Idle_Time_2_Start   = 6
-    Idle_Time_2_End     = 9
-    Lowering_Time_Start = 9
-    Lowering_Time_End   = 12.5
-    Idle_Time_3_Start   = 12.5  # after this, u = 0
-    
-    # Define control logic
-    if Idle_Time_1_Start <= t < Idle_Time_1_End:
-        u = 0
-    elif Lifting_Time_Start <= t < Lifting_Time_End:
-        u = 10
-    elif Idle_Time_2_Start <= t < Idle_Time_2_End:
-        u = 0
-    elif Lowering_Time_Start <= t < Lowering_Time_End:
-        u = -10
-    else:
-        u = 0
-    
-    return u
-
+# Control signals as piecewise-constant schedules: rows [tStart, tEnd, u], u = 0 outside
+# the intervals. Intervals of one schedule must not overlap.
 
+# Control signal 1
+urefSchedule    = [[2,      6,      10],        # lifting
+                   [9,      12.5,   -10],       # lowering
+                   ]
 
 # Control signal 1
-def uref_1(t):
-    
-    
-    #Lets comment this part and call 
-    Lifting_Time_Start_1    = 2          # Start of lifting mass, m
-    Lifting_Time_End_1      = 6          # End of lifting mass, m
-    Lowering_Time_Start_1   = 8           # Start of lowering mass, m
-    Lowering_Time_End_1     = 10.7     # End of lowering mass, m
-    Lowering_Time_Start_2   = 13          # Start of lowering mass, m
-    Lowering_Time_End_2     = 16            # End of lowering mass, m
-    Lowering_Time_Start_3   = 17        # Start of lowering mass, m
-    Lowering_Time_End_3     = 18          # End of lowering mass, m
-    Lowering_Time_Start_4   = 18.5         # Start of lowering mass, m
-    Lowering_Time_End_4     = 19           # End of lowering mass, m
+uref1Schedule   = [[2,      6,      10],        # lifting
+                   [8,      10.7,   -10],       # lowering
+                   [13,     16,     10],
+                   [17,     18,     -10],
+                   # [18.5,   19,     -10],
+                   ]
 
-    if Lifting_Time_Start_1 <= t < Lifting_Time_End_1:
-        u = 10
-    elif Lowering_Time_Start_1 <= t < Lowering_Time_End_1:
-        u = -10
-    elif Lowering_Time_Start_2 <= t < Lowering_Time_End_2:
-         u = 10
-    elif Lowering_Time_Start_3 <= t < Lowering_Time_End_3:
-         u = -10
-    # elif Lowering_Time_Start_4 <= t < Lowering_Time_End_4:
-    #      u = -10
-    else:
-        u = 0
+# Control signal 2
+uref2Schedule   = [[1.0,    3.0,    10],
+                   [4.0,    6.6,    -10],
+                   [8,      10,     10],
+                   [12,     15,     -10],
+                   [16,     18,     10],
+                   ]
+
+
+#evaluate schedule(s) at times t; schedule has shape (nIntervals, 3) or (..., nIntervals, 3)
+#for a batch of schedules, the result has shape schedule.shape[:-2] + t.shape
+def ScheduleSignal(t, schedule):
+    t           = np.asarray(t, dtype=float)
+    schedule    = np.asarray(schedule, dtype=float)
+    if schedule.shape[-2] == 0:
+        return np.zeros(schedule.shape[:-2] + t.shape)
+
+    tFlat       = t.reshape(-1)
+    tStart      = schedule[..., 0, None]
+    tEnd        = schedule[..., 1, None]
+    value       = schedule[..., 2, None]
+    active      = (tStart <= tFlat) & (tFlat < tEnd)                # (..., nIntervals, nT)
+    u           = np.where(active, value, 0.).sum(axis=-2)
     
-    return u
+    return u.reshape(schedule.shape[:-2] + t.shape)
 
 
-# Control signal 2
+def uref(t):
+    return ScheduleSignal(t, urefSchedule)
+
+def uref_1(t):
+    return ScheduleSignal(t, uref1Schedule)
+
 def uref_2(t):
-    
-   Lifting_Time_Start_1  = 1.0          # Start of lifting mass, m
-   Lifting_Time_End_1    = 3.0            # End of lifting mass, m
-   Lowering_Time_Start_1 = 4.0         # Start of lowering mass, m
-   Lowering_Time_End_1   = 6.6           # End of lowering mass, m
-   Lowering_Time_Start_2 = 8         # Start of lowering mass, m
-   Lowering_Time_End_2   = 10           # End of lowering mass, m
-   Lowering_Time_Start_3 = 12         # Start of lowering mass, m
-   Lowering_Time_End_3 = 15          # End of lowering mass, m
-   Lowering_Time_Start_4 = 16         # Start of lowering mass, m
-   Lowering_Time_End_4 = 18          # End of lowering mass, m
-
-   if Lifting_Time_Start_1 <= t < Lifting_Time_End_1:
-       u = 10
-   elif Lowering_Time_Start_1 <= t < Lowering_Time_End_1:
-       u = -10
-   elif Lowering_Time_Start_2 <= t < Lowering_Time_End_2:
-       u = 10
-   elif Lowering_Time_Start_3 <= t < Lowering_Time_End_3:
-       u = -10
-   elif Lowering_Time_Start_4 <= t < Lowering_Time_End_4:
-         u = 10
-   else:
-       u = 0
-    #u = ExpData[t,5]
-
-   return u
+    return ScheduleSignal(t, uref2Schedule)
 
 
 # Control signal 1
@@ -128,20 +87,18 @@ def Pump(t):
     return pP
 
 #def EnergyCalculation(self, FVec,sVec,pVec):
+#hydraulic force and cumulative energy of the lift cylinder; sVec, pVec are sensor data
+#of shape (nRows, nColumns) or (nBatch, nRows, nColumns)
 def EnergyCalculation(self, sVec, pVec):
     
-    #F  = FVec[:]
-    s  = sVec[:,1]
-    p1 = pVec[:,1]
-    p2 = pVec[:,2]
-    F = np.zeros(self.nStepsTotal)
-    Energy = np.zeros(self.nStepsTotal)
+    n  = self.nOutputSteps
+    s  = np.asarray(sVec)[..., :n, 1]
+    p1 = np.asarray(pVec)[..., :n, 1]
+    p2 = np.asarray(pVec)[..., :n, 2]
     
-    for i in range(1,self.nStepsTotal):
-        
-        F[i] = p1[i]*A_1-p2[i]*A_2
-        Energy[i] = F[i]*(s[i]-s[i-1]) + Energy[i-1]    
-            
-
-    return np.concatenate((F, Energy))
-        
+    F           = p1*A_1-p2*A_2
+    F[..., 0]   = 0
+    Energy      = np.zeros(F.shape)
+    Energy[..., 1:] = np.cumsum(F[..., 1:]*np.diff(s, axis=-1), axis=-1)
+
+    return np.concatenate((F, Energy), axis=-1)
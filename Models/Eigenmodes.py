@@ -0,0 +1,157 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #EIGENMODES
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Hurty-Craig-Bampton modes (RBE2 interfaces) with a reusable fixed-interface
+# spectrum. The constrained stiffness matrix Kii is factorized once per mesh and
+# boundary set; the factorization is the shift-invert operator of the Lanczos
+# solver (sigma=0) and also gives the static modes. Computed eigenpairs are
+# kept in memory and in 'AbaqusMesh/SpectrumCache', so a request for fewer modes
+# is served by truncation, and the mode count can be given by a frequency limit
+# ("all modes below 500 Hz"). A convergence study over nModes then costs a
+# single eigen-solve. Same modes as FEMinterface.ComputeHurtyCraigBamptonModes.
+
+from Models.Container import *
+from scipy.linalg import block_diag
+from scipy.sparse.linalg import eigsh, factorized, LinearOperator
+
+
+spectrumCacheDir        = 'AbaqusMesh/SpectrumCache'
+spectrumCacheMaxBytes   = 2*1024**3
+spectrumCacheVersion    = 1
+spectrumMinModes        = 30        # fixed-interface modes computed at least per eigen-solve
+factorizationCacheSize  = 2         # factorizations of Kii kept per process (lift and tilt boom)
+
+spectrumCache           = FileCache(spectrumCacheDir, spectrumCacheMaxBytes)
+spectra                 = {}        # per process: spectrum key -> {'eigenValues', 'eigenVectors', 'complete'}
+factorizations          = {}        # per process: spectrum key -> solve function of Kii
+
+
+def SpectrumKey(fem, DOFb):
+    return HashValues(spectrumCacheVersion, HashFEMesh(fem), np.sort(DOFb))
+
+
+def FrequenciesHz(eigenValues):
+    return np.sqrt(np.abs(eigenValues))/(2*np.pi)
+
+
+#number of modes needed for nModes or for all modes below maxFrequency (Hz), None if spectrum does not suffice
+def SpectrumModeCount(spectrum, nModes=None, maxFrequency=None):
+    if spectrum is None:
+        return None
+    if maxFrequency is None:
+        return nModes if nModes <= len(spectrum['eigenValues']) else None
+    frequencies = FrequenciesHz(spectrum['eigenValues'])
+    if len(frequencies) and frequencies[-1] > maxFrequency or spectrum['complete']:
+        return int(np.sum(frequencies <= maxFrequency))
+    return None
+
+
+def GetSpectrum(key):
+    if key not in spectra:
+        path = spectrumCache.Lookup(key)
+        if path is not None:
+            data        = LoadArrayStore(os.path.join(path, 'spectrum' + arrayStoreExtension), mmapMode='r')
+            spectra[key] = {'eigenValues': data['eigenValues'], 'eigenVectors': data['eigenVectors'],
+                            'complete': data['complete']}
+    return spectra.get(key)
+
+
+def StoreSpectrum(key, spectrum):
+    spectra[key] = spectrum
+    try:
+        spectrumCache.Store(key, lambda path: SaveArrayStore(os.path.join(path, 'spectrum' + arrayStoreExtension),
+                                                             spectrum),
+                            info={'nModes': len(spectrum['eigenValues']),
+                                  'maxFrequencyHz': float(FrequenciesHz(spectrum['eigenValues'][-1:]).max(initial=0))})
+    except OSError:
+        pass    # read-only checkout: keep the in-memory spectrum only
+
+
+#solve function of Kii, factorized once per mesh and boundary set
+def GetFactorization(key, Kii):
+    if key not in factorizations:
+        while len(factorizations) >= factorizationCacheSize:
+            del factorizations[next(iter(factorizations))]
+        factorizations[key] = factorized(Kii.tocsc())   #factorized expects csc format
+    return factorizations[key]
+
+
+#fixed-interface eigenpairs (ascending) of Kii, Mii: the first nModes, or all below maxFrequency (Hz);
+#taken from the cached spectrum if it contains them, otherwise the spectrum is extended by shift-invert Lanczos
+def FixedInterfaceModes(key, Kii, Mii, nModes=None, maxFrequency=None, verbose=False):
+    spectrum    = GetSpectrum(key)
+    nUsed       = SpectrumModeCount(spectrum, nModes, maxFrequency)
+
+    if nUsed is None:
+        nInternal   = Kii.shape[0]
+        solve       = GetFactorization(key, Kii)
+        OPinv       = LinearOperator(Kii.shape, matvec=solve, dtype=float)
+        k           = max(nModes or 0, spectrumMinModes, 2*len(spectrum['eigenValues']) if spectrum else 0)
+        while nUsed is None:
+            if k > nInternal-1 and maxFrequency is None:
+                raise ValueError('FixedInterfaceModes: nModes must be smaller than the number of internal coordinates')
+            k       = min(k, nInternal-1)
+            start_time = time.time()
+            [eigenValues, eigenVectors] = eigsh(A=Kii, k=k, M=Mii, which='LM', sigma=0, mode='normal', OPinv=OPinv)
+            order   = np.argsort(eigenValues)
+            spectrum = {'eigenValues': np.abs(eigenValues[order]), 'eigenVectors': eigenVectors[:, order],
+                        'complete': k == nInternal-1}
+            if verbose:
+                print('fixed-interface modes: %d modes up to %.1f Hz in %.3f seconds' %
+                      (k, FrequenciesHz(spectrum['eigenValues'][-1]), time.time() - start_time))
+            nUsed   = SpectrumModeCount(spectrum, nModes, maxFrequency)
+            k       = 2*k
+        StoreSpectrum(key, spectrum)
+
+    return [spectrum['eigenValues'][:nUsed], spectrum['eigenVectors'][:, :nUsed]]
+
+
+#HCB modes of fem with RBE2 interfaces, as fem.ComputeHurtyCraigBamptonModes(..., useSparseSolver=True);
+#with maxFrequency (Hz) given, nModes is the number of fixed-interface modes below maxFrequency
+def ComputeHCBModes(fem, boundaryList, nModes, computationMode=HCBstaticModeSelection.RBE2,
+                    maxFrequency=None, verbose=False):
+    if computationMode != HCBstaticModeSelection.RBE2:
+        if maxFrequency is not None:
+            raise ValueError('ComputeHCBModes: maxFrequency is only available for computationMode RBE2')
+        fem.ComputeHurtyCraigBamptonModes(boundaryNodesList=boundaryList, nEigenModes=nModes,
+                                          useSparseSolver=True, computationMode=computationMode)
+        return
+
+    K           = fem.GetStiffnessMatrix(sparse=True)
+    M           = fem.GetMassMatrix(sparse=True)
+    n           = K.shape[0]
+    nodesPos    = fem.nodes['Position']
+    DOFb        = np.concatenate([3*np.repeat(np.array(nodes, dtype=int), 3) + np.tile([0,1,2], len(nodes))
+                                  for nodes in boundaryList])
+    DOFi        = np.delete(np.arange(n), DOFb)
+
+    Kii         = K[DOFi,:][:,DOFi]
+    Mii         = M[DOFi,:][:,DOFi]
+    Kib         = K[DOFi,:][:,DOFb]
+
+    key         = SpectrumKey(fem, DOFb)
+    [eigenValues, eigenVectors] = FixedInterfaceModes(key, Kii, Mii, None if maxFrequency is not None else nModes,
+                                                      maxFrequency, verbose)
+    nModes      = len(eigenValues)
+
+    #static modes: unit rigid body motions (translation, rotation) of all but the first interface
+    rbSize      = 6
+    nbRBE       = (len(boundaryList)-1)*rbSize
+    modeBasis   = np.zeros((n, nbRBE+nModes))
+    modeBasis[np.ix_(DOFi, np.arange(nbRBE, nbRBE+nModes))] = eigenVectors
+
+    rigidBodyMappings = []
+    for nodes in boundaryList:
+        p       = nodesPos[nodes] - np.mean(nodesPos[nodes], axis=0)
+        T       = np.zeros((3*len(nodes), rbSize))
+        T[:, :3] = np.tile(np.eye(3), (len(nodes), 1))
+        T[:, 3:] = np.vstack([Skew(pj) for pj in p])
+        rigidBodyMappings += [T]
+    Tall        = block_diag(*rigidBodyMappings)[:, rbSize:]
+
+    solve       = GetFactorization(key, Kii)
+    modeBasis[np.ix_(DOFb, np.arange(nbRBE))] = Tall
+    modeBasis[np.ix_(DOFi, np.arange(nbRBE))] = solve(-(Kib @ Tall))
+
+    fem.modeBasis   = {'matrix': modeBasis, 'type': 'HCBmodes'}
+    fem.eigenValues = np.array(eigenValues)
@@ -0,0 +1,159 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #EQUILIBRIUM
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Static initialization of the crane models and a cache of converged equilibria.
+# The static solve with temporary distance constraints only depends on the model
+# variant, flexibility, nModes, payload, initial pressures, HCB basis, model
+# parameters and code (ModelSourceKey) and initial angles; the converged initial
+# state (incl. the pressures corrected from the constraint forces) is stored per
+# design and angles, in memory and on disk. Identical runs skip SolveStatic, runs
+# with nearby angles start Newton from the nearest cached equilibrium.
+
+from Models.Container import *
+
+
+equilibriumCacheDir             = 'AbaqusMesh/EquilibriumCache'
+equilibriumCacheVersion         = 2
+equilibriumWarmStartDistance    = 5                 # deg (as theta1, theta2); max. angle difference of a warm start
+equilibriumWarmStartLoadSteps   = 1
+
+equilibria                      = {}    # in-memory cache per process: designKey -> {'thetas', 'forces', 'states'}
+
+
+def EquilibriumDesignKey(self, variant):
+    return HashValues(equilibriumCacheVersion, exu.__version__, variant, bool(self.Flexible),
+                      int(self.nModes) if self.Flexible else 0, float(self.mL), self.reducedModelKeys,
+                      [self.p1Init, self.p2Init, self.p3Init, self.p4Init], ModelSourceKey())
+
+
+def EquilibriumCacheFile(designKey):
+    return os.path.join(equilibriumCacheDir, designKey + '.npz')
+
+
+def GetEquilibria(designKey):
+    if designKey not in equilibria:
+        entries = None
+        try:
+            with np.load(EquilibriumCacheFile(designKey)) as data:
+                nStates = sum(1 for key in data.files if key.startswith('state'))
+                entries = {'thetas': data['thetas'], 'forces': data['forces'],
+                           'states': [data['state%d' % i] for i in range(nStates)]}
+        except (OSError, ValueError, KeyError):
+            pass
+        equilibria[designKey] = entries
+    return equilibria[designKey]
+
+
+#add equilibrium to memory and disk cache; concurrent writers may drop each other's entries
+def StoreEquilibrium(designKey, thetas, forces, state):
+    entries = GetEquilibria(designKey)
+    row     = lambda v: np.array(v, dtype=float).reshape(1, -1)
+    if entries is None or [s.shape[1] for s in entries['states']] != [len(s) for s in state]:
+        entries = {'thetas': row(thetas), 'forces': row(forces), 'states': [row(s) for s in state]}
+    else:
+        entries = {'thetas': np.vstack((entries['thetas'], row(thetas))),
+                   'forces': np.vstack((entries['forces'], row(forces))),
+                   'states': [np.vstack((s0, row(s))) for s0, s in zip(entries['states'], state)]}
+    equilibria[designKey] = entries
+
+    try:
+        os.makedirs(equilibriumCacheDir, exist_ok=True)
+        fileName    = EquilibriumCacheFile(designKey)
+        tmpFile     = fileName + '.%d.tmp' % os.getpid()
+        with open(tmpFile, 'wb') as f:
+            np.savez(f, thetas=entries['thetas'], forces=entries['forces'],
+                     **{'state%d' % i: s for i, s in enumerate(entries['states'])})
+        os.replace(tmpFile, fileName)
+    except OSError:
+        pass    # read-only checkout: keep the in-memory cache only
+
+
+#index and angle distance of the closest cached equilibrium, or [None, inf]
+def NearestEquilibrium(entries, thetas):
+    if entries is None:
+        return [None, np.inf]
+    distances   = np.max(np.abs(entries['thetas'] - np.array(thetas, dtype=float)), axis=1)
+    i           = int(np.argmin(distances))
+    return [i, distances[i]]
+
+
+#static initialization of the assembled model: constraints = [[oDC, oHA], ...] with temporary
+#distance constraints oDC along the cylinders oHA; the constraint forces are converted to
+#pressure differences in the first chamber of oHA and the constraints are deactivated
+@Profiled('staticInit')
+def SolveStaticEquilibrium(self, variant, thetas, constraints):
+    mbs         = self.mbs
+    designKey   = EquilibriumDesignKey(self, variant)
+    entries     = GetEquilibria(designKey) if self.EquilibriumCache else None
+    [i, dist]   = NearestEquilibrium(entries, thetas)
+    nCoords     = [len(s) for s in mbs.systemData.GetSystemState(configuration=exu.ConfigurationType.Initial)]
+    if i is not None and nCoords != [s.shape[1] for s in entries['states']]:
+        [i, dist] = [None, np.inf]      # cached for a different system size
+
+    if dist == 0:
+        mbs.systemData.SetSystemState(systemStateList=[s[i] for s in entries['states']],
+                                      configuration=exu.ConfigurationType.Initial)
+        for [oDC, oHA] in constraints:
+            mbs.SetObjectParameter(oDC, 'activeConnector', False)
+        if self.verboseMode:
+            print('static equilibrium loaded from cache, initial forces=', entries['forces'][i])
+        return
+
+    mbs.variables['isStatics'] = True
+    self.simulationSettings.staticSolver.newton.relativeTolerance = 1e-10
+    # self.simulationSettings.staticSolver.stabilizerODE2term = 2
+    self.simulationSettings.staticSolver.verboseMode = self.verboseMode
+    self.simulationSettings.staticSolver.numberOfLoadSteps = 10
+    self.simulationSettings.staticSolver.constrainODE1coordinates = True #constrain pressures to initial values
+
+    coldState = None
+    if dist <= equilibriumWarmStartDistance:
+        #start Newton from the displacements of the nearest equilibrium, pressures are unchanged
+        coldState   = mbs.systemData.GetSystemState(configuration=exu.ConfigurationType.Initial)
+        warmState   = [np.array(s) for s in coldState]
+        warmState[0] = entries['states'][0][i]
+        mbs.systemData.SetSystemState(systemStateList=warmState, configuration=exu.ConfigurationType.Initial)
+        self.simulationSettings.staticSolver.numberOfLoadSteps = equilibriumWarmStartLoadSteps
+        if self.verboseMode:
+            print('static equilibrium: warm start from cached angles', entries['thetas'][i])
+
+    exu.SuppressWarnings(True)
+    try:
+        mbs.SolveStatic(self.simulationSettings,
+                        updateInitialValues=True) #use solution as new initial values for next simulation
+    except ValueError:
+        if coldState is None:
+            raise
+        mbs.systemData.SetSystemState(systemStateList=coldState, configuration=exu.ConfigurationType.Initial)
+        self.simulationSettings.staticSolver.numberOfLoadSteps = 10
+        mbs.SolveStatic(self.simulationSettings, updateInitialValues=True)
+    finally:
+        exu.SuppressWarnings(False)
+    ProfileSolver('static', mbs.sys.get('staticSolver'))
+
+    forces = [mbs.GetObjectOutput(oDC, variableType=exu.OutputVariableType.Force) for [oDC, oHA] in constraints]
+    if self.verboseMode:
+        print('initial force=', forces)
+
+    #deactivate distance constraints
+    for [oDC, oHA] in constraints:
+        mbs.SetObjectParameter(oDC, 'activeConnector', False)
+
+    #overwrite pressures: add required difference to pressure in the initial values of the system vector
+    sysODE1 = mbs.systemData.GetODE1Coordinates(configuration=exu.ConfigurationType.Initial)
+    for [oDC, oHA], force in zip(constraints, forces):
+        if oHA != None:
+            dictHA      = mbs.GetObject(oHA)
+            nODE1index  = mbs.GetNodeODE1Index(dictHA['nodeNumbers'][0]) #coordinate index for node of oHA
+            if self.verboseMode:
+                print('p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
+            sysODE1[nODE1index] += force/dictHA['chamberCrossSection0']
+            if self.verboseMode:
+                print('new p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
+    mbs.systemData.SetODE1Coordinates(coordinates=sysODE1, configuration=exu.ConfigurationType.Initial)
+
+    mbs.variables['isStatics'] = False
+
+    if self.EquilibriumCache:
+        StoreEquilibrium(designKey, thetas, forces,
+                         mbs.systemData.GetSystemState(configuration=exu.ConfigurationType.Initial))
@@ -10,6 +10,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         self.p1                     = p1
         self.p2                     = p2                         
         self.dictSensors            = {}
+        self.flexibleBodies         = {}     # flexible bodies for field recovery, see FieldRecovery.py
         #self.verboseMode            = True
         self.StaticInitialization   = True
         Emodulus                    = 2.1e11
@@ -28,7 +29,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         
         # Definintion of pillar as body in Exudyn and node n1
         [n1, b1]                    = AddRigidBody(mainSys=self.mbs,inertia=iCube1,nodeType=exu.NodeType.RotationEulerParameters,
-                                                   position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, graphicsBody1]
+                                                   position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, GetGraphicsBody('Pillar', self.Headless)]
                                                    )
         Marker3                     = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark3))                     #With Ground
         Marker4                     = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark4))            #Lift Boom
@@ -43,10 +44,9 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         
             if not self.loadFromSavedNPY: 
                 start_time              = time.time()
-                nodes1                  = feL.ImportFromAbaqusInputFile(filePath+'.inp', typeName='Part', name='Job')
-                feL.ReadMassMatrixFromAbaqus(fileName=filePath + '_MASS2.mtx')             #Load mass matrix
-                feL.ReadStiffnessMatrixFromAbaqus(fileName=filePath + '_STIF2.mtx')        #Load stiffness matrix
-                feL.SaveToFile(filePath,mode='PKL')
+                nodes1                  = ImportAbaqusInputFile(feL, filePath+'.inp', typeName='Part')
+                ReadAbaqusMatrices(feL, filePath + '_MASS2.mtx', filePath + '_STIF2.mtx')    #Load mass and stiffness matrix
+                SaveFEM(feL, filePath)
             
                 if self.verboseMode:
                     print("--- saving LiftBoom FEM Abaqus data took: %s seconds ---" % (time.time() - start_time)) 
@@ -57,16 +57,17 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
                         print('importing Abaqus FEM data structure of Lift Boom...')
                     
                     start_time          = time.time()
-                    feL.LoadFromFile(filePath,mode='PKL')
+                    LoadFEM(feL, filePath)
                     cpuTime             = time.time() - start_time
                     
                     if self.verboseMode:
                         print("--- importing FEM data took: %s seconds ---" % (cpuTime))                    
                     
+            nodeIndexL          = GetNodeIndex(feL)      #spatial index for boundary and sensor node lookups
             p2                  = [0, 0,-100*1e-3]
             p1                  = [0, 0, 100*1e-3]
             radius1             = 25*1e-3
-            nodeListJoint1      = feL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
+            nodeListJoint1      = nodeIndexL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
             pJoint1             = feL.GetNodePositionsMean(nodeListJoint1)
             nodeListJoint1Len   = len(nodeListJoint1)
             noodeWeightsJoint1  = [1/nodeListJoint1Len]*nodeListJoint1Len
@@ -75,7 +76,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
             p4                  = [304.19*1e-3,-100.01*1e-3,-100*1e-3]
             p3                  = [304.19*1e-3,-100.01*1e-3, 100*1e-3]
             radius2             = 36*1e-3
-            nodeListPist1       = feL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
+            nodeListPist1       = nodeIndexL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
             pJoint2             = feL.GetNodePositionsMean(nodeListPist1)
             nodeListPist1Len    = len(nodeListPist1)
             noodeWeightsPist1   = [1/nodeListPist1Len]*nodeListPist1Len
@@ -84,7 +85,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
                 p10             = [2879.2*1e-3,71.852*1e-3,74*1e-3]
                 p9              = [2879.2*1e-3,71.852*1e-3,-74*1e-3]
                 radius5         = 46*1e-3
-                nodeListJoint3  = feL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)
+                nodeListJoint3  = nodeIndexL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)
                 pJoint5         = feL.GetNodePositionsMean(nodeListJoint3)
                 nodeListJoint3Len= len(nodeListJoint3)
                 noodeWeightsJoint3  = [1/nodeListJoint3Len]*nodeListJoint3Len
@@ -100,24 +101,10 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         
             start_time          = time.time()
 
-            if self.loadFromSavedNPY:
-                    if self.mL != 0:
-                        feL.LoadFromFile('AbaqusMesh/feL_Optimised_Load',mode='PKL')
-                    else:
-                        feL.LoadFromFile('AbaqusMesh/feL_Optimised',mode='PKL')
-            else:
-                #feL.ComputeEigenmodes(self.nModes, excludeRigidBodyModes = 6, useSparseSolver = True)
-                #print("Lift boom eigen frequencies=", feL.GetEigenFrequenciesHz())
-                feL.ComputeHurtyCraigBamptonModes(boundaryNodesList=boundaryList, nEigenModes=self.nModes, 
-                                                    useSparseSolver=True,computationMode = HCBstaticModeSelection.RBE2) 
-          
-                print("ComputePostProcessingModes ... (may take a while)")
-                feL.ComputePostProcessingModes(material=mat,outputVariableType=varType2,)
-         
-                if self.mL != 0:  
-                    feL.SaveToFile('AbaqusMesh/feL_Optimised_Load', mode='PKL')
-                else:
-                    feL.SaveToFile('AbaqusMesh/feL_Optimised', mode='PKL')
+            # HCB modes + post-processing modes, reused from the reduced model cache if mesh and settings match;
+            # with sensorPostProcessingModes only at the strain sensor node
+            StressNode          = nodeIndexL.GetNodeAtPoint(np.array([ 0.696313858,  0.148134604, 0])) #8151
+            ComputeReducedModel(self, feL, boundaryList, mat, varType2, postProcessingNodes=[StressNode])
               
             if self.verboseMode:
                 print("Hurty-Craig Bampton modes... ")
@@ -139,6 +126,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         
        
             self.mbs.SetObjectParameter(objectNumber=LiftBoomFFRF['oFFRFreducedOrder'],parameterName='outputVariableTypeModeBasis',value=varType2)
+            AddFlexibleBody(self, 'LiftBoom', feL, mat, LiftBoomFFRF)
     
             Marker7             = self.mbs.AddMarker(MarkerSuperElementRigid(bodyNumber=LiftBoomFFRF['oFFRFreducedOrder'], meshNodeNumbers=np.array(nodeListJoint1), #these are the meshNodeNumbers
                                           weightingFactors=noodeWeightsJoint1))
@@ -152,7 +140,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
     
             [n2, b2]        = AddRigidBody(mainSys=self.mbs,inertia=iCube2,nodeType=exu.NodeType.RotationEulerParameters,position=LiftP,  
                                                rotationMatrix= RotationMatrixZ(mt.radians(self.theta1)), gravity= [0, -9.8066, 0],
-                                               graphicsDataList=[graphicsCOM2, graphicsBody7])
+                                               graphicsDataList=[graphicsCOM2, GetGraphicsBody('OptimisedLiftBoom', self.Headless)])
         
             Marker7         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[0, 0, 0]))                       #With Pillar     
             Marker8         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[304.19*1e-3, -100.01*1e-3, 0]))             #With Cylinder 1 VALUE WAS EDITED FROM 0.105
@@ -194,25 +182,10 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
                                                     self.p2], #initialize with 20 bar
                                 numberOfODE1Coordinates=2))
     
-        # #Not used
-        def CylinderFriction1(mbs, t, itemNumber, u, v, k, d, F0):
-
-                Ff = 0.2*StribeckFunction(v, muDynamic=1, muStaticOffset=1.5, regVel=1e-4)+(k*(u) + d*v + k*(u)**3-F0)
-                #print("Friction force simple:", Ff)
-                return Ff
-            
-        def UFfrictionSpringDamper(mbs, t, itemIndex, u, v, k, d, f0):
-            
-            Ff = 20*(Fc*tanh(4*(abs(v    )/vs))+(Fs-Fc)*((abs(v    )/vs)/((1/4)*(abs(v    )/vs)**2+3/4)**2))*np.sign(v )+sig2*v    *tanh(4)
-            #Ff = 0
-            print("Friction spring damper:", Ff)
-            return Ff
-          
-            
-
+        # friction force law in Models/Friction.py, evaluated as symbolic user function
         oFriction1       = self.mbs.AddObject(ObjectConnectorSpringDamper(markerNumbers=[Marker5, Marker8], referenceLength=0,stiffness=0,
                                                             damping=0, force=0, velocityOffset = 0., activeConnector = True,
-                                                            springForceUserFunction=UFfrictionSpringDamper,
+                                                            springForceUserFunction=FrictionUserFunction(self.mbs, LiftCylinderFriction),
                                                               visualization=VSpringDamper(show=False) ))
         
        
@@ -233,7 +206,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
 
         if self.StaticCase or self.StaticInitialization:
             #compute reference length of distance constraint 
-            self.mbs.Assemble()
+            AssembleSystem(self.mbs)
             mGHposition = self.mbs.GetMarkerOutput(Marker5, variableType=exu.OutputVariableType.Position, 
                                              configuration=exu.ConfigurationType.Initial)
             mRHposition = self.mbs.GetMarkerOutput(Marker8, variableType=exu.OutputVariableType.Position, 
@@ -270,14 +243,14 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
 
             return True
     
-        self.mbs.SetPreStepUserFunction(PreStepUserFunction) 
+        self.mbs.SetPreStepUserFunction(ProfiledCallback('preStep', PreStepUserFunction)) 
+        self.valveSignals = [[oHA1, 'inputTimeU1', [0.75, 1.2]]]  #actuator, input signal, stroke limits; for valve schedule
         if self.verboseMode:
             print('#joint nodes=',len(nodeListJoint3))
             
         FlexAngleSensor = False
         if self.Flexible:
-            StressNode  = feL.GetNodeAtPoint(np.array([ 0.696313858,  0.148134604, 0])) #8151
-            TipNode     = feL.GetNodeAtPoint(np.array([2.89144135, 0.0313413702,  0]))
+            TipNode     = nodeIndexL.GetNodeAtPoint(np.array([2.89144135, 0.0313413702,  0]))
             
             if self.verboseMode:
                 print("nMid=",nMid)
@@ -304,8 +277,9 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         
         
             self.dictSensors['StrainPoint']       = StrainF2
-            self.dictSensors['StressPoint']       = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], 
-                                                        storeInternal=True, sensorUserFunction=UFStressData))
+            if self.StressSensors: #otherwise stress is derived from StrainPoint after the run, see GetStressSensorData
+                self.dictSensors['StressPoint']   = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], 
+                                                        storeInternal=True, sensorUserFunction=ProfiledCallback('stressSensor', UFStressData)))
            
         if oHA1 != None:
             sForce          = self.mbs.AddSensor(SensorObject(objectNumber=oHA1, storeInternal=True, outputVariableType=exu.OutputVariableType.Force))
@@ -325,7 +299,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
             
         #+++++++++++++++++++++++++++++++++++++++++++++++++++
         #assemble and solve    
-        self.mbs.Assemble()
+        AssembleSystem(self.mbs)
 
         self.simulationSettings = exu.SimulationSettings()   
         self.simulationSettings.solutionSettings.sensorsWritePeriod = self.endTime / (self.nStepsTotal)
@@ -341,6 +315,7 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
         # self.simulationSettings.displayComputationTime                   = True
         self.simulationSettings.linearSolverSettings.ignoreSingularJacobian=True
         self.simulationSettings.timeIntegration.generalizedAlpha.spectralRadius  = 0.9
+        ConfigureSolutionFile(self)   # binary solution file with NNHydraulics(solutionRecording=...)
         self.SC.visualizationSettings.nodes.show = False
         #self.SC.visualizationSettings.contour.outputVariable = varType1
         
@@ -358,63 +333,9 @@ def OptimisedLiftBoom(self, theta1, p1, p2):
             exu.StartRenderer()
         
         if self.StaticCase or self.StaticInitialization:
-            self.mbs.variables['isStatics'] = True
-            self.simulationSettings.staticSolver.newton.relativeTolerance = 1e-10
-            # self.simulationSettings.staticSolver.stabilizerODE2term = 2
-            self.simulationSettings.staticSolver.verboseMode = self.verboseMode
-            self.simulationSettings.staticSolver.numberOfLoadSteps = 10
-            self.simulationSettings.staticSolver.constrainODE1coordinates = True #constrain pressures to initial values
-        
-            exu.SuppressWarnings(True)
-            self.mbs.SolveStatic(self.simulationSettings, 
-                            updateInitialValues=True) #use solution as new initial values for next simulation
-            exu.SuppressWarnings(False)
-            
-            #now deactivate distance constraint:
-            # self.mbs.SetObjectParameter(oDC, 'activeConnector', False)
-            force = self.mbs.GetObjectOutput(oDC, variableType=exu.OutputVariableType.Force)
-            if self.verboseMode:
-                print('initial force=', force)
-            
-            #deactivate distance constraint
-            self.mbs.SetObjectParameter(oDC, 'activeConnector', False)
-            
-            #overwrite pressures:
-            if oHA1 != None:
-                dictHA1 = self.mbs.GetObject(oHA1)
-                #print('dictHA1=',dictHA1)
-                nodeHA1 = dictHA1['nodeNumbers'][0]
-                A_HA1 = dictHA1['chamberCrossSection0']
-                pDiff = force/A_HA1
-            
-                # #now we would like to reset the pressures:
-                # #2) change the initial values in the system vector
-            
-                sysODE1 = self.mbs.systemData.GetODE1Coordinates(configuration=exu.ConfigurationType.Initial)
-                nODE1index = self.mbs.GetNodeODE1Index(nodeHA1) #coordinate index for node nodaHA1
-                if self.verboseMode:
-                    # print('sysODE1=',sysODE1)
-                    print('p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-                sysODE1[nODE1index] += pDiff #add required difference to pressure
-    
-                #now write the updated system variables:
-                self.mbs.systemData.SetODE1Coordinates(coordinates=sysODE1, configuration=exu.ConfigurationType.Initial)
-    
-                if self.verboseMode:
-                    print('new p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-
-            self.mbs.variables['isStatics'] = False
+            SolveStaticEquilibrium(self, 'OptimisedLiftBoom', [theta1], [[oDC, oHA1]])
 
 
-        if not self.StaticCase:
-            exu.SolveDynamic(self.mbs, simulationSettings=self.simulationSettings,
-                                solverType=exu.DynamicSolverType.TrapezoidalIndex2)
-            
-            
-
-        if self.Visualization:
-            # self.SC.WaitForRenderEngineStopFlag()
-            exu.StopRenderer()
 
 def LiftBoom(self, theta1, p1, p2):
         
@@ -424,6 +345,7 @@ def LiftBoom(self, theta1, p1, p2):
         self.p1                     = p1
         self.p2                     = p2                         
         self.dictSensors            = {}
+        self.flexibleBodies         = {}     # flexible bodies for field recovery, see FieldRecovery.py
         #self.verboseMode            = True
         self.StaticInitialization   = True
         Emodulus                    = 2.1e11
@@ -442,7 +364,7 @@ def LiftBoom(self, theta1, p1, p2):
         
         # Definintion of pillar as body in Exudyn and node n1
         [n1, b1]                    = AddRigidBody(mainSys=self.mbs,inertia=iCube1,nodeType=exu.NodeType.RotationEulerParameters,
-                                                   position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, graphicsBody1]
+                                                   position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, GetGraphicsBody('Pillar', self.Headless)]
                                                    )
         Marker3                     = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark3))                     #With Ground
         Marker4                     = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark4))            #Lift Boom
@@ -458,10 +380,9 @@ def LiftBoom(self, theta1, p1, p2):
         
             if not self.loadFromSavedNPY: 
                 start_time              = time.time()
-                nodes1                  = feL.ImportFromAbaqusInputFile(filePath+'.inp', typeName='Part', name='Job')
-                feL.ReadMassMatrixFromAbaqus(fileName=filePath + '_MASS2.mtx')             #Load mass matrix
-                feL.ReadStiffnessMatrixFromAbaqus(fileName=filePath + '_STIF2.mtx')        #Load stiffness matrix
-                feL.SaveToFile(filePath,mode='PKL')
+                nodes1                  = ImportAbaqusInputFile(feL, filePath+'.inp', typeName='Part')
+                ReadAbaqusMatrices(feL, filePath + '_MASS2.mtx', filePath + '_STIF2.mtx')    #Load mass and stiffness matrix
+                SaveFEM(feL, filePath)
             
                 if self.verboseMode:
                     print("--- saving LiftBoom FEM Abaqus data took: %s seconds ---" % (time.time() - start_time)) 
@@ -472,7 +393,7 @@ def LiftBoom(self, theta1, p1, p2):
                         print('importing Abaqus FEM data structure of Lift Boom...')
                     
                     start_time          = time.time()
-                    feL.LoadFromFile(filePath,mode='PKL')
+                    LoadFEM(feL, filePath)
                     cpuTime             = time.time() - start_time
                     
                     if self.verboseMode:
@@ -480,10 +401,11 @@ def LiftBoom(self, theta1, p1, p2):
                     
         
                     
+            nodeIndexL          = GetNodeIndex(feL)      #spatial index for boundary and sensor node lookups
             p2                  = [0, 0,-100*1e-3]
             p1                  = [0, 0, 100*1e-3]
             radius1             = 25*1e-3
-            nodeListJoint1      = feL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
+            nodeListJoint1      = nodeIndexL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
             pJoint1             = feL.GetNodePositionsMean(nodeListJoint1)
             nodeListJoint1Len   = len(nodeListJoint1)
             noodeWeightsJoint1  = [1/nodeListJoint1Len]*nodeListJoint1Len
@@ -492,7 +414,7 @@ def LiftBoom(self, theta1, p1, p2):
             p4                  = [304.19*1e-3,-100.01*1e-3,-100*1e-3]
             p3                  = [304.19*1e-3,-100.01*1e-3, 100*1e-3]
             radius2             = 36*1e-3
-            nodeListPist1       = feL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
+            nodeListPist1       = nodeIndexL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
             pJoint2             = feL.GetNodePositionsMean(nodeListPist1)
             nodeListPist1Len    = len(nodeListPist1)
             noodeWeightsPist1   = [1/nodeListPist1Len]*nodeListPist1Len
@@ -501,7 +423,7 @@ def LiftBoom(self, theta1, p1, p2):
                 p10             = [2879.2*1e-3,71.852*1e-3,74*1e-3]
                 p9              = [2879.2*1e-3,71.852*1e-3,-74*1e-3]
                 radius5         = 46*1e-3
-                nodeListJoint3  = feL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)
+                nodeListJoint3  = nodeIndexL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)
                 pJoint5         = feL.GetNodePositionsMean(nodeListJoint3)
                 nodeListJoint3Len= len(nodeListJoint3)
                 noodeWeightsJoint3  = [1/nodeListJoint3Len]*nodeListJoint3Len
@@ -517,24 +439,10 @@ def LiftBoom(self, theta1, p1, p2):
         
             start_time          = time.time()
 
-            if self.loadFromSavedNPY:
-                    if self.mL != 0:
-                        feL.LoadFromFile('AbaqusMesh/feL_Load',mode='PKL')
-                    else:
-                        feL.LoadFromFile('AbaqusMesh/feL',mode='PKL')
-            else:
-                #feL.ComputeEigenmodes(self.nModes, excludeRigidBodyModes = 6, useSparseSolver = True)
-                #print("Lift boom eigen frequencies=", feL.GetEigenFrequenciesHz())
-                feL.ComputeHurtyCraigBamptonModes(boundaryNodesList=boundaryList, nEigenModes=self.nModes, 
-                                                    useSparseSolver=True,computationMode = HCBstaticModeSelection.RBE2) 
-          
-                print("ComputePostProcessingModes ... (may take a while)")
-                feL.ComputePostProcessingModes(material=mat,outputVariableType=varType2,)
-         
-                if self.mL != 0:  
-                    feL.SaveToFile('AbaqusMesh/feL_Load', mode='PKL')
-                else:
-                    feL.SaveToFile('AbaqusMesh/feL', mode='PKL')
+            # HCB modes + post-processing modes, reused from the reduced model cache if mesh and settings match;
+            # with sensorPostProcessingModes only at the strain sensor node
+            StressNode          = nodeIndexL.GetNodeAtPoint(np.array([0.77515769,  0.148215622, 0])) #8272
+            ComputeReducedModel(self, feL, boundaryList, mat, varType2, postProcessingNodes=[StressNode])
               
             if self.verboseMode:
                 print("Hurty-Craig Bampton modes... ")
@@ -556,6 +464,7 @@ def LiftBoom(self, theta1, p1, p2):
         
        
             self.mbs.SetObjectParameter(objectNumber=LiftBoomFFRF['oFFRFreducedOrder'],parameterName='outputVariableTypeModeBasis',value=varType2)
+            AddFlexibleBody(self, 'LiftBoom', feL, mat, LiftBoomFFRF)
     
             Marker7             = self.mbs.AddMarker(MarkerSuperElementRigid(bodyNumber=LiftBoomFFRF['oFFRFreducedOrder'], meshNodeNumbers=np.array(nodeListJoint1), #these are the meshNodeNumbers
                                           weightingFactors=noodeWeightsJoint1))
@@ -569,7 +478,7 @@ def LiftBoom(self, theta1, p1, p2):
 
             [n2, b2]        = AddRigidBody(mainSys=self.mbs,inertia=iCube2,nodeType=exu.NodeType.RotationEulerParameters,position=LiftP,  
                                            rotationMatrix= RotationMatrixZ(mt.radians(self.theta1)), gravity= [0, -9.8066, 0],
-                                           graphicsDataList=[graphicsCOM2, graphicsBody2])
+                                           graphicsDataList=[graphicsCOM2, GetGraphicsBody('LiftBoom', self.Headless)])
     
             Marker7         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[0, 0, 0]))                       #With Pillar     
             Marker8         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[0.3025, -0.105, 0]))             #With Cylinder 1
@@ -611,25 +520,10 @@ def LiftBoom(self, theta1, p1, p2):
                                                     self.p2], #initialize with 20 bar
                                 numberOfODE1Coordinates=2))
     
-        # #Not used
-        def CylinderFriction1(mbs, t, itemNumber, u, v, k, d, F0):
-
-                Ff = 0.2*StribeckFunction(v, muDynamic=1, muStaticOffset=1.5, regVel=1e-4)+(k*(u) + d*v + k*(u)**3-F0)
-                #print("Friction simple:", Ff)
-                return Ff
-            
-        def UFfrictionSpringDamper(mbs, t, itemIndex, u, v, k, d, f0):
-            
-            Ff = 20*(Fc*tanh(4*(abs(v    )/vs))+(Fs-Fc)*((abs(v    )/vs)/((1/4)*(abs(v    )/vs)**2+3/4)**2))*np.sign(v )+sig2*v    *tanh(4)
-            #Ff = 0
-            print("Friction spring damper:", Ff)
-            return Ff
-          
-            
-
+        # friction force law in Models/Friction.py, evaluated as symbolic user function
         oFriction1       = self.mbs.AddObject(ObjectConnectorSpringDamper(markerNumbers=[Marker5, Marker8], referenceLength=0,stiffness=0,
                                                             damping=0, force=0, velocityOffset = 0., activeConnector = True,
-                                                            springForceUserFunction=UFfrictionSpringDamper,
+                                                            springForceUserFunction=FrictionUserFunction(self.mbs, LiftCylinderFriction),
                                                               visualization=VSpringDamper(show=False) ))
         
        
@@ -650,7 +544,7 @@ def LiftBoom(self, theta1, p1, p2):
 
         if self.StaticCase or self.StaticInitialization:
             #compute reference length of distance constraint 
-            self.mbs.Assemble()
+            AssembleSystem(self.mbs)
             mGHposition = self.mbs.GetMarkerOutput(Marker5, variableType=exu.OutputVariableType.Position, 
                                              configuration=exu.ConfigurationType.Initial)
             mRHposition = self.mbs.GetMarkerOutput(Marker8, variableType=exu.OutputVariableType.Position, 
@@ -687,13 +581,13 @@ def LiftBoom(self, theta1, p1, p2):
 
             return True
     
-        self.mbs.SetPreStepUserFunction(PreStepUserFunction) 
+        self.mbs.SetPreStepUserFunction(ProfiledCallback('preStep', PreStepUserFunction)) 
+        self.valveSignals = [[oHA1, 'inputTimeU1', [0.75, 1.2]]]  #actuator, input signal, stroke limits; for valve schedule
         if self.verboseMode:
             print('#joint nodes=',len(nodeListJoint3))
 
         if self.Flexible:
-            StressNode  = feL.GetNodeAtPoint(np.array([0.77515769,  0.148215622, 0])) #8272
-            TipNode     = feL.GetNodeAtPoint(np.array([2.89461064, 0.0254453365,  0])) #1096
+            TipNode     = nodeIndexL.GetNodeAtPoint(np.array([2.89461064, 0.0254453365,  0])) #1096
             
             if self.verboseMode:
                 print("nMid=",nMid)
@@ -719,14 +613,19 @@ def LiftBoom(self, theta1, p1, p2):
         
         
             self.dictSensors['StrainPoint']       = StrainF2
-            self.dictSensors['StressPoint']       = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], 
-                                                        storeInternal=True, sensorUserFunction=UFStressData))
+            if self.StressSensors: #otherwise stress is derived from StrainPoint after the run, see GetStressSensorData
+                self.dictSensors['StressPoint']   = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], 
+                                                        storeInternal=True, sensorUserFunction=ProfiledCallback('stressSensor', UFStressData)))
            
         if oHA1 != None:
             sForce          = self.mbs.AddSensor(SensorObject(objectNumber=oHA1, storeInternal=True, outputVariableType=exu.OutputVariableType.Force))
             self.dictSensors['sForce']=sForce
             sDistance       = self.mbs.AddSensor(SensorObject(objectNumber=oHA1, storeInternal=True, outputVariableType=exu.OutputVariableType.Distance))
             self.dictSensors['sDistance']=sDistance
+            
+            if not self.Flexible: #angle of the flexible lift boom is measured at its rigid body node above
+                sAngle      = self.mbs.AddSensor(SensorBody(bodyNumber=b2, storeInternal=True, outputVariableType=exu.OutputVariableType.Rotation))   
+                self.dictSensors['sAngle']=sAngle
     
             sVelocity       = self.mbs.AddSensor(SensorObject(objectNumber=oHA1, storeInternal=True, outputVariableType=exu.OutputVariableType.VelocityLocal))
             self.dictSensors['sVelocity']=sVelocity
@@ -736,7 +635,7 @@ def LiftBoom(self, theta1, p1, p2):
             
         #+++++++++++++++++++++++++++++++++++++++++++++++++++
         #assemble and solve    
-        self.mbs.Assemble()
+        AssembleSystem(self.mbs)
 
         self.simulationSettings = exu.SimulationSettings()   
         self.simulationSettings.solutionSettings.sensorsWritePeriod = self.endTime / (self.nStepsTotal)
@@ -752,6 +651,7 @@ def LiftBoom(self, theta1, p1, p2):
         # self.simulationSettings.displayComputationTime                   = True
         self.simulationSettings.linearSolverSettings.ignoreSingularJacobian=True
         self.simulationSettings.timeIntegration.generalizedAlpha.spectralRadius  = 0.9
+        ConfigureSolutionFile(self)   # binary solution file with NNHydraulics(solutionRecording=...)
         self.SC.visualizationSettings.nodes.show = False
         #self.SC.visualizationSettings.contour.outputVariable = varType1
         
@@ -769,63 +669,9 @@ def LiftBoom(self, theta1, p1, p2):
             exu.StartRenderer()
         
         if self.StaticCase or self.StaticInitialization:
-            self.mbs.variables['isStatics'] = True
-            self.simulationSettings.staticSolver.newton.relativeTolerance = 1e-10
-            # self.simulationSettings.staticSolver.stabilizerODE2term = 2
-            self.simulationSettings.staticSolver.verboseMode = self.verboseMode
-            self.simulationSettings.staticSolver.numberOfLoadSteps = 10
-            self.simulationSettings.staticSolver.constrainODE1coordinates = True #constrain pressures to initial values
-        
-            exu.SuppressWarnings(True)
-            self.mbs.SolveStatic(self.simulationSettings, 
-                            updateInitialValues=True) #use solution as new initial values for next simulation
-            exu.SuppressWarnings(False)
-            
-            #now deactivate distance constraint:
-            # self.mbs.SetObjectParameter(oDC, 'activeConnector', False)
-            force = self.mbs.GetObjectOutput(oDC, variableType=exu.OutputVariableType.Force)
-            if self.verboseMode:
-                print('initial force=', force)
-            
-            #deactivate distance constraint
-            self.mbs.SetObjectParameter(oDC, 'activeConnector', False)
-            
-            #overwrite pressures:
-            if oHA1 != None:
-                dictHA1 = self.mbs.GetObject(oHA1)
-                #print('dictHA1=',dictHA1)
-                nodeHA1 = dictHA1['nodeNumbers'][0]
-                A_HA1 = dictHA1['chamberCrossSection0']
-                pDiff = force/A_HA1
-            
-                # #now we would like to reset the pressures:
-                # #2) change the initial values in the system vector
-            
-                sysODE1 = self.mbs.systemData.GetODE1Coordinates(configuration=exu.ConfigurationType.Initial)
-                nODE1index = self.mbs.GetNodeODE1Index(nodeHA1) #coordinate index for node nodaHA1
-                if self.verboseMode:
-                    # print('sysODE1=',sysODE1)
-                    print('p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-                sysODE1[nODE1index] += pDiff #add required difference to pressure
-    
-                #now write the updated system variables:
-                self.mbs.systemData.SetODE1Coordinates(coordinates=sysODE1, configuration=exu.ConfigurationType.Initial)
-    
-                if self.verboseMode:
-                    print('new p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-
-            self.mbs.variables['isStatics'] = False
+            SolveStaticEquilibrium(self, 'LiftBoom', [theta1], [[oDC, oHA1]])
 
 
-        if not self.StaticCase:
-            exu.SolveDynamic(self.mbs, simulationSettings=self.simulationSettings,
-                                solverType=exu.DynamicSolverType.TrapezoidalIndex2)
-            
-            
-
-        if self.Visualization:
-            # self.SC.WaitForRenderEngineStopFlag()
-            exu.StopRenderer()
     
 
 
@@ -836,6 +682,8 @@ def LiftBoom(self, theta1, p1, p2):
 def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
 
 
+       feL              = FEMinterface()
+       feT              = FEMinterface()
        self.theta1      = theta1
        self.theta2      = theta2
        self.p1          = p1
@@ -844,6 +692,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
        self.p4          = p4
                      
        self.dictSensors = {}
+       self.flexibleBodies = {}
        
        self.StaticInitialization = True
        Emodulus                  = 2.1e11
@@ -861,7 +710,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
        
        # Definintion of pillar as body in Exudyn and node n1
        [n1, b1]        = AddRigidBody(mainSys=self.mbs,inertia=iCube1,nodeType=exu.NodeType.RotationEulerParameters,
-                                    position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, graphicsBody1]
+                                    position=PillarP,rotationMatrix=np.diag([1, 1, 1]),gravity=[0, -9.8066, 0] ,graphicsDataList=[graphicsCOM1, GetGraphicsBody('Pillar', self.Headless)]
                                     )
        Marker3         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark3))                     #With Ground
        Marker4         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b1, localPosition=Mark4))            #Lift Boom
@@ -878,15 +727,13 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            if not self.loadFromSavedNPY: 
                start_time      = time.time()
           
-               nodes1          = feL.ImportFromAbaqusInputFile(filePath+'.inp', typeName='Part', name='Job-1')
-               feL.ReadMassMatrixFromAbaqus(fileName=filePath + '_MASS2.mtx')             #Load mass matrix
-               feL.ReadStiffnessMatrixFromAbaqus(fileName=filePath + '_STIF2.mtx')        #Load stiffness matrix
-               feL.SaveToFile(filePath,mode='PKL')
+               nodes1          = ImportAbaqusInputFile(feL, filePath+'.inp', typeName='Part')
+               ReadAbaqusMatrices(feL, filePath + '_MASS2.mtx', filePath + '_STIF2.mtx')    #Load mass and stiffness matrix
+               SaveFEM(feL, filePath)
           
-               nodes2          = feT.ImportFromAbaqusInputFile(filePath2+'.inp', typeName='Part', name='Job-2')
-               feT.ReadMassMatrixFromAbaqus(fileName=filePath2 + '_MASS2.mtx')             #Load mass matrix
-               feT.ReadStiffnessMatrixFromAbaqus(fileName=filePath2 + '_STIF2.mtx')        #Load stiffness matrix
-               feT.SaveToFile(filePath2,mode='PKL')
+               nodes2          = ImportAbaqusInputFile(feT, filePath2+'.inp', typeName='Part')
+               ReadAbaqusMatrices(feT, filePath2 + '_MASS2.mtx', filePath2 + '_STIF2.mtx')    #Load mass and stiffness matrix
+               SaveFEM(feT, filePath2)
           
                if self.verboseMode:
                   print("--- saving LiftBoom FEM Abaqus data took: %s seconds ---" % (time.time() - start_time)) 
@@ -897,8 +744,8 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                
                start_time = time.time()
           
-               feL.LoadFromFile(filePath,mode='PKL')
-               feT.LoadFromFile(filePath2,mode='PKL')
+               LoadFEM(feL, filePath)
+               LoadFEM(feT, filePath2)
           
                cpuTime = time.time() - start_time
                if self.verboseMode:
@@ -906,10 +753,12 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                    
        
                    
+           nodeIndexL          = GetNodeIndex(feL)      #spatial index for boundary and sensor node lookups
+           nodeIndexT          = GetNodeIndex(feT)
            p2                  = [0, 0,-100*1e-3]
            p1                  = [0, 0, 100*1e-3]
            radius1             = 25*1e-3
-           nodeListJoint1      = feL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
+           nodeListJoint1      = nodeIndexL.GetNodesOnCylinder(p1, p2, radius1, tolerance=1e-4) 
            pJoint1             = feL.GetNodePositionsMean(nodeListJoint1)
            nodeListJoint1Len   = len(nodeListJoint1)
            noodeWeightsJoint1  = [1/nodeListJoint1Len]*nodeListJoint1Len
@@ -919,7 +768,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p4                  = [304.19*1e-3,-100.01*1e-3,-100*1e-3]
            p3                  = [304.19*1e-3,-100.01*1e-3, 100*1e-3]
            radius2             = 36*1e-3
-           nodeListPist1       = feL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
+           nodeListPist1       = nodeIndexL.GetNodesOnCylinder(p3, p4, radius2, tolerance=1e-2)  
            pJoint2             = feL.GetNodePositionsMean(nodeListPist1)
            nodeListPist1Len    = len(nodeListPist1)
            noodeWeightsPist1   = [1/nodeListPist1Len]*nodeListPist1Len
@@ -928,7 +777,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p6                  = [1258e-3,194.59e-3,  65.701e-3]
            p5                  = [1258e-3,194.59e-3, -65.701e-3]
            radius3             = 32e-3
-           nodeListCyl2        = feL.GetNodesOnCylinder(p5, p6, radius3, tolerance=1e-2)  
+           nodeListCyl2        = nodeIndexL.GetNodesOnCylinder(p5, p6, radius3, tolerance=1e-2)  
            pJoint3             = feL.GetNodePositionsMean(nodeListCyl2)
            nodeListCyl2Len     = len(nodeListCyl2)
            noodeWeightsCyl2    = [1/nodeListCyl2Len]*nodeListCyl2Len 
@@ -937,7 +786,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p8                  = [2685e-3,0.15e-03,  74e-3]
            p7                  = [2685e-3,0.15e-03, -74e-3]
            radius4             = 32e-3
-           nodeListJoint2      = feL.GetNodesOnCylinder(p7, p8, radius4, tolerance=1e-4)  
+           nodeListJoint2      = nodeIndexL.GetNodesOnCylinder(p7, p8, radius4, tolerance=1e-4)  
            pJoint4             = feL.GetNodePositionsMean(nodeListJoint2)
            nodeListJoint2Len   = len(nodeListJoint2)
            noodeWeightsJoint2  = [1/nodeListJoint2Len]*nodeListJoint2Len
@@ -946,7 +795,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p10                 = [2875e-3,15.15e-3,    74e-3]
            p9                  = [2875e-3,15.15e-3,   -74e-3]
            radius5             = 4.60e-002
-           nodeListJoint3      = feL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)  
+           nodeListJoint3      = nodeIndexL.GetNodesOnCylinder(p9, p10, radius5, tolerance=1e-4)  
            pJoint5             = feL.GetNodePositionsMean(nodeListJoint3)
            nodeListJoint3Len   = len(nodeListJoint3)
            noodeWeightsJoint3  = [1/nodeListJoint3Len]*nodeListJoint3Len
@@ -955,7 +804,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p12                 = [0, 0,  88e-3]
            p11                 = [0, 0, -88e-3]
            radius6             = 48e-3
-           nodeListJoint1T     = feT.GetNodesOnCylinder(p11, p12, radius6, tolerance=1e-4) 
+           nodeListJoint1T     = nodeIndexT.GetNodesOnCylinder(p11, p12, radius6, tolerance=1e-4) 
            pJoint1T            = feT.GetNodePositionsMean(nodeListJoint1T)
            nodeListJoint1TLen  = len(nodeListJoint1T)
            noodeWeightsJoint1T = [1/nodeListJoint1TLen]*nodeListJoint1TLen
@@ -964,7 +813,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p14                 = [-95e-3,243.2e-3,  55.511e-3]
            p13                 = [-95e-3,243.2e-3, -55.511e-3]
            radius7             = 26e-3
-           nodeListPist1T      = feT.GetNodesOnCylinder(p13, p14, radius7, tolerance=1e-4)  
+           nodeListPist1T      = nodeIndexT.GetNodesOnCylinder(p13, p14, radius7, tolerance=1e-4)  
            pJoint2T            = feT.GetNodePositionsMean(nodeListPist1T)
            nodeListPist1TLen   = len(nodeListPist1T)
            noodeWeightsPist1T  = [1/nodeListPist1TLen]*nodeListPist1TLen
@@ -973,7 +822,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            p16                 = [-415e-3,287e-3, 48.011e-3]
            p15                 = [-415e-3,287e-3, -48.011e-3]
            radius8             = 2.3e-002
-           nodeListExtT        = feT.GetNodesOnCylinder(p15, p16, radius8, tolerance=1e-4)  
+           nodeListExtT        = nodeIndexT.GetNodesOnCylinder(p15, p16, radius8, tolerance=1e-4)  
            pExtT               = feT.GetNodePositionsMean(nodeListExtT)
            nodeListExTLen      = len(nodeListExtT)
            noodeWeightsExt1T   = [1/nodeListExTLen]*nodeListExTLen
@@ -985,23 +834,15 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
    
            start_time          = time.time()
 
-           if self.loadFromSavedNPY:
-               feL.LoadFromFile('AbaqusMesh/feL',mode='PKL')
-               feT.LoadFromFile('AbaqusMesh/feT',mode='PKL')
-
-          
-           else:
-               feL.ComputeHurtyCraigBamptonModes(boundaryNodesList=boundaryListL, nEigenModes=self.nModes, 
-                                                   useSparseSolver=True,computationMode = HCBstaticModeSelection.RBE2) 
-               feT.ComputeHurtyCraigBamptonModes(boundaryNodesList=boundaryListT, nEigenModes=self.nModes, 
-                                                         useSparseSolver=True,computationMode = HCBstaticModeSelection.RBE2) 
-         
-               print("ComputePostProcessingModes ... (may take a while)")
-               feL.ComputePostProcessingModes(material=mat,outputVariableType=varType1,)
-               feT.ComputePostProcessingModes(material=mat,outputVariableType=varType1,)
-        
-               feL.SaveToFile('AbaqusMesh/feL', mode='PKL')
-               feT.SaveToFile('AbaqusMesh/feT', mode='PKL')
+           # HCB modes + post-processing modes, reused from the reduced model cache if mesh and settings match;
+           # lift and tilt boom are reduced concurrently in worker processes;
+           # with sensorPostProcessingModes post-processing modes only at the strain sensor nodes
+           StressNode      = nodeIndexL.GetNodeAtPoint(np.array([0.639392078,  0.110807151, 0.0799999982]))
+           StrainPoint     = nodeIndexT.GetNodeAtPoint(np.array([0.241222218,  0.347000003, 0.0390110984]))
+           reduction = ReductionPipeline(self)
+           reduction.Add(feL, boundaryListL, mat, varType1, postProcessingNodes=[StressNode])
+           reduction.Add(feT, boundaryListT, mat, varType1, postProcessingNodes=[StrainPoint])
+           reduction.Run()
 
            if self.verboseMode:
                print("Hurty-Craig Bampton modes... ")
@@ -1019,6 +860,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                              massProportionalDamping = 0, stiffnessProportionalDamping = 3.35e-3 ,color=colLift,)
            self.mbs.SetObjectParameter(objectNumber=LiftBoomFFRF['oFFRFreducedOrder'],parameterName='outputVariableTypeModeBasis',
                                            value=varType1)
+           AddFlexibleBody(self, 'LiftBoom', feL, mat, LiftBoomFFRF)
    
            Marker7             = self.mbs.AddMarker(MarkerSuperElementRigid(bodyNumber=LiftBoomFFRF['oFFRFreducedOrder'],
                                          meshNodeNumbers=np.array(nodeListJoint1), #these are the meshNodeNumbers
@@ -1043,7 +885,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            iCube2          = RigidBodyInertia(mass=m2, com=pMid2,inertiaTensor=Inertia2,inertiaTensorAtCOM=True)
            graphicsCOM2    = GraphicsDataBasis(origin=iCube2.com, length=2*W2)
            [n2, b2]        = AddRigidBody(mainSys=self.mbs,inertia=iCube2,nodeType=exu.NodeType.RotationEulerParameters,position=LiftP,  
-                                               rotationMatrix= RotationMatrixZ(mt.radians(self.theta1)), gravity= [0, -9.8066, 0], graphicsDataList=[graphicsCOM2, graphicsBody2])
+                                               rotationMatrix= RotationMatrixZ(mt.radians(self.theta1)), gravity= [0, -9.8066, 0], graphicsDataList=[graphicsCOM2, GetGraphicsBody('LiftBoom', self.Headless)])
         
            Marker7         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[0, 0, 0]))                       #With Pillar    
            Marker8         = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b2, localPosition=[0.3025, -0.105, 0]))             #With Cylinder 1
@@ -1054,7 +896,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
       
        if self.StaticCase or self.StaticInitialization:
                 #compute reference length of distance constraint 
-                self.mbs.Assemble()
+                AssembleSystem(self.mbs)
                 TiltP = self.mbs.GetMarkerOutput(Marker11, variableType=exu.OutputVariableType.Position, configuration=exu.ConfigurationType.Initial)
        
        if not self.Flexible: 
@@ -1062,7 +904,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            graphicsCOM3    = GraphicsDataBasis(origin=iCube3.com, length=2*W3)
            [n3, b3]        = AddRigidBody(mainSys=self.mbs,inertia=iCube3, nodeType=exu.NodeType.RotationEulerParameters,
                                    position=TiltP, rotationMatrix=RotationMatrixZ(mt.radians(self.theta2)),
-                                   gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM3, graphicsBody3])
+                                   gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM3, GetGraphicsBody('TiltBoom', self.Headless)])
            Marker13        = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b3, localPosition=[0, 0, 0]))                        #With LIft Boom 
            Marker14        = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b3, localPosition=[-0.095, 0.24043237, 0])) 
            MarkerEx        = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b3, localPosition=[-0.415,0.295, 0]))
@@ -1079,6 +921,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
        
            self.mbs.SetObjectParameter(objectNumber=TiltBoomFFRF['oFFRFreducedOrder'],parameterName='outputVariableTypeModeBasis',
                                            value=varType1)
+           AddFlexibleBody(self, 'TiltBoom', feT, mat, TiltBoomFFRF)
        
            Marker13        = self.mbs.AddMarker(MarkerSuperElementRigid(bodyNumber=TiltBoomFFRF['oFFRFreducedOrder'], 
                                                                              meshNodeNumbers=np.array(nodeListJoint1T), #these are the meshNodeNumbers
@@ -1092,8 +935,6 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                                                              meshNodeNumbers=np.array(nodeListExtT), #these are the meshNodeNumbers
                                                                              weightingFactors=noodeWeightsExt1T))  
        
-           StrainPoint     = feT.GetNodeAtPoint(np.array([0.241222218,  0.347000003, 0.0390110984]))
-       
        #Revolute Joint
        self.mbs.AddObject(GenericJoint(markerNumbers=[Marker4, Marker7],constrainedAxes=[1,1,1,1,1,0],
                                        visualization=VObjectJointGeneric(axesRadius=0.18*0.263342,axesLength=1.1*0.263342)))
@@ -1101,7 +942,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
        ###########################################
        if self.StaticCase or self.StaticInitialization:
            #compute reference length of distance constraint 
-           self.mbs.Assemble()
+           AssembleSystem(self.mbs)
            Bracket1L = self.mbs.GetMarkerOutput(Marker10, variableType=exu.OutputVariableType.Position, 
                                             configuration=exu.ConfigurationType.Initial)
            
@@ -1152,15 +993,13 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                                                              [0,              0, 0.268644]]),
                                                                                inertiaTensorAtCOM=True)
 
-       graphicsBody4   = GraphicsDataFromSTLfile(fileName4, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-       graphicsBody4   = AddEdgesAndSmoothenNormals(graphicsBody4, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
        graphicsCOM4    = GraphicsDataBasis(origin=iCube4.com, length=2*W4)
        [n4, b4]        = AddRigidBody(mainSys=self.mbs,inertia=iCube4,  # includes COM
                                                    nodeType=exu.NodeType.RotationEulerParameters,
                                                    position=Bracket1L,  # pMid2
                                                    rotationMatrix=RotationMatrixZ(mt.radians(157.11555963638386)), #-0.414835768117858,self.theta3+3.5
                                                    gravity= [0, -9.8066, 0],
-                                                   graphicsDataList=[graphicsCOM4, graphicsBody4])
+                                                   graphicsDataList=[graphicsCOM4, GetGraphicsBody('Bracket1', self.Headless)])
                  
         # # # # 5th Body: Bracket 2
        pMid5           = np.array([0.212792, 0, 0])  # center of mass, body0
@@ -1170,14 +1009,12 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                                                                [0,              0,  0.216772]]),
                                                                                inertiaTensorAtCOM=True)
                  
-       graphicsBody5   = GraphicsDataFromSTLfile(fileName5, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-       graphicsBody5   = AddEdgesAndSmoothenNormals(graphicsBody5, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
        graphicsCOM5    = GraphicsDataBasis(origin=iCube5.com, length=2*W5)
        [n5, b5]        = AddRigidBody(mainSys=self.mbs,inertia=iCube5,  # includes COM
                                                    nodeType=exu.NodeType.RotationEulerParameters,
                                                    position=Bracket1B,  # pMid2
                                                    rotationMatrix=RotationMatrixZ(mt.radians(194.03103052691895)) ,   #-5, 140
-                                                   gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM5, graphicsBody5])
+                                                   gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM5, GetGraphicsBody('Bracket2', self.Headless)])
                  
              
                  
@@ -1194,14 +1031,12 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                                                         [0,      0,  28.70]]),
                                                                         inertiaTensorAtCOM=True)
           
-       graphicsBody6   = GraphicsDataFromSTLfile(fileName6, color4blue,verbose=False, invertNormals=True,invertTriangles=True)
-       graphicsBody6   = AddEdgesAndSmoothenNormals(graphicsBody6, edgeAngle=0.25*pi,addEdges=True, smoothNormals=True)
        graphicsCOM6    = GraphicsDataBasis(origin=iCube6.com, length=2*W5)
        [n6, b6]        = AddRigidBody(mainSys=self.mbs,inertia=iCube6,  # includes COM
                                             nodeType=exu.NodeType.RotationEulerParameters,
                                             position=ExtensionP+np.array([0, -0.10, 0]),  # pMid2
                                             rotationMatrix=RotationMatrixZ(mt.radians(self.theta2)) ,   #-5, 140
-                                            gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM6, graphicsBody6]) 
+                                            gravity= [0, -9.8066, 0],graphicsDataList=[graphicsCOM6, GetGraphicsBody('ExtensionBoom', self.Headless)]) 
          
        Marker20        = self.mbs.AddMarker(MarkerBodyRigid(bodyNumber=b6, localPosition=[0, 0.1, 0]))
          
@@ -1258,19 +1093,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                                                                self.p4],  # initialize with 20 bar
                                                                numberOfODE1Coordinates=2))
             
-       def CylinderFriction1(mbs, t, itemNumber, u, v, k, d, F0):
-
-           Ff = 1*StribeckFunction(v, muDynamic=1, muStaticOffset=1.5, regVel=1e-4)+(k*(u) + d*v + k*(u)**3-F0)
-           #print(Ff)
-           return Ff*1
-                
-       def CylinderFriction2(mbs, t, itemNumber, u, v, k, d, F0):
-
-           Ff =  1*StribeckFunction(v, muDynamic=0.5, muStaticOffset=0.5, regVel=1e-2) - (k*(u) - d*v + k*(u)**3 -F0)
-           #print(Ff)
-           return Ff*1
-                
-                
+       # friction force laws CylinderFriction1/2 in Models/Friction.py, evaluated as symbolic user functions
        # def UFfrictionSpringDamper1(mbs, t, itemIndex, u, v, k, d, f0): 
        #     return   1*(Fc*tanh(4*(abs(v    )/vs))+(Fs-Fc)*((abs(v    )/vs)/((1/4)*(abs(v    )/vs)**2+3/4)**2))*np.sign(v )+sig2*v    *tanh(4)
 
@@ -1281,12 +1104,12 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
                     
        oFriction1       = self.mbs.AddObject(ObjectConnectorSpringDamper(markerNumbers=[Marker5, Marker8], referenceLength=0,stiffness=2000,
                                                                  damping=0, force=0, velocityOffset = 0., activeConnector = True,
-                                                                 springForceUserFunction=CylinderFriction1   , #CylinderFriction1,
+                                                                 springForceUserFunction=FrictionUserFunction(self.mbs, CylinderFriction1),
                                                                    visualization=VSpringDamper(show=False) ))
                              
        oFriction2       = self.mbs.AddObject(ObjectConnectorSpringDamper(markerNumbers=[Marker9, Marker16], referenceLength=0,stiffness=1250,
                                                                    damping=0, force=0, velocityOffset = 0, activeConnector = True,
-                                                                   springForceUserFunction= CylinderFriction2, #CylinderFriction2,
+                                                                   springForceUserFunction=FrictionUserFunction(self.mbs, CylinderFriction2),
                                                                      visualization=VSpringDamper(show=False) ))
        
       
@@ -1322,7 +1145,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            
        if self.StaticCase or self.StaticInitialization:
               #compute reference length of distance constraint 
-              self.mbs.Assemble()
+              AssembleSystem(self.mbs)
               mGHposition = self.mbs.GetMarkerOutput(Marker5, variableType=exu.OutputVariableType.Position, 
                                                configuration=exu.ConfigurationType.Initial)
               mRHposition = self.mbs.GetMarkerOutput(Marker8, variableType=exu.OutputVariableType.Position, 
@@ -1371,13 +1194,13 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            
            return True
 
-       self.mbs.SetPreStepUserFunction(PreStepUserFunction)  
+       self.mbs.SetPreStepUserFunction(ProfiledCallback('preStep', PreStepUserFunction))  
+       self.valveSignals = [[oHA1, 'inputTimeU1', None], [oHA2, 'inputTimeU2', None]]  #for valve schedule
    
        if self.verboseMode:
            print('#joint nodes=',len(nodeListJoint3))
 
        if self.Flexible:
-           StressNode  = feL.GetNodeAtPoint(np.array([0.639392078,  0.110807151, 0.0799999982]))
        
            if self.verboseMode:
                print("nMid=",nMid)
@@ -1396,8 +1219,9 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            
            self.dictSensors['StrainF1']       = StrainF1
            self.dictSensors['StrainF2']       = StrainF2
-           self.dictSensors['Stress1']       = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF1], storeInternal=True, sensorUserFunction=UFStressData))
-           self.dictSensors['Stress2']       = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], storeInternal=True, sensorUserFunction=UFStressData))
+           if self.StressSensors: #otherwise stress is derived from StrainF1, StrainF2 after the run, see GetStressSensorData
+               self.dictSensors['Stress1']   = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF1], storeInternal=True, sensorUserFunction=ProfiledCallback('stressSensor', UFStressData)))
+               self.dictSensors['Stress2']   = self.mbs.AddSensor(SensorUserFunction(sensorNumbers=[StrainF2], storeInternal=True, sensorUserFunction=ProfiledCallback('stressSensor', UFStressData)))
           
        if oHA1 and oHA2 != None:
            sForce1          = self.mbs.AddSensor(SensorObject(objectNumber=oHA1, storeInternal=True, 
@@ -1436,7 +1260,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
 
        #+++++++++++++++++++++++++++++++++++++++++++++++++++
        #assemble and solve    
-       self.mbs.Assemble()
+       AssembleSystem(self.mbs)
        
        self.simulationSettings = exu.SimulationSettings()   
        self.simulationSettings.solutionSettings.sensorsWritePeriod = self.endTime / (self.nStepsTotal)
@@ -1452,6 +1276,7 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
        self.simulationSettings.displayComputationTime                   = True
        self.simulationSettings.linearSolverSettings.ignoreSingularJacobian=True
        self.simulationSettings.timeIntegration.generalizedAlpha.spectralRadius  = 0.7
+       ConfigureSolutionFile(self)   # binary solution file with NNHydraulics(solutionRecording=...)
        self.SC.visualizationSettings.nodes.show = False
        #self.SC.visualizationSettings.contour.outputVariable = varType1
        
@@ -1469,76 +1294,180 @@ def PatuCrane(self, theta1,theta2, p1, p2,p3, p4):
            exu.StartRenderer()
        
        if self.StaticCase or self.StaticInitialization:
-           self.mbs.variables['isStatics'] = True
-           self.simulationSettings.staticSolver.newton.relativeTolerance = 1e-10
-           # self.simulationSettings.staticSolver.stabilizerODE2term = 2
-           self.simulationSettings.staticSolver.verboseMode = self.verboseMode
-           self.simulationSettings.staticSolver.numberOfLoadSteps = 10
-           self.simulationSettings.staticSolver.constrainODE1coordinates = True #constrain pressures to initial values
-       
-           exu.SuppressWarnings(True)
-           self.mbs.SolveStatic(self.simulationSettings, 
-                           updateInitialValues=True) #use solution as new initial values for next simulation
-           exu.SuppressWarnings(False)
-         
-           force1 = self.mbs.GetObjectOutput(oDC, variableType=exu.OutputVariableType.Force)
-           force2 = self.mbs.GetObjectOutput(oDCT, variableType=exu.OutputVariableType.Force)
-           
-           if self.verboseMode:
-               print('initial force=', force)
-           
-           #deactivate distance constraint
-           self.mbs.SetObjectParameter(oDC, 'activeConnector', False)
-           self.mbs.SetObjectParameter(oDCT, 'activeConnector', False)
-           
-           #overwrite pressures:
-           if oHA1 != None:
-              dictHA1 = self.mbs.GetObject(oHA1)
-              dictHA2 = self.mbs.GetObject(oHA2)
-              
-              nodeHA1 = dictHA1['nodeNumbers'][0]
-              nodeHA2 = dictHA2['nodeNumbers'][0]
-              
-              A_HA1 = dictHA1['chamberCrossSection0']
-              pDiff1 = force1/A_HA1
-              pDiff2 = force2/A_HA1
-          
-              # #now we would like to reset the pressures:
-              # #2) change the initial values in the system vector
-          
-              sysODE1 = self.mbs.systemData.GetODE1Coordinates(configuration=exu.ConfigurationType.Initial)
-              
-              nODE1index = self.mbs.GetNodeODE1Index(nodeHA1) #coordinate index for node nodaHA1
-              nODE2index = self.mbs.GetNodeODE1Index(nodeHA2) #coordinate index for node nodaHA1
-              
-              if self.verboseMode:
-                  # print('sysODE1=',sysODE1)
-                  print('p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-                  print('p2,p3=',sysODE1[nODE2index],sysODE1[nODE2index+1])
-              
-              sysODE1[nODE1index] += pDiff1 #add required difference to pressure
-              sysODE1[nODE2index] += pDiff2 #add required difference to pressure
+           SolveStaticEquilibrium(self, 'PatuCrane', [theta1, theta2], [[oDC, oHA1], [oDCT, oHA2]])
 
-  
-              #now write the updated system variables:
-              self.mbs.systemData.SetODE1Coordinates(coordinates=sysODE1, 
-                                                     configuration=exu.ConfigurationType.Initial)
-  
-              if self.verboseMode:
-                  print('new p0,p1=',sysODE1[nODE1index],sysODE1[nODE1index+1])
-                  print('new p2,p3=',sysODE1[nODE2index],sysODE1[nODE2index+1])
-
-           self.mbs.variables['isStatics'] = False
 
 
-       if not self.StaticCase:
-           exu.SolveDynamic(self.mbs, simulationSettings=self.simulationSettings,
-                               solverType=exu.DynamicSolverType.TrapezoidalIndex2)
-           
-           
-
-       if self.Visualization:
-           # self.SC.WaitForRenderEngineStopFlag()
-           exu.StopRenderer()
-   
-    
\ No newline at end of file
+#dynamic simulation of the assembled and statically initialized model; may be called repeatedly on the same mbs
+@Profiled('dynamicSolve')
+def SolveModel(self):
+    if not self.StaticCase:
+        if self.ValveSchedule:
+            SolveModelValveSchedule(self)
+        elif self.stepwiseSolve:
+            SolveModelStepwise(self, [[0, self.nStepsTotal]])
+        else:
+            exu.SolveDynamic(self.mbs, simulationSettings=self.simulationSettings,
+                                solverType=exu.DynamicSolverType.TrapezoidalIndex2)
+        ProfileSolver('dynamic', self.mbs.sys.get('dynamicSolver'))
+
+    if self.Visualization:
+        # self.SC.WaitForRenderEngineStopFlag()
+        exu.StopRenderer()
+
+
+#valve schedule mode: valve inputs are held constant per step, so the time axis is split into segments of
+#constant valve openings; these are set as actuator parameters between SolveSteps calls of one solver, so no
+#PreStepUserFunction runs. With stroke limits, segments are integrated in chunks of at most strokeCheckSteps steps,
+#fewer than an actuator needs to reach a limit at twice its current velocity (single steps near a limit); a chunk
+#after which an actuator is on the other side of a limit is rejected and integrated again step by step, so the
+#valve closes at the same step as with the PreStepUserFunction
+def SolveModelValveSchedule(self):
+    mbs             = self.mbs
+    U               = np.array([mbs.variables[name][:,1] for [oHA, name, limits] in self.valveSignals])
+    h               = self.endTime/self.nStepsTotal
+    
+    #step k is computed with input sample k; segments start where any input changes
+    bounds          = list(np.flatnonzero(np.any(U[:,1:] != U[:,:-1], axis=0)) + 1)
+    segments        = [[k0, k1] for k0, k1 in zip([0]+bounds, bounds+[self.nStepsTotal])]
+    limited         = [[oHA, limits] for [oHA, name, limits] in self.valveSignals if limits is not None]
+    
+    mbs.SetPreStepUserFunction(0)
+    
+    def Outside(): #limit stroke of actuators
+        distances = [mbs.GetObjectOutput(oHA, exu.OutputVariableType.Distance) for [oHA, name, limits] in self.valveSignals]
+        return [limits is not None and (distance < limits[0] or distance > limits[1])
+                for [oHA, name, limits], distance in zip(self.valveSignals, distances)]
+    
+    outside         = []        # per actuator, at the start of the current chunk
+    singleStepsTo   = 0         # steps before are integrated one by one, after a rejected chunk
+    
+    def SetValveOpenings(k0, k1):
+        nonlocal outside
+        outside = Outside()
+        for i, [oHA, name, limits] in enumerate(self.valveSignals):
+            Av0 = 0 if outside[i] else U[i, k0]
+            mbs.SetObjectParameter(oHA, "valveOpening0", Av0)
+            mbs.SetObjectParameter(oHA, "valveOpening1", -Av0)
+        
+        if not limited:
+            return k1
+        steps = 1 if k0 < singleStepsTo else self.strokeCheckSteps
+        for [oHA, limits] in limited:
+            distance    = mbs.GetObjectOutput(oHA, exu.OutputVariableType.Distance)
+            velocity    = abs(mbs.GetObjectOutput(oHA, exu.OutputVariableType.VelocityLocal))
+            margin      = min(abs(distance - limits[0]), abs(distance - limits[1]))
+            if 2*velocity*h*steps > margin:
+                steps   = int(margin/(2*velocity*h))
+        return min(k1, k0 + max(steps, 1))
+    
+    def CheckStrokeLimits(k0, k):
+        nonlocal singleStepsTo
+        if k - k0 > 1 and Outside() != outside:
+            singleStepsTo = k
+            return False
+        return True
+    
+    SolveModelStepwise(self, segments, SetValveOpenings, CheckStrokeLimits if limited else None)
+
+
+#same as exu.SolveDynamic(..., solverType=exu.DynamicSolverType.TrapezoidalIndex2), but stepwise: one solver
+#integrates the segments [k0, k1] (step indices), BeforeSegment(k0, k1) is called before each segment and may return
+#a step k < k1 up to which it is integrated first (then it is called for [k, k1]); CheckSegment(k0, k) may reject the
+#integrated steps by returning False, the state at k0 is restored and BeforeSegment is called again; segments
+#are split at the checkpoint steps, a resumed run starts at the step of its checkpoint, see Checkpoint.py
+def SolveModelStepwise(self, segments, BeforeSegment=None, CheckSegment=None):
+    mbs             = self.mbs
+    settings        = self.simulationSettings
+    h               = self.endTime/self.nStepsTotal
+    resumed         = self.resumedCheckpoint
+    startStep       = 0 if resumed is None else int(resumed['step'])
+    stops           = CheckpointStops(self)
+    
+    splitSegments   = []
+    for [k0, k1] in segments:
+        steps           = [max(k0, startStep)] + [k for k in sorted(stops) if max(k0, startStep) < k < k1] + [k1]
+        splitSegments  += [[a, b] for a, b in zip(steps[:-1], steps[1:]) if b > a]
+    
+    solver          = exu.MainSolverImplicitSecondOrder()
+    mbs.sys['dynamicSolver'] = solver
+    self.stepwiseRepeatedSteps = False     # set by RestoreStepwiseSnapshot, see LoadSolution
+    timeIntegration = settings.timeIntegration
+    previous        = [timeIntegration.generalizedAlpha.useNewmark, timeIntegration.generalizedAlpha.useIndex2Constraints,
+                       timeIntegration.startTime, timeIntegration.numberOfSteps]    #restored as in exu.SolveDynamic
+    timeIntegration.generalizedAlpha.useNewmark             = True
+    timeIntegration.generalizedAlpha.useIndex2Constraints   = True
+    timeIntegration.startTime                               = startStep*h
+    timeIntegration.numberOfSteps                           = self.nStepsTotal - startStep
+    try:
+        InitializeSolverFromCheckpoint(self, solver, settings, resumed)
+        
+        for [k0, k1] in splitSegments:
+            while k0 < k1:
+                k = k1
+                if BeforeSegment is not None:
+                    k = BeforeSegment(k0, k1) or k1
+                snapshot = None if CheckSegment is None else StepwiseSnapshot(self, solver)
+                
+                solver.it.endTime = k*h
+                if not solver.SolveSteps(mbs, settings):
+                    raise ValueError("SolveModelStepwise: solver failed at t=" + str(solver.it.currentTime))
+                if CheckSegment is not None and not CheckSegment(k0, k):
+                    RestoreStepwiseSnapshot(self, solver, snapshot)
+                    continue
+                k0 = k
+            if k1 in stops:
+                SaveCheckpoint(self, k1, stops[k1], {name: SensorRows(self, sensor) for name, sensor in self.dictSensors.items()
+                                                     if mbs.GetSensorParameter(sensor, 'storeInternal')})
+        
+        solver.FinalizeSolver(mbs, settings)
+    finally:
+        [timeIntegration.generalizedAlpha.useNewmark, timeIntegration.generalizedAlpha.useIndex2Constraints,
+         timeIntegration.startTime, timeIntegration.numberOfSteps] = previous
+    
+    if self.checkpointPath is not None:
+        RemoveCheckpoint(self.checkpointPath)
+
+
+#state of the stepwise solve before a segment, restored if CheckSegment rejects the segment: the solver continues
+#from there and writes sensors and solution file again for the repeated steps (later rows replace earlier ones)
+def StepwiseSnapshot(self, solver):
+    state = self.mbs.systemData.GetSystemStateDict(reference=True)
+    return {'state':            {name: np.array(state[name]) for name in checkpointStateNames + checkpointDerivativeNames},
+            'time':             solver.it.currentTime,
+            'stepIndex':        solver.it.currentStepIndex,
+            'sensorsWritten':   solver.output.lastSensorsWritten,
+            'solutionWritten':  solver.output.lastSolutionWritten}
+
+
+def RestoreStepwiseSnapshot(self, solver, snapshot):
+    state = self.mbs.systemData.GetSystemStateDict(reference=True)
+    for name, values in snapshot['state'].items():
+        state[name][:] = values
+    solver.it.currentTime               = snapshot['time']
+    solver.it.currentStepIndex          = snapshot['stepIndex']
+    solver.output.lastSensorsWritten    = snapshot['sensorsWritten']
+    solver.output.lastSolutionWritten   = snapshot['solutionWritten']
+    self.mbs.systemData.SetTime(snapshot['time'])
+    self.stepwiseRepeatedSteps          = True
+
+
+#each SolveSteps call of the stepwise solve stores sensor values at its start time again, and steps integrated
+#again after a rejected segment store their rows again; data with the last row of each step
+def UniqueSensorRows(self, data):
+    if len(data) == 0:
+        return data
+    h       = self.endTime/self.nStepsTotal
+    steps   = np.round(data[:,0]/h)
+    later   = np.minimum.accumulate(steps[::-1])[::-1]      # first step stored at or after each row
+    return data[np.append(steps[:-1] < later[1:], True)]
+
+
+#stored rows of a sensor of the stepwise solve, preceded by the rows of a resumed checkpoint; sensors are written
+#every step in this mode, rows are decimated by GetSensorData (see ApplyOutputProfile)
+def SensorRows(self, sensorNumber):
+    data = self.mbs.GetSensorStoredData(sensorNumber)
+    if self.resumedCheckpoint is not None:
+        name = [name for name, sensor in self.dictSensors.items() if int(sensor) == int(sensorNumber)][0]
+        data = np.vstack((self.resumedCheckpoint['sensors'][name], data))
+    return UniqueSensorRows(self, data)
@@ -0,0 +1,79 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #FIELD RECOVERY
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Strain and von Mises stress of every mesh node and output step, recovered
+# after the simulation from the stored modal coordinates of a flexible body
+# (NNHydraulics(storeModalCoordinates=True)). The field of a block of nodes is
+# one matrix product of the modal coordinate history with the post-processing
+# modes; strain is mapped to stress with the elasticity tensor for all nodes
+# and steps at once. Blocks are sized to bound memory, so a hot-spot search
+# over the whole boom needs no further simulations with other sensor nodes.
+
+from Models.Container import *
+
+
+fieldRecoveryBlockBytes = 256*1024**2   # max. size of the field of one block of nodes
+
+
+#register a flexible body (FEMinterface with post-processing modes, material, dict of AddObjectFFRFreducedOrder);
+#with self.StoreModalCoordinates, the coordinates of its modal node are stored at every output step
+def AddFlexibleBody(self, name, fem, material, ffrf):
+    sensor = None
+    if self.StoreModalCoordinates:
+        sensor = self.mbs.AddSensor(SensorNode(nodeNumber=ffrf['nGenericODE2'], storeInternal=True,
+                                               outputVariableType=exu.OutputVariableType.Coordinates))
+        self.dictSensors['modalCoordinates' + name] = sensor
+    self.flexibleBodies[name] = {'fem': fem, 'material': material, 'sensor': sensor}
+
+
+#stress vectors (xx,yy,zz,yz,xz,xy) of strain vectors (..., 6) as KirchhoffMaterial.StrainVector2StressVector
+def StrainVectorsToStress(strain, material):
+    return strain @ np.asarray(material.elasticityTensor).T
+
+
+def VonMisesStress(stress):
+    [sxx, syy, szz, syz, sxz, sxy] = np.moveaxis(stress, -1, 0)
+    return np.sqrt(0.5*((sxx-syy)**2 + (syy-szz)**2 + (szz-sxx)**2) + 3*(syz**2 + sxz**2 + sxy**2))
+
+
+#field of the post-processing modes at nodes for modal coordinates q (nSteps x nModes): nSteps x len(nodes) x 6
+def ModalField(postProcessingModes, q, nodes):
+    [nSteps, nModes] = q.shape
+    P = np.asarray(postProcessingModes[nodes]).reshape(len(nodes), nModes, 6)
+    return (q @ P.transpose(1, 0, 2).reshape(nModes, 6*len(nodes))).reshape(nSteps, len(nodes), 6)
+
+
+#strain (None for stress modes), stress and von Mises stress per block of nodes (all nodes if None)
+#for modal coordinates q; missing post-processing mode rows are computed, see PostProcessingModes.py
+def IterateFieldHistory(fem, q, material, nodes=None, blockBytes=fieldRecoveryBlockBytes):
+    q           = np.atleast_2d(np.asarray(q, dtype=float))
+    nodes       = np.arange(fem.NumberOfNodes()) if nodes is None else np.asarray(nodes, dtype=int)
+    varType     = fem.postProcessingModes.get('outputVariableType', exu.OutputVariableType.StrainLocal)
+    ComputePostProcessingModesAtNodes(fem, material, varType, nodes)
+    isStrain    = str(fem.postProcessingModes['outputVariableType']) == 'OutputVariableType.StrainLocal'
+
+    nodesPerBlock = max(1, int(blockBytes // (len(q)*6*8)))
+    for i in range(0, len(nodes), nodesPerBlock):
+        blockNodes  = nodes[i:i+nodesPerBlock]
+        field       = ModalField(fem.postProcessingModes['matrix'], q, blockNodes)
+        [strain, stress] = [field, StrainVectorsToStress(field, material)] if isStrain else [None, field]
+        yield blockNodes, strain, stress, VonMisesStress(stress)
+
+
+#von Mises stress of nodes (all nodes if None) at all steps of q: nSteps x len(nodes)
+def VonMisesHistory(fem, q, material, nodes=None, blockBytes=fieldRecoveryBlockBytes):
+    return np.hstack([vonMises for blockNodes, strain, stress, vonMises
+                      in IterateFieldHistory(fem, q, material, nodes, blockBytes)])
+
+
+#maximum von Mises stress over all steps for every node and the nHotSpots nodes with the largest maximum
+def StressHotSpots(fem, q, material, nodes=None, nHotSpots=10, blockBytes=fieldRecoveryBlockBytes):
+    [allNodes, maxStress, stepOfMax] = [[], [], []]
+    for blockNodes, strain, stress, vonMises in IterateFieldHistory(fem, q, material, nodes, blockBytes):
+        allNodes    += [blockNodes]
+        maxStress   += [np.max(vonMises, axis=0)]
+        stepOfMax   += [np.argmax(vonMises, axis=0)]
+    [allNodes, maxStress, stepOfMax] = [np.concatenate(allNodes), np.concatenate(maxStress), np.concatenate(stepOfMax)]
+    order = np.argsort(-maxStress)[:nHotSpots]
+    return {'nodes': allNodes, 'maxVonMises': maxStress, 'stepOfMax': stepOfMax,
+            'hotSpots': allNodes[order], 'hotSpotStress': maxStress[order], 'hotSpotStep': stepOfMax[order]}
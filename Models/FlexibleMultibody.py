@@ -1,15 +1,59 @@
 
 from Models.Container import *
 from Models.ExudynModels import *
-import scipy.io as sio
+import inspect
 #+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+#attributes set by the model functions which make up a compiled model
+compiledModelAttributes = ['SC', 'mbs', 'dictSensors', 'flexibleBodies', 'simulationSettings', 'oHA1', 'oHA2', 
+                           'theta1', 'theta2', 'theta3', 'theta4', 'valveSignals']
+
+#model settings of ComputeBatch workers besides the constructor arguments: attributes set after construction
+batchModelAttributes    = ['p1Init', 'p2Init', 'p3Init', 'p4Init']
+#constructor arguments set per run in ComputeBatch workers, or fixed for batch workers
+batchRunArgs            = ['outputProfile']
+batchWorkerArgs         = {'headless': True, 'visualization': False, 'persistentModel': True}
+batchModels             = {}    #per-process models of batch workers, keyed by model settings
+
+
+#run one simulation of a batch; executed in a worker process which keeps its own SystemContainers
+def ComputeBatchWorker(index, inputData, config, seed):
+    np.random.seed(seed)
+    random.seed(seed)
+    
+    modelArgs   = {key: config[key] for key in inspect.signature(NNHydraulics).parameters
+                   if key in config and key not in batchRunArgs}
+    attributes  = {key: config[key] for key in batchModelAttributes if key in config}
+    key         = repr(sorted({**modelArgs, **attributes}.items()))
+    if key not in batchModels:
+        batchModels[key] = NNHydraulics(**{**modelArgs, **batchWorkerArgs})
+        for name, value in attributes.items():
+            setattr(batchModels[key], name, value)
+    model       = batchModels[key]
+    
+    inputData   = np.array(inputData, dtype=float)
+    n           = model.nStepsTotal
+    if config.get('theta1') is not None:
+        inputData[3*n if model.Patu else 2*n] = config['theta1']
+    if config.get('theta2') is not None and model.Patu:
+        inputData[4*n] = config['theta2']
+    
+    return index, model.ComputeModel(inputData, system=model.Patu, OptimisedLB=config.get('OptimisedLB', False),
+                                     outputProfile=config.get('outputProfile'))
+
+
 class NNHydraulics():
 
     #initialize class 
     def __init__(self, nStepsTotal=100, endTime=0.5,Flexible=False, nModes = 2,loadFromSavedNPY=True, 
-                 mL= 50,  visualization = False,system = True, verboseMode = 0):
+                 mL= 50,  visualization = False,system = True, verboseMode = 0, headless = None,
+                 persistentModel = False, valveSchedule = False, strokeCheckSteps = 10, equilibriumCache = True,
+                 maxModeFrequency = None, sensorPostProcessingModes = False, storeModalCoordinates = False,
+                 stressSensors = True, profiling = True, solutionRecording = None,
+                 outputProfile = None, resultCache = False, checkpointSteps = None):
 
+        self.modelArgs          = dict(locals())    # constructor arguments, passed on to batch workers
+        del self.modelArgs['self']
 
         self.nStepsTotal        = nStepsTotal
         self.endTime            = endTime
@@ -17,6 +61,8 @@ class NNHydraulics():
         self.Flexible           = Flexible
         
         self.nModes             = nModes
+        self.maxModeFrequency   = maxModeFrequency  # Hz; if set, HCB modes below this frequency instead of nModes
+        self.SensorPostProcessingModes = sensorPostProcessingModes  # strain/stress modes only at sensor nodes (not with visualization)
         self.loadFromSavedNPY   = loadFromSavedNPY
         self.mL                 = mL
         
@@ -24,6 +70,7 @@ class NNHydraulics():
         self.Hydraulics         = True
         self.Visualization      = visualization
         self.Patu               = system
+        self.Headless           = headless          # None: use headlessGraphics (env HYDRAULICS_HEADLESS)
 
         
         self.angleMinDeg1      = 0
@@ -35,51 +82,181 @@ class NNHydraulics():
         
         self.timeVecOut       = np.arange(1,self.nStepsTotal+1)/self.nStepsTotal*self.endTime
         
+        # build-once, run-many: keep assembled and statically initialized systems, keyed by configuration
+        self.PersistentModel    = persistentModel
+        self.compiledModels     = {}
+        
+        # valve schedule: integrate segments of constant valve input without PreStepUserFunction
+        self.ValveSchedule      = valveSchedule
+        self.strokeCheckSteps   = strokeCheckSteps  # max. steps between stroke limit checks, see SolveModelValveSchedule
+        self.sensorCache        = None      # sensor data fetched during GetOutputData
+        self.stepwiseSolve      = valveSchedule     # set per run by PrepareCheckpoints
+        self.stepwiseRepeatedSteps = False          # last stepwise solve integrated rejected steps again
+        
+        # reuse static equilibria of identical/nearby initial configurations, see Equilibrium.py
+        self.EquilibriumCache   = equilibriumCache
+        
+        # store modal coordinates of the flexible bodies for full-field stress recovery, see FieldRecovery.py
+        self.StoreModalCoordinates = storeModalCoordinates
+        
+        # False: no SensorUserFunction stress sensors in the time loop, stress is derived from the strain sensors
+        self.StressSensors      = stressSensors
+        
+        # per-phase timing, callback and solver statistics of each run in self.profile and result.metadata['profile']
+        self.Profiling          = profiling
+        self.profile            = None
+        
+        # None: text solution file coordinatesSolution.txt; True or dict of options: streamed binary solution file
+        # (float32, column groups, stride), read memory-mapped by LoadSolution, see SolutionFile.py
+        self.SolutionRecording  = solutionRecording
+        
+        # recorded channels and sensors, decimation and solution file per run, see OutputProfile.py;
+        # ComputeModel(outputProfile=...) overrides entries for one run
+        self.OutputProfile      = outputProfile
+        self.outputProfile      = None
+        self.recordedChannels   = None
+        self.nOutputSteps       = nStepsTotal
+        
+        # take results of identical runs from the persistent result cache, see ResultCache.py
+        self.ResultCache        = resultCache
+        self.cachedResultKey    = None      # key of the last run if it was loaded from the result cache
+        
+        # checkpoint every checkpointSteps steps, resume interrupted runs, branch input vectors, see Checkpoint.py
+        self.CheckpointSteps    = checkpointSteps
+        self.checkpointPath     = None
+        self.resumedCheckpoint  = None
+        self.branchCheckpoint   = None
+        self.branchRequest      = None
+        
 
     #%%+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
     def CreateModel(self):
         self.SC  = exu.SystemContainer()
         self.mbs = self.SC.AddSystem()
+        self.reducedModelKeys = []     # HCB basis keys of the flexible bodies, set by ComputeReducedModel
         
-    #get time vector according to output data
-    def GetOutputXAxisVector(self):
-        return self.timeVecOut
+    #create, assemble and statically initialize the model, or reuse a compiled one in persistent mode;
+    #only valve inputs may differ between runs of a compiled model (stored in mbs.variables)
+    @Profiled('build')
+    def BuildModel(self, system, theta1, theta2=0):
+        key = (bool(system), bool(self.OptimisedLB), self.Flexible, self.nModes, self.maxModeFrequency, self.mL, 
+               float(theta1), float(theta2), self.nStepsTotal, self.endTime, self.Headless)
+        
+        if self.PersistentModel and key in self.compiledModels:
+            for name, value in self.compiledModels[key].items():
+                setattr(self, name, value)
+            return
+        
+        self.CreateModel()
+        self.mbs.variables['theta1'] = theta1
+        
+        if system:
+            self.mbs.variables['theta2'] = theta2
+            PatuCrane(self, theta1, theta2, self.p1Init, self.p2Init, self.p3Init, self.p4Init)
+        elif self.OptimisedLB:
+            OptimisedLiftBoom(self, theta1, self.p1Init, self.p2Init)
+        else:
+            LiftBoom(self, theta1, self.p1Init, self.p2Init)
+        
+        if self.PersistentModel:
+            self.compiledModels[key] = {name: getattr(self, name) for name in compiledModelAttributes 
+                                        if hasattr(self, name)}
+    
+    def ClearCompiledModels(self):
+        self.compiledModels = {}
+        
+    #the system holds the state of the last simulated run; after a run loaded from the result cache, sensors and
+    #solution file belong to an earlier run and must not be read
+    def CheckSimulatedRun(self, caller):
+        if self.cachedResultKey is not None:
+            raise ValueError(caller + ': the last run was loaded from the result cache (key ' + self.cachedResultKey +
+                             ') and not simulated; use its SimulationResult or NNHydraulics(resultCache=False)')
     
+    #stored sensor data of the last simulation (stepwise solve: without the repeated rows at segment starts, incl. 
+    #the rows of a resumed checkpoint); while GetOutputData runs, each sensor is fetched from the system only once
+    def GetSensorData(self, sensorNumber):
+        self.CheckSimulatedRun('GetSensorData')
+        if self.sensorCache is not None and sensorNumber in self.sensorCache:
+            return self.sensorCache[sensorNumber]
+        if self.stepwiseSolve and not self.StaticCase:
+            data = SensorRows(self, sensorNumber)[::self.nStepsTotal//self.nOutputSteps]
+        else:
+            data = self.mbs.GetSensorStoredData(sensorNumber)
+        if self.sensorCache is not None:
+            self.sensorCache[sensorNumber] = data
+        return data
+        
+    #data [t, stress xx,yy,zz,yz,xz,xy] of stress sensor stressName; without stress sensors (stressSensors=False) 
+    #the same values are computed from the StrainLocal sensor strainName of the flexible body after the run
+    def GetStressSensorData(self, stressName, strainName, body='LiftBoom'):
+        if stressName in self.dictSensors:
+            return self.GetSensorData(self.dictSensors[stressName])
+        strain = self.GetSensorData(self.dictSensors[strainName])
+        return np.column_stack((strain[:,0], StrainVectorsToStress(strain[:,1:], self.flexibleBodies[body]['material'])))
     
-    def CreateInputVector(self, relCnt = 0, theta1 = 0,theta2=0, system=False, isTest=False):
+    #modal coordinates of a flexible body ('LiftBoom', 'TiltBoom') of the last simulation, nOutputSteps x nModes
+    def GetModalCoordinates(self, body='LiftBoom'):
+        sensor = self.flexibleBodies[body]['sensor']
+        if sensor is None:
+            raise ValueError('GetModalCoordinates: modal coordinates are only stored with NNHydraulics(storeModalCoordinates=True)')
+        return self.GetSensorData(sensor)[0:self.nOutputSteps, 1:]
     
-        if system:
-            vec = np.zeros(6*self.nStepsTotal)
-            U1  = np.zeros(self.nStepsTotal)
-            U2  = np.zeros(self.nStepsTotal)
-            pP  = np.zeros(self.nStepsTotal)
+    #von Mises stress of all nodes (or nodes) of a flexible body at all output steps of the last simulation
+    def ComputeVonMisesHistory(self, body='LiftBoom', nodes=None):
+        flexibleBody = self.flexibleBodies[body]
+        return VonMisesHistory(flexibleBody['fem'], self.GetModalCoordinates(body), flexibleBody['material'], nodes)
+    
+    #maximum von Mises stress of every node of a flexible body over the last simulation and its hot spots
+    def ComputeStressHotSpots(self, body='LiftBoom', nodes=None, nHotSpots=10):
+        flexibleBody = self.flexibleBodies[body]
+        return StressHotSpots(flexibleBody['fem'], self.GetModalCoordinates(body), flexibleBody['material'], 
+                              nodes, nHotSpots)
+        
+    #solution file of the last simulation, binary files memory-mapped; see LoadSolutionFileMapped
+    def LoadSolution(self):
+        self.CheckSimulatedRun('LoadSolution')
+        options = SolutionRecordingOptions(self.SolutionRecording)
+        return LoadSolutionFileMapped(solutionFileText if options is None else options['fileName'],
+                                      repeatedRows=self.stepwiseRepeatedSteps)
+        
+    #get time vector according to output data
+    def GetOutputXAxisVector(self):
+        return self.timeVecOut
     
-            for i in range(self.nStepsTotal):
-                U1[i] =uref_1(self.timeVecOut[i])
-                U2[i] =uref_2(self.timeVecOut[i])
-                pP[i] = 100e5
     
+    #theta1, theta2 and the schedules (see Control.py) may have a batch dimension,
+    #then one input vector per row is returned
+    def CreateInputVector(self, relCnt = 0, theta1 = 0,theta2=0, system=False, isTest=False,
+                          schedule1=None, schedule2=None):
         
-
-            vec[0:self.nStepsTotal]                         = U1[0:self.nStepsTotal]      
-            vec[1*(self.nStepsTotal):2*(self.nStepsTotal)]  = U2[0:self.nStepsTotal]
-            vec[2*(self.nStepsTotal):3*(self.nStepsTotal)]  = pP[0:self.nStepsTotal]
-            vec[4*(self.nStepsTotal)]  = theta1
-            vec[5*(self.nStepsTotal)]  = theta2
+        n       = self.nStepsTotal
+        t       = self.timeVecOut
+        
+        if system:
+            U1  = ScheduleSignal(t, uref1Schedule if schedule1 is None else schedule1)
+            U2  = ScheduleSignal(t, uref2Schedule if schedule2 is None else schedule2)
+            pP  = np.full(n, 100e5)
+            
+            nBatch  = np.broadcast_shapes(np.shape(theta1), np.shape(theta2), U1.shape[:-1], U2.shape[:-1])
+            vec     = np.zeros(nBatch + (6*n,))
+            
+            vec[..., 0:n]                   = U1      
+            vec[..., 1*n:2*n]               = U2
+            vec[..., 2*n:3*n]               = pP
+            vec[..., 4*n]                   = theta1
+            vec[..., 5*n]                   = theta2
         
         else:
-            vec = np.zeros(3*self.nStepsTotal)
-            U1  = np.zeros(self.nStepsTotal)
-            pP  = np.zeros(self.nStepsTotal)
-    
-            for i in range(self.nStepsTotal):
-                U1[i] =uref(self.timeVecOut[i])
-                pP[i] = 100e5
+            U1  = ScheduleSignal(t, urefSchedule if schedule1 is None else schedule1)
+            pP  = np.full(n, 100e5)
+            
+            nBatch  = np.broadcast_shapes(np.shape(theta1), U1.shape[:-1])
+            vec     = np.zeros(nBatch + (3*n,))
     
-            vec[0:self.nStepsTotal]                         = U1[0:self.nStepsTotal]      
-            vec[1*(self.nStepsTotal):2*(self.nStepsTotal)]  = pP[0:self.nStepsTotal]
-            vec[2*(self.nStepsTotal)]                       = theta1
+            vec[..., 0:n]                   = U1      
+            vec[..., 1*n:2*n]               = pP
+            vec[..., 2*n]                   = theta1
     
         return vec
 
@@ -114,18 +291,23 @@ class NNHydraulics():
         return rv
     
     #initialState contains position and velocity states as list of two np.arrays 
-    def ComputeModel(self, inputData, system=None,solutionViewer = False, verboseMode = 0, OptimisedLB=False):
+    #outputProfile: dict overriding the output profile of the model for this run, see OutputProfile.py
+    @CachedRun
+    @ProfiledRun
+    def ComputeModel(self, inputData, system=None,solutionViewer = False, verboseMode = 0, OptimisedLB=False,
+                     outputProfile = None):
         self.OptimisedLB = OptimisedLB
-        self.CreateModel()
         # print('compute model')
         self.verboseMode = verboseMode
+        self.outputProfile = OutputProfileOptions(self.OutputProfile, outputProfile)
+        ReleaseSolutionFile(self)
+        PrepareCheckpoints(self, inputData, system, OptimisedLB, outputProfile)
         
         
         #++++++++++++++++++++++++++++++++++++++++++
         if system:
             
-            outputData=np.zeros(self.nStepsTotal*12)
-            inputDict = self.SplitInputData(np.array(inputData), system)
+            inputDict = self.SplitInputData(np.asarray(inputData), system)
             self.inputTimeU2        = np.zeros((self.nStepsTotal,2))
             self.inputTimeU1        = np.zeros((self.nStepsTotal,2))
             self.inputTimeU1[:,0]   = self.timeVecOut
@@ -133,906 +315,186 @@ class NNHydraulics():
             self.inputTimeU2[:,0]   = self.timeVecOut
             self.inputTimeU2[:,1]   = inputDict['U2']        
             
+            self.BuildModel(system, inputData[self.nStepsTotal*3], inputData[self.nStepsTotal*4])
             self.mbs.variables['inputTimeU1'] = self.inputTimeU1            
             self.mbs.variables['inputTimeU2'] = self.inputTimeU2            
-            self.mbs.variables['theta1'] = inputData[self.nStepsTotal*3]
-            self.mbs.variables['theta2'] = inputData[self.nStepsTotal*4]
-            
-            PatuCrane(self, self.mbs.variables['theta1'],self.mbs.variables['theta2'], 
-                          self.p1Init, self.p2Init, self.p3Init, self.p4Init)
-            
-            # Data arrangement
-            DS = self.dictSensors
-            
-            inputData[0:self.nStepsTotal]                           =  inputData[0:self.nStepsTotal]
-            inputData[1*self.nStepsTotal:2*self.nStepsTotal]        =  inputData[1*self.nStepsTotal:2*self.nStepsTotal]
-            
-            outputData[0:self.nStepsTotal]                          =  self.mbs.GetSensorStoredData(DS['sDistance1'])[0:self.nStepsTotal,1]
-            outputData[1*self.nStepsTotal:2*self.nStepsTotal]       =  self.mbs.GetSensorStoredData(DS['sDistance2'])[0:self.nStepsTotal,1]
-            outputData[2*self.nStepsTotal:3*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sVelocity1'])[0:self.nStepsTotal,1]
-            outputData[3*self.nStepsTotal:4*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sVelocity2'])[0:self.nStepsTotal,1]
-            outputData[4*self.nStepsTotal:5*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures1'])[0:self.nStepsTotal,1]
-            outputData[5*self.nStepsTotal:6*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures1'])[0:self.nStepsTotal,2]
-            outputData[6*self.nStepsTotal:7*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures2'])[0:self.nStepsTotal,1]
-            outputData[7*self.nStepsTotal:8*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures2'])[0:self.nStepsTotal,2]
-
-            if self.Flexible:
-                outputData[8*self.nStepsTotal:9*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['StrainF1'])[0:1*self.nStepsTotal,1]
-                outputData[9*self.nStepsTotal:10*self.nStepsTotal]  = self.mbs.GetSensorStoredData(DS['StrainF2'])[0:1*self.nStepsTotal,1]
-                outputData[10*self.nStepsTotal:11*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['Stress1'])[0:1*self.nStepsTotal,1]
-                outputData[11*self.nStepsTotal:12*self.nStepsTotal]  = self.mbs.GetSensorStoredData(DS['Stress2'])[0:1*self.nStepsTotal,1]
-
+            ApplyOutputProfile(self, self.outputProfile, system, solutionViewer)
+            SolveModel(self)
             
         else:
-            inputDict = self.SplitInputData(np.array(inputData), system)
-            
-            outputData=np.zeros(self.nStepsTotal*11)
+            inputDict = self.SplitInputData(np.asarray(inputData), system)
             
             self.inputTimeU1 = np.zeros((self.nStepsTotal,2))
             self.inputTimeU1[:,0] = self.timeVecOut
             self.inputTimeU1[:,1] = inputDict['U']        
             
+            self.BuildModel(system, inputData[self.nStepsTotal*2])
             self.mbs.variables['inputTimeU1'] = self.inputTimeU1            
-            self.mbs.variables['theta1'] = inputData[self.nStepsTotal*2]
-            
-            if OptimisedLB:
-                OptimisedLiftBoom(self, self.mbs.variables['theta1'], self.p1Init, self.p2Init)
-            else:
-                LiftBoom(self, self.mbs.variables['theta1'], self.p1Init, self.p2Init)
+            ApplyOutputProfile(self, self.outputProfile, system, solutionViewer)
+            SolveModel(self)
 
-            #++++++++++++++++++++++++++
-            DS = self.dictSensors
-
-            # input
-            inputData[0:self.nStepsTotal]                           = inputData[0:self.nStepsTotal]
-            
-            outputData[0:self.nStepsTotal]                          = self.mbs.GetSensorStoredData(DS['sDistance'])[0:self.nStepsTotal,1]
-            outputData[1*self.nStepsTotal:2*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sVelocity'])[0:self.nStepsTotal,1]
-            outputData[2*self.nStepsTotal:3*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures'])[0:self.nStepsTotal,1]
-            outputData[3*self.nStepsTotal:4*self.nStepsTotal]       = self.mbs.GetSensorStoredData(DS['sPressures'])[0:self.nStepsTotal,2]
-            outputData[4*self.nStepsTotal:6*self.nStepsTotal]       = EnergyCalculation(self, self.mbs.GetSensorStoredData(DS['sDistance']), self.mbs.GetSensorStoredData(DS['sPressures']))
-            outputData[8*self.nStepsTotal:9*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['sAngle'])[0:self.nStepsTotal,3] * 180/np.pi
-            
-            if self.Flexible:
-                outputData[6*self.nStepsTotal:7*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['StrainPoint'])[0:1*self.nStepsTotal,6]
-                outputData[7*self.nStepsTotal:8*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['StressPoint'])[0:1*self.nStepsTotal,1]
-                
-                outputData[9*self.nStepsTotal:10*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['sAngVelocity'])[0:self.nStepsTotal,3] * 180/np.pi
-                outputData[10*self.nStepsTotal:11*self.nStepsTotal]   = self.mbs.GetSensorStoredData(DS['deltaY'])[0:1*self.nStepsTotal,2]
+        outputData = self.GetOutputData(system)
+        
         if solutionViewer:
-           self.mbs.SolutionViewer()
+           self.mbs.SolutionViewer(self.LoadSolution())
            
 
-        return [inputData, outputData]
-    
+        return ResultFromOutputData(OutputTime(self), inputData, outputData, 
+                                    outputChannelsPatu if system else outputChannelsLiftBoom, self.GetResultMetadata(system))
     
-    def Plotting(self, data): 
-        Time    = self.timeVecOut
-        end     = Time.shape[0]
+    #flat outputData of the last run (channel k at k*nOutputSteps); channels which are not recorded in the
+    #output profile are NaN, channels of the flexible bodies are 0 for rigid models; every sensor is fetched
+    #once and its columns are written into the rows of one preallocated array, the channels are views of it
+    def GetOutputData(self, system):
+        DS              = self.dictSensors
+        n               = self.nOutputSteps
+        channelNames    = outputChannelsPatu if system else outputChannelsLiftBoom
+        sensorChannels  = sensorChannelsPatu if system else sensorChannelsLiftBoom
+        outputData      = np.zeros((len(channelNames), n))
+        channels        = dict(zip(channelNames, outputData))
         
-        if self.Patu: 
-            
-            s1      = data[1][0:end]
-            s2      = data[1][1*end:2*end]
-            dots1   = data[1][2*end:3*end]
-            dots2   = data[1][3*end:4*end]
-            p1      = data[1][4*end:5*end]
-            p2      = data[1][5*end:6*end]
-            p3      = data[1][6*end:7*end]
-            p4      = data[1][7*end:8*end]
-            
-            # Signal 1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, self.inputTimeU1[:,1], #label='Simulation', 
-                     linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-            
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('Control signal, V')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-12, 12)
-            plt.savefig('solution/TwoArms/inputU1.png')
-            plt.show()
-            
-            # Signal 2
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, self.inputTimeU2[:,1], #label='Simulation', 
-                     linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-            
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('Control signal, V')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-12, 12)
-            plt.savefig('solution/TwoArms/inputU2.png')
-            plt.show()
-            
-            
-            #s1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, 1000*s1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('s, mm')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(800, 1200)
-            plt.savefig('solution/TwoArms/s1.png')
-            plt.show()
-            
-            
-            #s2
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, 1000*s2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('s, mm')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(950, 1400)
-            plt.savefig('solution/TwoArms/s2.png')
-            plt.show()
-            
-            
-            #dots1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, dots1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('v, m/s')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-0.125, 0.125)
-            plt.savefig('solution/TwoArms/dots1.png')
-            plt.show()
-            
-            
-            #dots1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, dots2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('v, m/s')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-0.15, 0.15)
-            plt.savefig('solution/TwoArms/dots2.png')
-            plt.show()
-            
-            #p1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, p1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('p1, Pa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(1e5, 250e5)
-            plt.savefig('solution/TwoArms/p1.png')
-            plt.show()
-            
-            
-            #p1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, p2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('p2, Pa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(1e5, 150e5)
-            plt.savefig('solution/TwoArms/p2.png')
-            plt.show()
-            
-            
-            #p1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, p3, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('p3, Pa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-25e5, 150e5)
-            plt.savefig('solution/TwoArms/p3.png')
-            plt.show()
-            
-            
-            #p1
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, p4, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('p4, Pa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(0e5, 100e5)
-            plt.savefig('solution/TwoArms/p4.png')
-            plt.show()
-            
-            
-            if self.Flexible:
-                deltaEps1      = data[1][8*end:9*end]
-                deltaEps2      = data[1][9*end:10*end]
-                deltaSig1      = data[1][10*end:11*end]
-                deltaSig2      = data[1][11*end:12*end]
-                
-                #Strain
-                plt.figure(figsize=(10, 5))
-                # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-                #  linewidth=1, markersize=2, color='green')
-                plt.plot(Time, 1e6*deltaEps1, #label='Simulation', 
-                        linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-               
-                plt.xlabel('Time, s')  # Adjust label as appropriate
-                plt.ylabel(r'$\epsilon_1$, $\mu$m')  # Adjust label as appropriate
-                plt.grid(True)  # Add grid
-                # Set axis limits
-                plt.xlim(0, self.endTime)
-                plt.ylim(-250, 450)
-                plt.savefig('solution/TwoArms/deltaEps1.png')
-                plt.show()
-                
-                #Strain
-                plt.figure(figsize=(10, 5))
-                # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-                #  linewidth=1, markersize=2, color='green')
-                plt.plot(Time, 1e6*deltaEps2, #label='Simulation', 
-                        linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-               
-                plt.xlabel('Time, s')  # Adjust label as appropriate
-                plt.ylabel(r'$\epsilon_2$, $\mu$m')  # Adjust label as appropriate
-                plt.grid(True)  # Add grid
-                # Set axis limits
-                plt.xlim(0, self.endTime)
-                plt.ylim(-30, 30)
-                plt.savefig('solution/TwoArms/deltaEps2.png')
-                plt.show()
-                
-                
-                #Stress
-                plt.figure(figsize=(10, 5))
-                # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-                #  linewidth=1, markersize=2, color='green')
-                plt.plot(Time, deltaSig1/1e6, #label='Simulation', 
-                        linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-               
-                plt.xlabel('Time, s')  # Adjust label as appropriate
-                plt.ylabel(r'$\sigma_1$, MPa')  # Adjust label as appropriate
-                plt.grid(True)  # Add grid
-                # Set axis limits
-                plt.xlim(0, self.endTime)
-                plt.ylim(-60, 100)
-                plt.savefig('solution/TwoArms/deltaSig1.png')
-                plt.show()
-                
-                #Stress
-                plt.figure(figsize=(10, 5))
-                # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-                #  linewidth=1, markersize=2, color='green')
-                plt.plot(Time, deltaSig2/1e6, #label='Simulation', 
-                        linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-               
-                plt.xlabel('Time, s')  # Adjust label as appropriate
-                plt.ylabel(r'$\sigma_2$, MPa')  # Adjust label as appropriate
-                plt.grid(True)  # Add grid
-                # Set axis limits
-                plt.xlim(0, self.endTime)
-                plt.ylim(-5, 7)
-                plt.savefig('solution/TwoArms/deltaSig2.png')
-                plt.show()
-                
-        else:
-          
-           s1      = data[1][0:end]
-           dots1   = data[1][1*end:2*end]
-           p1      = data[1][2*end:3*end]
-           p2      = data[1][3*end:4*end]
-          
-           # Signal 1
-           plt.figure(figsize=(10, 5))
-          # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-          #  linewidth=1, markersize=2, color='green')
-           plt.plot(Time, self.inputTimeU1[:,1], #label='Simulation', 
-                   linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-          
-           plt.xlabel('Time, s')  # Adjust label as appropriate
-           plt.ylabel('Control signal, V')  # Adjust label as appropriate
-           plt.grid(True)  # Add grid
-           # Set axis limits
-           plt.xlim(0, self.endTime)
-           plt.ylim(-12, 12)
-           plt.savefig('solution/OneArm/inputU1.png')
-           plt.show()
-           
-           
-           #s1
-           plt.figure(figsize=(10, 5))
-           # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-           #  linewidth=1, markersize=2, color='green')
-           plt.plot(Time, 1000*s1, #label='Simulation', 
-                   linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-           plt.xlabel('Time, s')  # Adjust label as appropriate
-           plt.ylabel('s, mm')  # Adjust label as appropriate
-           plt.grid(True)  # Add grid
-           # Set axis limits
-           plt.xlim(0, self.endTime)
-           plt.ylim(L_Cyl1*1000, 1200)
-           plt.savefig('solution/OneArm/s1.png')
-           plt.show()
-           
-           #dots1
-           plt.figure(figsize=(10, 5))
-           # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-           #  linewidth=1, markersize=2, color='green')
-           plt.plot(Time, dots1, #label='Simulation', 
-                   linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-          
-           plt.xlabel('Time, s')  # Adjust label as appropriate
-           plt.ylabel('v, m/s')  # Adjust label as appropriate
-           plt.grid(True)  # Add grid
-           # Set axis limits
-           plt.xlim(0, self.endTime)
-           plt.ylim(-0.12, 0.12)
-           plt.savefig('solution/OneArm/dots1.png')
-           plt.show()
-           
-           #p1
-           plt.figure(figsize=(10, 5))
-           # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-           #  linewidth=1, markersize=2, color='green')
-           plt.plot(Time, p1, #label='Simulation', 
-                   linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-          
-           plt.xlabel('Time, s')  # Adjust label as appropriate
-           plt.ylabel('p1, Pa')  # Adjust label as appropriate
-           plt.grid(True)  # Add grid
-           # Set axis limits
-           plt.xlim(0, self.endTime)
-           plt.ylim(0e5, 100e5)
-           plt.savefig('solution/OneArm/p1.png')
-           plt.show()
-           
-           
-           #p1
-           plt.figure(figsize=(10, 5))
-           # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-           #  linewidth=1, markersize=2, color='green')
-           plt.plot(Time, p2, #label='Simulation', 
-                   linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-          
-           plt.xlabel('Time, s')  # Adjust label as appropriate
-           plt.ylabel('p2, Pa')  # Adjust label as appropriate
-           plt.grid(True)  # Add grid
-           # Set axis limits
-           plt.xlim(0, self.endTime)
-           plt.ylim(0e5, 100e5)
-           plt.savefig('solution/OneArm/p2.png')
-           plt.show()
-           
-           
-           if self.Flexible:
-               deltaEps      = data[1][4*end:5*end]
-               deltaSig      = data[1][5*end:6*end]
-               
-               #Strain
-               plt.figure(figsize=(10, 5))
-               # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-               #  linewidth=1, markersize=2, color='green')
-               plt.plot(Time, 1e6*deltaEps, #label='Simulation', 
-                       linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-              
-               plt.xlabel('Time, s')  # Adjust label as appropriate
-               plt.ylabel(r'$\epsilon$, $\mu$m')  # Adjust label as appropriate
-               plt.grid(True)  # Add grid
-               # Set axis limits
-               plt.xlim(0, self.endTime)
-               plt.ylim(-30, 20)
-               plt.savefig('solution/OneArm/deltaEps.png')
-               plt.show()
-               
-               
-               #Stress
-               plt.figure(figsize=(10, 5))
-               # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-               #  linewidth=1, markersize=2, color='green')
-               plt.plot(Time, deltaSig/1e6, #label='Simulation', 
-                       linestyle='-', marker='x', linewidth=1, markersize=2, color='black')
-              
-               plt.xlabel('Time, s')  # Adjust label as appropriate
-               plt.ylabel(r'$\sigma$, MPa')  # Adjust label as appropriate
-               plt.grid(True)  # Add grid
-               # Set axis limits
-               plt.xlim(0, self.endTime)
-               plt.ylim(-15, 20)
-               plt.savefig('solution/OneArm/deltaSig.png')
-               plt.show()
-            
-
-
-        
-        return    
-
-    def PlottingLB(self, data1, data2):
-        Time = self.timeVecOut
-        end = Time.shape[0]
-    
-        s1 = data1[1][0:end]
-        s2 = data2[1][0:end]
-        dots1 = data1[1][1*end:2*end]
-        dots2 = data2[1][1*end:2*end]
-        p1 = data1[1][2*end:3*end]
-        p1_2 = data2[1][2*end:3*end]
-        p2 = data1[1][3*end:4*end]
-        p2_2 = data2[1][3*end:4*end]
-        F1 = data1[1][4*end:5*end]
-        F2 = data2[1][4*end:5*end]
-        E1 = data1[1][5*end:6*end]
-        E2 = data2[1][5*end:6*end]
-    
-        # Control signal
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, self.inputTimeU1[:, 1],
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='Control')
-        plt.xlabel('Time, s')
-        plt.ylabel('Control signal, V')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-12, 12)
-        plt.legend()
-        plt.savefig('solution/OneArm/inputU1.png')
-        plt.show()
-        Control_signal = np.column_stack((Time, self.inputTimeU1[:, 1]))
-        sio.savemat('solution/OneArm/Control_signal.mat', {'u': Control_signal})
+        self.sensorCache = {}
+        try:
+            for name, values in channels.items():
+                if name not in self.recordedChannels:
+                    values[:] = np.nan
+                elif name in sensorChannels and sensorChannels[name][0] in DS:
+                    [sensor, column, inDegrees] = sensorChannels[name]
+                    values[:] = self.GetSensorData(DS[sensor])[0:n, column]
+                    if inDegrees:
+                        values *= 180
+                        values /= np.pi
+                elif name in stressChannels and self.Flexible:
+                    values[:] = self.GetStressSensorData(*stressChannels[name])[0:n, 1]
+            
+            recordedEnergy = [name for name in energyChannels if name in self.recordedChannels and name in channels]
+            if recordedEnergy:
+                FE = EnergyCalculation(self, *[self.GetSensorData(DS[sensor]) for sensor in energySensors])
+                for k, name in enumerate(energyChannels):
+                    if name in recordedEnergy:
+                        channels[name][:] = FE[k*n:(k+1)*n]
+        finally:
+            self.sensorCache = None
+        return outputData.reshape(-1)
     
-        # s1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, 1000*s1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='s1 Default')
-        plt.plot(Time, 1000*s2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='s1 Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('s, mm')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(930, 1200)
-        plt.legend()
-        plt.savefig('solution/OneArm/s1.png')
-        plt.show()
+    #model and solver settings stored with a SimulationResult
+    def GetResultMetadata(self, system):
+        timeIntegration = self.simulationSettings.timeIntegration
+        return {'variant':          'PatuCrane' if system else ('OptimisedLiftBoom' if self.OptimisedLB else 'LiftBoom'),
+                'Flexible':         bool(self.Flexible), 'nModes': int(self.nModes), 'mL': float(self.mL),
+                'maxModeFrequency': self.maxModeFrequency,
+                'nStepsTotal':      int(self.nStepsTotal), 'endTime': float(self.endTime),
+                'theta1':           float(self.mbs.variables.get('theta1', np.nan)),
+                'theta2':           float(self.mbs.variables.get('theta2', 0)),
+                'reducedModelKeys': list(self.reducedModelKeys),
+                'outputProfile':    dict(self.outputProfile),
+                'solver':           {'numberOfSteps':       int(timeIntegration.numberOfSteps),
+                                     'endTime':             float(timeIntegration.endTime),
+                                     'spectralRadius':      float(timeIntegration.generalizedAlpha.spectralRadius),
+                                     'useModifiedNewton':   bool(timeIntegration.newton.useModifiedNewton),
+                                     'linearSolverType':    str(self.simulationSettings.linearSolverType),
+                                     'valveSchedule':       bool(self.ValveSchedule),
+                                     'resumedStep':         None if self.resumedCheckpoint is None else 
+                                                            int(self.resumedCheckpoint['step']),
+                                     'staticInitialization':bool(self.StaticInitialization)},
+                'exudynVersion':    exu.__version__}
     
-        # dots1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, dots1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='dots1 Default')
-        plt.plot(Time, dots2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='dots1 Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('v, m/s')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-0.12, 0.12)
-        plt.legend()
-        plt.savefig('solution/OneArm/dots1.png')
-        plt.show()
+    #simulate input vectors with the same initial angles whose valve inputs agree in the first branchStep steps
+    #(default: all common steps, e.g. the idle phase before the valves open); the common prefix is integrated once, 
+    #the other runs continue from the checkpoint after the prefix, which is kept for later sweeps (see Checkpoint.py)
+    def ComputeBranches(self, inputVectors, system=None, OptimisedLB=False, outputProfile=None, branchStep=None,
+                        verboseMode=0):
+        branchStep  = BranchStep(self, inputVectors, system, branchStep)
+        results     = []
+        try:
+            for inputData in inputVectors:
+                if 0 < branchStep < self.nStepsTotal:
+                    self.branchRequest = [branchStep, CheckpointPath(BranchPrefixKey(self, inputData, branchStep, system,
+                                                                                     OptimisedLB, outputProfile))]
+                results += [self.ComputeModel(inputData, system=system, verboseMode=verboseMode, OptimisedLB=OptimisedLB,
+                                              outputProfile=outputProfile)]
+        finally:
+            self.branchRequest = None
+        return results
     
-        # p1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, p1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='p1 Default')
-        plt.plot(Time, p1_2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='p1 Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('p1, Pa')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-0.1e7, 1.6e7)
-        plt.legend()
-        plt.savefig('solution/OneArm/p1.png')
-        plt.show()
-    
-        # p2 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, p2,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='p2 Default')
-        plt.plot(Time, p2_2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='p2 Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('p2, Pa')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-1e6, 1e7)
-        plt.legend()
-        plt.savefig('solution/OneArm/p2.png')
-        plt.show()
-        
-        """
-        # delta_p comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, p1-p2,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='p2 Default')
-        plt.plot(Time, p1_2-p2_2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='p2 Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('delta_p, Pa')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-1e6, 1e7)
-        plt.legend()
-        plt.savefig('solution/OneArm/p2.png')
-        plt.show()
-        """
+    #fan out independent simulations over a process pool; workers build their models with the constructor arguments
+    #and initial pressures of this model, configs (dict or list of dicts, one per input vector) may override any of
+    #them and OptimisedLB, theta1 and theta2; yields (index, SimulationResult) in completion order
+    #on platforms without fork, call this from within if __name__ == '__main__':
+    def IterateBatch(self, inputVectors, configs=None, nWorkers=None, seed=0):
+        if configs is None or isinstance(configs, dict):
+            configs = [configs or {}]*len(inputVectors)
+        if len(inputVectors) == 1 and len(configs) > 1:
+            inputVectors = list(inputVectors)*len(configs)
+        if len(inputVectors) != len(configs):
+            raise ValueError('IterateBatch: number of input vectors and configs must agree')
         
-        # Force comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, F1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='F Default')
-        plt.plot(Time, F2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='F Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('F, N')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-4e4, 9e4)
-        plt.legend()
-        plt.savefig('solution/OneArm/F.png')
-        plt.show()
-        force = np.column_stack((Time, F1, F2))
-        sio.savemat('solution/OneArm/force.mat', {'F': force})
+        baseConfig = {**self.modelArgs, **{name: getattr(self, name) for name in batchModelAttributes},
+                      'OptimisedLB': getattr(self, 'OptimisedLB', False)}
+        jobs = [(i, inputVectors[i], {**baseConfig, **configs[i]}, seed+i) for i in range(len(configs))]
         
-        # Energy consumption comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, E1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='E Default')
-        plt.plot(Time, E2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='E Optimised')
-        plt.xlabel('Time, s')
-        plt.ylabel('E, J')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(0, 6500)
-        plt.legend()
-        plt.savefig('solution/OneArm/E.png')
-        plt.show()
-        E_results = np.column_stack((Time, E1, E2))
-        sio.savemat('solution/OneArm/E.mat', {'E': E_results})
+        if nWorkers == 1:
+            for job in jobs:
+                yield ComputeBatchWorker(*job)
+            return
         
-        if self.Flexible:
-            deltaEps1      = data1[1][6*end:7*end]
-            deltaEps2      = data2[1][6*end:7*end]
-            deltaSig1      = data1[1][7*end:8*end]
-            deltaSig2      = data2[1][7*end:8*end]
-            angle1         = data1[1][8*end:9*end]
-            angle2         = data2[1][8*end:9*end]
-            angVelocity1   = data1[1][9*end:10*end]
-            angVelocity2   = data2[1][9*end:10*end]
-            deflection1   = data1[1][10*end:11*end]
-            deflection2   = data2[1][10*end:11*end]
-            
-            #Strain
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, 1e6*deltaEps1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='deltaEps Default')
-            plt.plot(Time, 1e6*deltaEps2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='deltaEps Optimised')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel(r'$\epsilon$, $\mu$m')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-15, 25)
-            plt.legend()
-            plt.savefig('solution/OneArm/deltaEps.png')
-            plt.show()
-            
-            
-            #Stress
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, deltaSig1/1e6, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='deltaSig Default')
-            plt.plot(Time, deltaSig2/1e6, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='deltaSig Optimised')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel(r'$\sigma$, MPa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-55, 120)
-            plt.legend()
-            plt.savefig('solution/OneArm/deltaSig.png')
-            plt.show()
-            
-            #Deflection
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, deflection1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='tip deflection Default')
-            plt.plot(Time, deflection2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='tip deflection Optimised')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('Deflection, m')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-0.015, 0.015)
-            plt.legend()
-            plt.savefig('solution/OneArm/deflection.png')
-            plt.show()
-            deflectionY = np.column_stack((Time, deflection1, deflection2))
-            sio.savemat('solution/OneArm/deflection.mat', {'deflectionY': deflectionY})
-            
-            #Angle
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, angle1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='angle Default')
-            plt.plot(Time, angle2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='angle Optimised')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('Angle, °')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-5, 50)
-            plt.legend()
-            plt.savefig('solution/OneArm/angle.png')
-            plt.show()
-            Ang_results = np.column_stack((Time, angle1, angle2))
-            sio.savemat('solution/OneArm/angle.mat', {'AngVel': Ang_results})
-            
-            #Angular velocity
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, angVelocity1, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='angular velocity Default')
-            plt.plot(Time, angVelocity2, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='angular velocity Optimised')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel('Angular velocity, °/s')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-20, 15)
-            plt.legend()
-            plt.savefig('solution/OneArm/angVelocity.png')
-            plt.show()
-            AngVel_results = np.column_stack((Time, angVelocity1, angVelocity2))
-            sio.savemat('solution/OneArm/angVelocity.mat', {'angVelocity': AngVel_results})
-         
-  
-    def PlottingLB_OptRigidFlexComparison(self, data1, data2):
-        Time = self.timeVecOut
-        end = Time.shape[0]
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            futures = [executor.submit(ComputeBatchWorker, *job) for job in jobs]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
     
-        s1 = data1[1][0:end]
-        s2 = data2[1][0:end]
-        dots1 = data1[1][1*end:2*end]
-        dots2 = data2[1][1*end:2*end]
-        p1 = data1[1][2*end:3*end]
-        p1_2 = data2[1][2*end:3*end]
-        p2 = data1[1][3*end:4*end]
-        p2_2 = data2[1][3*end:4*end]
-        F1 = data1[1][4*end:5*end]
-        F2 = data2[1][4*end:5*end]
-        E1 = data1[1][5*end:6*end]
-        E2 = data2[1][5*end:6*end]
-        angle1 = data1[1][8*end:9*end]
-        angle2 = data2[1][8*end:9*end]
+    #same as IterateBatch, but returns the list of SimulationResults in the order of the inputs;
+    #callback(index, data) is called as soon as a simulation finishes
+    def ComputeBatch(self, inputVectors, configs=None, nWorkers=None, seed=0, callback=None):
+        results = {}
+        for index, data in self.IterateBatch(inputVectors, configs, nWorkers, seed):
+            results[index] = data
+            if callback is not None:
+                callback(index, data)
+        return [results[i] for i in range(len(results))]
     
-        # Control signal
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, self.inputTimeU1[:, 1],
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='Control')
-        plt.xlabel('Time, s')
-        plt.ylabel('Control signal, V')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-12, 12)
-        plt.legend()
-        plt.savefig('solution/OneArm/inputU1.png')
-        plt.show()
-        Control_signal = np.column_stack((Time, self.inputTimeU1[:, 1]))
-        sio.savemat('solution/OneArm/Control_signal.mat', {'u': Control_signal})
     
-        # s1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, 1000*s1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='s1 Rigid')
-        plt.plot(Time, 1000*s2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='s1 Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('s, mm')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(900, 1200)
-        plt.legend()
-        plt.savefig('solution/OneArm/s1.png')
-        plt.show()
+    #named channels of a result for the report figures, incl. the control signals of its input vector
+    def ReportChannels(self, data):
+        data    = AsSimulationResult(data, self.timeVecOut, self.Patu)
+        inputs  = self.SplitInputData(np.asarray(data.inputData), self.Patu)
+        k       = self.nStepsTotal//len(data.time)      # decimation of the output channels
+        time    = data.time if np.all(np.isfinite(data.time)) else self.timeVecOut[::k]
+        return {'time': time, **{name: inputs[name][::k] for name in ['U', 'U1', 'U2'] if name in inputs}, **data.channels}
     
-        # dots1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, dots1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='dots1 Rigid')
-        plt.plot(Time, dots2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='dots1 Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('v, m/s')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-0.12, 0.12)
-        plt.legend()
-        plt.savefig('solution/OneArm/dots1.png')
-        plt.show()
+    def ReportFigures(self):
+        if self.Patu:
+            return reportFiguresPatu + (reportFiguresPatuFlexible if self.Flexible else [])
+        return reportFiguresLiftBoom + (reportFiguresLiftBoomFlexible if self.Flexible else [])
     
-        # p1 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, p1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='p1 Rigid')
-        plt.plot(Time, p1_2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='p1 Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('p1, Pa')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-0.1e7, 1.6e7)
-        plt.legend()
-        plt.savefig('solution/OneArm/p1.png')
-        plt.show()
+    #figures of one result in solution/TwoArms or solution/OneArm (or outputDir), see Report.py;
+    #returns the list of rendered figures, unchanged figures are skipped
+    def Plotting(self, data, outputDir=None, nWorkers=None): 
+        if outputDir is None:
+            outputDir = 'solution/TwoArms' if self.Patu else 'solution/OneArm'
+        return RenderFigures(ReportJobs(self.ReportFigures(), [self.ReportChannels(data)], outputDir), nWorkers)
     
-        # p2 comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, p2,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='p2 Rigid')
-        plt.plot(Time, p2_2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='p2 Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('p2, Pa')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-1e6, 1e7)
-        plt.legend()
-        plt.savefig('solution/OneArm/p2.png')
-        plt.show()
-        
-        # Force comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, F1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='F Rigid')
-        plt.plot(Time, F2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='F Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('F, N')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-5.5e4, 1e5)
-        plt.legend()
-        plt.savefig('solution/OneArm/F.png')
-        plt.show()
-        ForceRxF_results = np.column_stack((Time, F1, F2))
-        sio.savemat('solution/OneArm/ForceRxF_results.mat', {'ForceRxF_results': ForceRxF_results})
-        
-        # Force difference
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, F1-F2,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='green', label='Rigid and flexible optimised lb difference')
-        plt.xlabel('Time, s')
-        plt.ylabel('F, N')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(-5.5e4, 1e5)
-        plt.legend()
-        plt.savefig('solution/OneArm/F.png')
-        plt.show()
-        
-        # Energy consumption comparison
-        plt.figure(figsize=(10, 5))
-        plt.plot(Time, E1,
-                 linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='E Rigid')
-        plt.plot(Time, E2,
-                 linestyle='--', marker='o', linewidth=1, markersize=2, color='red', label='E Flexible')
-        plt.xlabel('Time, s')
-        plt.ylabel('E, J')
-        plt.grid(True)
-        plt.xlim(0, self.endTime)
-        plt.ylim(0, 6500)
-        plt.legend()
-        plt.savefig('solution/OneArm/E.png')
-        plt.show()
-        E_results = np.column_stack((Time, E1, E2))
-        sio.savemat('solution/OneArm/E_RxF.mat', {'E': E_results})
+    #figures of Plotting for many stored results (file paths without '.result'), all rendered in one process pool;
+    #figures of a result go to the directory <filePath>_plots
+    def PlotResultFiles(self, filePaths, nWorkers=None):
+        jobs = []
+        for filePath in filePaths:
+            result  = LoadSimulationResult(filePath, endTime=self.endTime, system=self.Patu)
+            jobs   += ReportJobs(self.ReportFigures(), [self.ReportChannels(result)], filePath + '_plots')
+        return RenderFigures(jobs, nWorkers)
     
+    #default (data1) and optimised (data2) lift boom
+    def PlottingLB(self, data1, data2, outputDir='solution/OneArm', nWorkers=None):
+        figures = reportFiguresComparison + (reportFiguresComparisonFlexible if self.Flexible else [])
+        return RenderFigures(ReportJobs(figures, [self.ReportChannels(data1), self.ReportChannels(data2)], outputDir,
+                                        ['Default', 'Optimised']), nWorkers)
     
-        #Angle
-        plt.figure(figsize=(10, 5))
-        # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-        #  linewidth=1, markersize=2, color='green')
-        plt.plot(Time, angle1, #label='Simulation', 
-                linestyle='-', marker='x', linewidth=1, markersize=2, color='black', label='angle Default')
-        plt.plot(Time, angle2, #label='Simulation', 
-                linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='angle Optimised')
-        plt.xlabel('Time, s')  # Adjust label as appropriate
-        plt.ylabel('Angle, °')  # Adjust label as appropriate
-        plt.grid(True)  # Add grid
-        # Set axis limits
-        plt.xlim(0, self.endTime)
-        plt.ylim(-5, 50)
-        plt.legend()
-        plt.savefig('solution/OneArm/angle.png')
-        plt.show()
-        AngleRxF_results = np.column_stack((Time, angle1, angle2))
-        sio.savemat('solution/OneArm/AngleRxF_results.mat', {'AngleRxF_results': AngleRxF_results})
-        
-        
-        if self.Flexible:
-            deltaEps1      = data1[1][6*end:7*end]
-            deltaEps2      = data2[1][6*end:7*end]
-            deltaSig1      = data1[1][7*end:8*end]
-            deltaSig2      = data2[1][7*end:8*end]
-            angle1         = data1[1][8*end:9*end]
-            angle2         = data2[1][8*end:9*end]
-            angVelocity1   = data1[1][9*end:10*end]
-            angVelocity2   = data2[1][9*end:10*end]
-            
-               
-            #Stress
-            plt.figure(figsize=(10, 5))
-            # plt.plot(Time, ExpData[0:end,16], label='Experimental', marker='x', 
-            #  linewidth=1, markersize=2, color='green')
-            plt.plot(Time, deltaSig2/1e6, #label='Simulation', 
-                    linestyle='-', marker='x', linewidth=1, markersize=2, color='red', label='deltaSig Flexible')
-            plt.xlabel('Time, s')  # Adjust label as appropriate
-            plt.ylabel(r'$\sigma$, MPa')  # Adjust label as appropriate
-            plt.grid(True)  # Add grid
-            # Set axis limits
-            plt.xlim(0, self.endTime)
-            plt.ylim(-100, 100)
-            plt.legend()
-            plt.savefig('solution/OneArm/deltaSig.png')
-            plt.show()
-            optlbStress_results = np.column_stack((Time, deltaSig2/1e6))
-            sio.savemat('solution/OneArm/optlbStress_results.mat', {'optlbStress_results': optlbStress_results})
+    #rigid (data1) and flexible (data2) optimised lift boom
+    def PlottingLB_OptRigidFlexComparison(self, data1, data2, outputDir='solution/OneArm', nWorkers=None):
+        figures = reportFiguresRigidFlexible + (reportFiguresRigidFlexibleFlexible if self.Flexible else [])
+        return RenderFigures(ReportJobs(figures, [self.ReportChannels(data1), self.ReportChannels(data2)], outputDir,
+                                        ['Rigid', 'Flexible']), nWorkers)
             
 #%%+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 if __name__ == '__main__': #include this to enable parallel processing
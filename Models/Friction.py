@@ -0,0 +1,61 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #FRICTION
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Cylinder friction models for the ObjectConnectorSpringDamper friction connectors.
+# The force laws are written once over a math namespace 'm': with exudyn.symbolic
+# they are recorded into a symbolic user function evaluated in C++ without
+# calling back into Python; with pythonMath they give the former Python
+# springForceUserFunction (optionally printing the force, off by default).
+
+from Models.Container import *
+from types import SimpleNamespace
+
+
+symbolicFriction    = True      # False: Python springForceUserFunction
+frictionLogging     = False     # print friction force at every call (Python user function only)
+
+pythonMath          = SimpleNamespace(tanh=np.tanh, exp=np.exp, abs=abs, sign=np.sign,
+                                      IfThenElse=lambda condition, a, b: a if condition else b)
+
+
+def StribeckFriction(m, vel, muDynamic, muStaticOffset, muViscous=0, expVel=1e-3, regVel=1e-3):
+    #same as exudyn.physics.StribeckFunction
+    v = m.abs(vel)-regVel
+    return m.IfThenElse(m.abs(vel) <= regVel, (muDynamic + muStaticOffset)*vel/regVel,
+                        m.sign(vel)*(muDynamic + muStaticOffset*m.exp(-v/expVel) + muViscous*v))
+
+
+#friction of lift cylinder in LiftBoom and OptimisedLiftBoom, parameters Fc, Fs, sig2, vs from Container.py
+def LiftCylinderFriction(m, u, v, k, d, F0):
+    return 20*(Fc*m.tanh(4*(m.abs(v)/vs))+(Fs-Fc)*((m.abs(v)/vs)/((1/4)*(m.abs(v)/vs)**2+3/4)**2))*m.sign(v)+sig2*v*tanh(4)
+
+#friction + nonlinear spring of cylinder 1 and 2 in PatuCrane
+def CylinderFriction1(m, u, v, k, d, F0):
+    return 1*StribeckFriction(m, v, muDynamic=1, muStaticOffset=1.5, regVel=1e-4)+(k*(u) + d*v + k*(u)**3-F0)
+
+def CylinderFriction2(m, u, v, k, d, F0):
+    return 1*StribeckFriction(m, v, muDynamic=0.5, muStaticOffset=0.5, regVel=1e-2) - (k*(u) - d*v + k*(u)**3 -F0)
+
+
+#create springForceUserFunction for ObjectConnectorSpringDamper from a force law above;
+#symbolic functions are kept in mbs.variables, as they must live as long as the mbs
+def FrictionUserFunction(mbs, ForceLaw, symbolic=None):
+    if symbolic is None:
+        symbolic = symbolicFriction
+
+    if symbolic:
+        def springForceUserFunction(mbs, t, itemNumber, deltaL, deltaL_t, stiffness, damping, force):
+            return ForceLaw(exu.symbolic, deltaL, deltaL_t, stiffness, damping, force)
+
+        symbolicFunction = CreateSymbolicUserFunction(mbs, springForceUserFunction, 'springForceUserFunction',
+                                                      itemTypeName='ObjectConnectorSpringDamper')
+        mbs.variables.setdefault('symbolicUserFunctions', []).append(symbolicFunction)
+        return symbolicFunction
+
+    def UFfriction(mbs, t, itemIndex, u, v, k, d, f0):
+        Ff = ForceLaw(pythonMath, u, v, k, d, f0)
+        if frictionLogging:
+            print(ForceLaw.__name__ + ':', Ff)
+        return Ff
+
+    return ProfiledCallback('friction', UFfriction)
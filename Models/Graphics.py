@@ -0,0 +1,80 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #GRAPHICS
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Lazy registry of the STL body graphics. A body is only parsed when a model
+# asks for it, the processed mesh (edges, smoothed normals) is kept in memory
+# for the process and in a binary cache on disk keyed by the STL content hash.
+# In headless mode no geometry is loaded at all.
+
+from Models.Container import *
+import hashlib
+
+
+graphicsCacheDir        = 'AbaqusMesh/GraphicsCache'
+graphicsCacheVersion    = 1
+headlessGraphics        = os.environ.get('HYDRAULICS_HEADLESS', '0') not in ['', '0', 'false', 'False']
+
+# name: [STL file, color]
+graphicsRegistry        = {'Pillar':            [fileName1, color4black],
+                           'LiftBoom':          [fileName2, color4blue],
+                           'TiltBoom':          [fileName3, color4blue],
+                           'Bracket1':          [fileName4, color4blue],
+                           'Bracket2':          [fileName5, color4blue],
+                           'ExtensionBoom':     [fileName6, color4blue],
+                           'OptimisedLiftBoom': [fileName7, color4blue],
+                           }
+
+graphicsBodies          = {}    # in-memory cache of processed graphics, per process
+
+
+def SetHeadlessGraphics(flag=True):
+    global headlessGraphics
+    headlessGraphics = flag
+
+
+def EmptyGraphics():
+    return {'type': 'TriangleList', 'points': [], 'triangles': [], 'colors': [], 'normals': []}
+
+
+def GraphicsCacheFile(fileName, color):
+    with open(fileName, 'rb') as f:
+        h = hashlib.sha1(f.read())
+    h.update(np.array(color, dtype=float).tobytes())
+    h.update(str(graphicsCacheVersion).encode())
+    return os.path.join(graphicsCacheDir, os.path.basename(fileName).split('.')[0] + '_' + h.hexdigest()[:16] + '.npz')
+
+
+def LoadGraphicsBody(fileName, color):
+    cacheFile = GraphicsCacheFile(fileName, color)
+
+    if os.path.isfile(cacheFile):
+        with np.load(cacheFile) as data:
+            return {'type': 'TriangleList', **{key: data[key] for key in data.files}}
+
+    gData   = GraphicsDataFromSTLfile(fileName, color, verbose=False, invertNormals=True, invertTriangles=True)
+    gData   = AddEdgesAndSmoothenNormals(gData, edgeAngle=0.25*pi, addEdges=True, smoothNormals=True)
+
+    try:
+        os.makedirs(graphicsCacheDir, exist_ok=True)
+        tmpFile = cacheFile + '.%d.tmp' % os.getpid()          # parallel workers may build the same body
+        with open(tmpFile, 'wb') as f:
+            np.savez(f, **{key: np.asarray(value) for key, value in gData.items() if key != 'type'})
+        os.replace(tmpFile, cacheFile)
+    except OSError:
+        pass    # read-only checkout: keep the in-memory result only
+
+    return gData
+
+
+@Profiled('graphics')
+def GetGraphicsBody(name, headless=None):
+    if headless is None:
+        headless = headlessGraphics
+    if headless:
+        return EmptyGraphics()
+
+    if name not in graphicsBodies:
+        [fileName, color]       = graphicsRegistry[name]
+        graphicsBodies[name]    = LoadGraphicsBody(fileName, color)
+
+    return graphicsBodies[name]
@@ -0,0 +1,79 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #NODE INDEX
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# KD-tree over the FE mesh nodes for boundary-node and sensor-node lookups.
+# Same results as FEMinterface.GetNodesOnCylinder / GetNodeAtPoint /
+# GetNodesInCube, but candidates are found in the tree and only those are
+# checked, instead of scanning all nodes in Python per query. The index is built
+# once per mesh and process (keyed by the node coordinates), so rebuilding a
+# model with a reloaded FEMinterface reuses it.
+
+from Models.Container import *
+from scipy.spatial import cKDTree
+
+
+nodeIndices     = {}    # per process: hash of node coordinates -> NodeIndex
+
+
+class NodeIndex():
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.tree   = cKDTree(self.points)
+
+    #first node within tolerance (max. coordinate difference) of point, as FEMinterface.GetNodeAtPoint
+    @Profiled('markerLookup')
+    def GetNodeAtPoint(self, point, tolerance=1e-5, raiseException=True):
+        node = self.GetNodesAtPoints([point], tolerance)[0]
+        if node < 0 and raiseException:
+            raise ValueError("ERROR: GetNodeAtPoint: node point not found!")
+        return int(node)
+
+    #batch version of GetNodeAtPoint; returns array of node numbers, -1 if not found
+    @Profiled('markerLookup')
+    def GetNodesAtPoints(self, points, tolerance=1e-5):
+        candidates  = self.tree.query_ball_point(np.asarray(points, dtype=float).reshape(-1, 3), tolerance, p=np.inf)
+        return np.array([min(c) if len(c) else -1 for c in candidates], dtype=int)
+
+    #nodes with pMin <= position <= pMax, as FEMinterface.GetNodesInCube
+    @Profiled('markerLookup')
+    def GetNodesInCube(self, pMin, pMax):
+        pMin        = np.asarray(pMin, dtype=float)
+        pMax        = np.asarray(pMax, dtype=float)
+        rBox        = 0.5*np.max(pMax - pMin)*(1+1e-12) + 1e-15      #slightly enlarged against round-off at the faces
+        candidates  = np.array(self.tree.query_ball_point(0.5*(pMin + pMax), rBox, p=np.inf), dtype=int)
+        p           = self.points[candidates]
+        inside      = np.all((p >= pMin) & (p <= pMax), axis=1)
+        return sorted(candidates[inside].tolist())
+
+    #nodes on cylinder surface with axis p1-p2, as FEMinterface.GetNodesOnCylinder
+    @Profiled('markerLookup')
+    def GetNodesOnCylinder(self, p1, p2, radius, tolerance=1e-5):
+        p1          = np.asarray(p1, dtype=float)
+        v0          = np.asarray(p2, dtype=float) - p1
+        lAxis       = np.linalg.norm(v0)
+        if lAxis != 0:
+            v0 = v0/lAxis
+
+        #all candidates lie in the sphere around the axis midpoint enclosing the (tolerance-enlarged) cylinder
+        rSphere     = np.sqrt((0.5*lAxis + tolerance)**2 + (radius + tolerance)**2)
+        candidates  = np.array(sorted(self.tree.query_ball_point(p1 + 0.5*lAxis*v0, rSphere*(1+1e-12))), dtype=int)
+        p           = self.points[candidates]
+        s           = (p - p1) @ v0
+        r           = np.linalg.norm(p - (p1 + s[:,None]*v0), axis=1)      #shortest distance to axis
+        onSurface   = (s <= lAxis + tolerance) & (s >= -tolerance) & (np.abs(r - radius) <= tolerance)
+        return candidates[onSurface].tolist()
+
+    #batch version of GetNodesOnCylinder; cylinders = [[p1, p2, radius, tolerance], ...]
+    @Profiled('markerLookup')
+    def GetNodesOnCylinders(self, cylinders):
+        return [self.GetNodesOnCylinder(*cylinder) for cylinder in cylinders]
+
+
+#spatial index of the nodes of fem, built once per mesh
+@Profiled('markerLookup')
+def GetNodeIndex(fem):
+    points  = fem.GetNodePositionsAsArray()
+    key     = HashValues(np.asarray(points, dtype=float))
+    if key not in nodeIndices:
+        nodeIndices[key] = NodeIndex(points)
+    return nodeIndices[key]
@@ -0,0 +1,98 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #OUTPUT PROFILE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Per-run selection of what a simulation records. Only the sensors of the
+# requested output channels (plus explicitly requested sensors) keep their
+# history in memory; e.g. the cylinder force sensors are not read by
+# ComputeModel and are not stored by default. Sensors are written every
+# decimation-th step, so sensor memory of long runs shrinks by that factor, and
+# the coordinates solution file can be restricted to runs with solutionViewer.
+# Channels which are not recorded are NaN in the SimulationResult.
+
+from Models.Container import *
+
+
+# NNHydraulics(outputProfile=dict) and ComputeModel(outputProfile=dict) override single entries
+outputProfileDefaults   = {'channels':      None,       # output channels to record, None: all
+                           'sensors':       [],         # further dictSensors names to store, e.g. ['sForce'] for GetSensorData
+                           'decimation':    1,          # sensors and output channels every decimation-th step
+                           'solutionFile':  True}       # False: coordinates solution file only with solutionViewer=True
+
+# output channel -> [sensor, column of the stored sensor data, in degrees (rad -> deg)]
+sensorChannelsLiftBoom  = {'s':             ['sDistance', 1, False],
+                           'ds':            ['sVelocity', 1, False],
+                           'p1':            ['sPressures', 1, False],
+                           'p2':            ['sPressures', 2, False],
+                           'strain':        ['StrainPoint', 6, False],
+                           'angle':         ['sAngle', 3, True],
+                           'angVelocity':   ['sAngVelocity', 3, True],
+                           'deflection':    ['deltaY', 2, False]}
+sensorChannelsPatu      = {'s1':            ['sDistance1', 1, False],
+                           's2':            ['sDistance2', 1, False],
+                           'ds1':           ['sVelocity1', 1, False],
+                           'ds2':           ['sVelocity2', 1, False],
+                           'p1':            ['sPressures1', 1, False],
+                           'p2':            ['sPressures1', 2, False],
+                           'p3':            ['sPressures2', 1, False],
+                           'p4':            ['sPressures2', 2, False],
+                           'strain1':       ['StrainF1', 1, False],
+                           'strain2':       ['StrainF2', 1, False]}
+
+# stress channel -> [stress sensor, strain sensor, flexible body], see GetStressSensorData (flexible models only)
+stressChannels          = {'stress':        ['StressPoint', 'StrainPoint', 'LiftBoom'],
+                           'stress1':       ['Stress1', 'StrainF1', 'LiftBoom'],
+                           'stress2':       ['Stress2', 'StrainF2', 'TiltBoom']}
+
+# cylinder force and energy of the lift boom, see EnergyCalculation
+energyChannels          = ['F', 'E']
+energySensors           = ['sDistance', 'sPressures']
+
+
+#output profile of a run: defaults, overridden by the model profile and by the profile of the run
+def OutputProfileOptions(*profiles):
+    options = dict(outputProfileDefaults)
+    for profile in profiles:
+        options.update(profile or {})
+    return options
+
+
+#names of the sensors needed for the output channels channels
+def ChannelSensors(channels, system):
+    sensorChannels = sensorChannelsPatu if system else sensorChannelsLiftBoom
+    sensors = set()
+    for channel in channels:
+        if channel in sensorChannels:
+            sensors.add(sensorChannels[channel][0])
+        if channel in stressChannels:
+            sensors.update(stressChannels[channel][0:2])
+        if channel in energyChannels:
+            sensors.update(energySensors)
+    return sensors
+
+
+#set sensor storage, sensor write period and solution file of the built model for one run with profile options;
+#sets self.recordedChannels and self.nOutputSteps
+def ApplyOutputProfile(self, options, system, solutionViewer=False):
+    decimation = int(options['decimation'])
+    if decimation < 1 or self.nStepsTotal % decimation:
+        raise ValueError('ApplyOutputProfile: decimation must be a divisor of nStepsTotal')
+
+    channelNames            = outputChannelsPatu if system else outputChannelsLiftBoom
+    self.recordedChannels   = channelNames if options['channels'] is None else [name for name in channelNames
+                                                                                 if name in options['channels']]
+    self.nOutputSteps       = self.nStepsTotal//decimation
+
+    stored = ChannelSensors(self.recordedChannels, system) | set(options['sensors'])
+    for name, sensor in self.dictSensors.items():
+        self.mbs.SetSensorParameter(sensor, 'storeInternal', name in stored or name.startswith('modalCoordinates'))
+
+    solutionSettings = self.simulationSettings.solutionSettings
+    #SolveSteps of the stepwise solve restarts the write period in every segment: write every step, see SensorRows
+    solutionSettings.sensorsWritePeriod     = (1 if self.stepwiseSolve else decimation)*self.endTime/self.nStepsTotal
+    solutionSettings.writeSolutionToFile    = bool(options['solutionFile'] or solutionViewer)
+
+
+#time axis of the output channels of the last run
+def OutputTime(self):
+    decimation = self.nStepsTotal//self.nOutputSteps
+    return self.timeVecOut[::decimation].copy()
@@ -0,0 +1,126 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #POST-PROCESSING MODES
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Strain/stress modes of the HCB basis for the Tet4 meshes, vectorized over
+# elements and modes and optionally only for a subset of nodes (e.g. the strain
+# sensor nodes). Values are those of FEMinterface.ComputePostProcessingModes:
+# constant element strain, averaged over the elements attached to a node.
+# Rows of nodes which were not requested are zero; the computed nodes are listed
+# in postProcessingModes['nodes'], more nodes can be added later. In the reduced
+# model cache only the computed rows are stored.
+
+from Models.Container import *
+import scipy.sparse
+
+
+postProcessingChunkSize = 20000     # elements per block of the strain computation
+
+
+#Tet4 element list of fem, as required by FEMinterface.ComputePostProcessingModes
+def TetElements(fem):
+    if len(fem.elements) != 1 or 'Tet4' not in fem.elements[0]:
+        raise ValueError('PostProcessingModes: only implemented for FEMinterface with one list of Tet4 elements')
+    return np.asarray(fem.elements[0]['Tet4'], dtype=int)
+
+
+#shape function gradients (nElements x 4 x 3) of linear tetrahedra with corner points (nElements x 4 x 3)
+def TetShapeGradients(points):
+    J       = points[:, 1:, :] - points[:, :1, :]               #rows: edges from node 0
+    grad    = np.transpose(np.linalg.inv(J), (0, 2, 1))          #gradients of shape functions 1..3
+    return np.concatenate((-np.sum(grad, axis=1, keepdims=True), grad), axis=1)
+
+
+#element strain (or stress) modes (nElements x 6*nModes, components xx,yy,zz,yz,xz,xy per mode)
+def ElementPostProcessingModes(fem, elements, material, outputVariableType):
+    nodes       = np.asarray(fem.nodes['Position'], dtype=float)
+    modes       = np.asarray(fem.modeBasis['matrix'])
+    nModes      = modes.shape[1]
+    modes3      = modes.reshape(-1, 3, nModes)
+    values      = np.zeros((len(elements), nModes, 6))
+
+    for i in range(0, len(elements), postProcessingChunkSize):
+        elems   = elements[i:i+postProcessingChunkSize]
+        B0      = TetShapeGradients(nodes[elems])
+        grad    = np.einsum('ekim,ekj->emij', modes3[elems], B0)        #displacement gradient per mode
+        values[i:i+len(elems)] = np.stack((grad[...,0,0], grad[...,1,1], grad[...,2,2], grad[...,1,2]+grad[...,2,1],
+                                           grad[...,0,2]+grad[...,2,0], grad[...,0,1]+grad[...,1,0]), axis=-1)
+
+    if str(outputVariableType) == 'OutputVariableType.StressLocal':
+        if material == 0:
+            raise ValueError('PostProcessingModes: if material=0, outputVariableType must be StrainLocal')
+        values = values @ np.asarray(material.elasticityTensor).T
+    elif str(outputVariableType) != 'OutputVariableType.StrainLocal':
+        raise ValueError('PostProcessingModes: invalid outputVariableType')
+    return values.reshape(len(elements), 6*nModes)
+
+
+#post-processing mode rows (len(nodes) x 6*nModes) at nodes, averaged over the attached elements
+def PostProcessingModeRows(fem, nodes, material, outputVariableType):
+    nodes       = np.asarray(nodes, dtype=int)
+    elements    = TetElements(fem)
+    attached    = np.nonzero(np.isin(elements, nodes).any(axis=1))[0]
+    elements    = elements[attached]
+
+    #incidence of requested nodes and attached elements
+    row         = np.full(fem.NumberOfNodes(), -1)
+    row[nodes]  = np.arange(len(nodes))
+    [e, k]      = np.nonzero(row[elements] >= 0)
+    incidence   = scipy.sparse.csr_matrix((np.ones(len(e)), (row[elements[e, k]], e)),
+                                          shape=(len(nodes), len(elements)))
+    counts      = np.maximum(np.asarray(incidence.sum(axis=1)).ravel(), 1)
+
+    values      = ElementPostProcessingModes(fem, elements, material, outputVariableType)
+    return (incidence @ values)/counts[:, None]
+
+
+#nodes of postProcessingNodes whose rows are not yet in fem.postProcessingModes (None: all nodes)
+def MissingPostProcessingNodes(fem, postProcessingNodes=None):
+    ppm = fem.postProcessingModes
+    if 'matrix' not in ppm or ppm['matrix'].shape[1] != 6*fem.modeBasis['matrix'].shape[1]:
+        return np.arange(fem.NumberOfNodes()) if postProcessingNodes is None else np.unique(postProcessingNodes)
+    if 'nodes' not in ppm:
+        return np.array([], dtype=int)
+    if postProcessingNodes is None:
+        return np.setdiff1d(np.arange(fem.NumberOfNodes()), ppm['nodes'])
+    return np.setdiff1d(postProcessingNodes, ppm['nodes'])
+
+
+#compute post-processing modes of fem for postProcessingNodes (None: all nodes) in fem.postProcessingModes,
+#as fem.ComputePostProcessingModes; rows computed before are kept; returns number of computed nodes
+def ComputePostProcessingModesAtNodes(fem, material, outputVariableType, postProcessingNodes=None):
+    missing = MissingPostProcessingNodes(fem, postProcessingNodes)
+    if len(missing) == 0:
+        return 0
+
+    ppm     = fem.postProcessingModes
+    if len(missing) == fem.NumberOfNodes():
+        fem.postProcessingModes = {'matrix': PostProcessingModeRows(fem, missing, material, outputVariableType),
+                                   'outputVariableType': outputVariableType}
+        return len(missing)
+
+    if 'nodes' in ppm and ppm['matrix'].shape[1] == 6*fem.modeBasis['matrix'].shape[1]:
+        [matrix, nodes] = [np.array(ppm['matrix']), np.union1d(ppm['nodes'], missing)]
+    else:
+        [matrix, nodes] = [np.zeros((fem.NumberOfNodes(), 6*fem.modeBasis['matrix'].shape[1])), missing]
+    matrix[missing] = PostProcessingModeRows(fem, missing, material, outputVariableType)
+    if len(nodes) == fem.NumberOfNodes():
+        fem.postProcessingModes = {'matrix': matrix, 'outputVariableType': outputVariableType}
+    else:
+        fem.postProcessingModes = {'matrix': matrix, 'outputVariableType': outputVariableType, 'nodes': nodes}
+    return len(missing)
+
+
+#compact form of postProcessingModes for storage: only rows of computed nodes
+def PackPostProcessingModes(ppm):
+    if 'nodes' not in ppm:
+        return ppm
+    return {'rows': np.ascontiguousarray(ppm['matrix'][ppm['nodes']]), 'nodes': np.asarray(ppm['nodes']),
+            'nNodes': len(ppm['matrix']), 'outputVariableType': ppm['outputVariableType']}
+
+
+def UnpackPostProcessingModes(data):
+    if 'rows' not in data:
+        return data
+    matrix = np.zeros((data['nNodes'], data['rows'].shape[1]))
+    matrix[data['nodes']] = data['rows']
+    return {'matrix': matrix, 'outputVariableType': data['outputVariableType'], 'nodes': np.array(data['nodes'])}
@@ -0,0 +1,151 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #PROFILING
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Per-phase timing of NNHydraulics.ComputeModel. Functions of the model build
+# and solve are tagged with a phase (graphics, femLoad, markerLookup, reduction,
+# assemble, staticInit, dynamicSolve, ...); while a run is profiled, the time of
+# every phase is accumulated exclusively, i.e. without the nested phases, so the
+# phases add up to the run time. Python user functions (PreStepUserFunction,
+# friction, stress sensors) are counted and timed, Newton statistics are taken
+# from the static and dynamic solver. The record is stored in the metadata of
+# the SimulationResult ('profile'); outside of a profiled run the tags only cost
+# one check.
+
+import os, sys, time, functools
+
+try:
+    import resource
+except ImportError:
+    resource = None     # Windows: no peak RSS
+
+
+profileVersion      = 1
+activeProfiler      = None      # profiler of the running ComputeModel, per process
+moduleImportTime    = None      # time for 'from Models.Container import *', set at the end of Container.py
+
+solverIterationFields = ['currentStepIndex', 'newtonStepsCount', 'newtonJacobiCount', 'rejectedModifiedNewtonSteps',
+                         'discontinuousIterationsCount']
+solverTimerFields   = ['total', 'factorization', 'newtonIncrement', 'integrationFormula', 'ODE2RHS', 'ODE1RHS', 'AERHS',
+                       'totalJacobian', 'jacobianODE2', 'jacobianODE2_t', 'jacobianODE1', 'jacobianAE', 'massMatrix',
+                       'reactionForces', 'postNewton', 'writeSolution', 'python', 'overhead']
+
+
+def SetModuleImportTime(t):
+    global moduleImportTime
+    moduleImportTime = t
+
+
+#peak resident set size of the process in bytes, None if not available
+def PeakRSSBytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == 'darwin' else 1024*peak)     # kB on Linux
+
+
+class Profiler():
+    def __init__(self):
+        self.phases     = {}    # name -> {'time', 'calls'}, exclusive of nested phases
+        self.callbacks  = {}    # name -> {'time', 'calls'}
+        self.solvers    = {}    # 'static'/'dynamic' -> iteration statistics of the last solve
+        self.stack      = []    # [name, start of the currently counted interval]
+        self.startTime  = time.perf_counter()
+
+    def Enter(self, name):
+        now = time.perf_counter()
+        if self.stack:
+            self.Add(self.phases, self.stack[-1][0], now - self.stack[-1][1], 0)
+        self.stack.append([name, now])
+
+    def Exit(self):
+        now = time.perf_counter()
+        [name, start] = self.stack.pop()
+        self.Add(self.phases, name, now - start, 1)
+        if self.stack:
+            self.stack[-1][1] = now
+
+    def Add(self, table, name, dt, calls):
+        entry           = table.setdefault(name, {'time': 0., 'calls': 0})
+        entry['time']  += dt
+        entry['calls'] += calls
+
+    #iteration statistics (and solver timers, if enabled with simulationSettings.displayComputationTime)
+    def AddSolver(self, name, solver):
+        stats = {field: int(getattr(solver.it, field)) for field in solverIterationFields}
+        if solver.timer.useTimer:
+            stats['timer'] = {field: float(getattr(solver.timer, field)) for field in solverTimerFields}
+        self.solvers[name] = stats
+
+    def Record(self):
+        return {'version':          profileVersion,
+                'totalTime':        time.perf_counter() - self.startTime,
+                'moduleImportTime': moduleImportTime,
+                'phases':           self.phases,
+                'callbacks':        self.callbacks,
+                'solvers':          self.solvers,
+                'peakRSSBytes':     PeakRSSBytes()}
+
+
+#decorator: time the function as phase name of the active profiler; nested calls of the same phase count once
+def Profiled(name):
+    def Decorator(function):
+        @functools.wraps(function)
+        def ProfiledFunction(*args, **kwargs):
+            profiler = activeProfiler
+            if profiler is None or (profiler.stack and profiler.stack[-1][0] == name):
+                return function(*args, **kwargs)
+            profiler.Enter(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.Exit()
+        return ProfiledFunction
+    return Decorator
+
+
+#Python user function counting calls and time as callback name of the active profiler
+def ProfiledCallback(name, function):
+    def ProfiledUserFunction(*args):
+        profiler = activeProfiler
+        if profiler is None:
+            return function(*args)
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            profiler.Add(profiler.callbacks, name, time.perf_counter() - start, 1)
+    return ProfiledUserFunction
+
+
+#record iteration statistics of an exudyn solver (name: 'static' or 'dynamic') in the active profiler
+def ProfileSolver(name, solver):
+    if activeProfiler is not None and solver is not None:
+        activeProfiler.AddSolver(name, solver)
+
+
+@Profiled('assemble')
+def AssembleSystem(mbs):
+    mbs.Assemble()
+
+
+#decorator for NNHydraulics.ComputeModel: with self.Profiling, the run is profiled and the record is stored in
+#self.profile and in the metadata of the result; time of ComputeModel outside the tagged phases (input split,
+#output extraction, result creation) is counted as 'outputExtraction'
+def ProfiledRun(ComputeModel):
+    @functools.wraps(ComputeModel)
+    def ProfiledComputeModel(self, *args, **kwargs):
+        global activeProfiler
+        if not getattr(self, 'Profiling', False) or activeProfiler is not None:
+            return ComputeModel(self, *args, **kwargs)
+
+        profiler = activeProfiler = Profiler()
+        try:
+            profiler.Enter('outputExtraction')
+            result = ComputeModel(self, *args, **kwargs)
+            profiler.Exit()
+        finally:
+            activeProfiler = None
+        self.profile                = profiler.Record()
+        result.metadata['profile']  = self.profile
+        return result
+    return ProfiledComputeModel
@@ -0,0 +1,207 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #REPORT
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Declarative result figures for Plotting, PlottingLB and the rigid/flexible
+# comparison. A figure is a table entry naming the result channels it shows;
+# figures are rendered with the Agg canvas (no windows, nothing to close) in a
+# process pool. Every output directory keeps reportIndex.json with a hash of
+# data and spec per figure, unchanged figures are not rendered again, so the
+# report of a sweep of result files only costs the new or changed results.
+
+from Models.Container import *
+import json
+from matplotlib.figure import Figure
+
+
+reportVersion       = 1
+reportIndexFile     = 'reportIndex.json'
+reportFigureSize    = (10, 5)
+
+reportLineStyles    = {'reference':         {'linestyle': '-',  'marker': 'x', 'color': 'black'},
+                       'comparison':        {'linestyle': '--', 'marker': 'o', 'color': 'red'},
+                       'comparisonSolid':   {'linestyle': '-',  'marker': 'x', 'color': 'red'},
+                       'difference':        {'linestyle': '-',  'marker': 'x', 'color': 'green'}}
+
+
+#figure spec; series = [[result, channel, scale, label, style], ...] with result the index of the result
+#(or [i, j] for the difference of two results) and {0}, {1} in labels replaced by the case names;
+#mat = [file name, variable name]: time and plotted values are also stored as .mat file
+def ReportFigure(name, ylabel, ylim, series, mat=None):
+    return {'name': name, 'ylabel': ylabel, 'ylim': ylim, 'series': series, 'mat': mat}
+
+
+#single result figures of Plotting (channel names of Results.py, U/U1/U2: control signals)
+reportFiguresPatu = [
+    ReportFigure('inputU1',  'Control signal, V',    (-12, 12),          [[0, 'U1',  1,    None, 'reference']]),
+    ReportFigure('inputU2',  'Control signal, V',    (-12, 12),          [[0, 'U2',  1,    None, 'reference']]),
+    ReportFigure('s1',       's, mm',                (800, 1200),        [[0, 's1',  1000, None, 'reference']]),
+    ReportFigure('s2',       's, mm',                (950, 1400),        [[0, 's2',  1000, None, 'reference']]),
+    ReportFigure('dots1',    'v, m/s',               (-0.125, 0.125),    [[0, 'ds1', 1,    None, 'reference']]),
+    ReportFigure('dots2',    'v, m/s',               (-0.15, 0.15),      [[0, 'ds2', 1,    None, 'reference']]),
+    ReportFigure('p1',       'p1, Pa',               (1e5, 250e5),       [[0, 'p1',  1,    None, 'reference']]),
+    ReportFigure('p2',       'p2, Pa',               (1e5, 150e5),       [[0, 'p2',  1,    None, 'reference']]),
+    ReportFigure('p3',       'p3, Pa',               (-25e5, 150e5),     [[0, 'p3',  1,    None, 'reference']]),
+    ReportFigure('p4',       'p4, Pa',               (0e5, 100e5),       [[0, 'p4',  1,    None, 'reference']]),
+    ]
+
+reportFiguresPatuFlexible = [
+    ReportFigure('deltaEps1', r'$\epsilon_1$, $\mu$m', (-250, 450),      [[0, 'strain1', 1e6,  None, 'reference']]),
+    ReportFigure('deltaEps2', r'$\epsilon_2$, $\mu$m', (-30, 30),        [[0, 'strain2', 1e6,  None, 'reference']]),
+    ReportFigure('deltaSig1', r'$\sigma_1$, MPa',      (-60, 100),       [[0, 'stress1', 1e-6, None, 'reference']]),
+    ReportFigure('deltaSig2', r'$\sigma_2$, MPa',      (-5, 7),          [[0, 'stress2', 1e-6, None, 'reference']]),
+    ]
+
+reportFiguresLiftBoom = [
+    ReportFigure('inputU1',  'Control signal, V',    (-12, 12),          [[0, 'U',   1,    None, 'reference']]),
+    ReportFigure('s1',       's, mm',                (L_Cyl1*1000, 1200),[[0, 's',   1000, None, 'reference']]),
+    ReportFigure('dots1',    'v, m/s',               (-0.12, 0.12),      [[0, 'ds',  1,    None, 'reference']]),
+    ReportFigure('p1',       'p1, Pa',               (0e5, 100e5),       [[0, 'p1',  1,    None, 'reference']]),
+    ReportFigure('p2',       'p2, Pa',               (0e5, 100e5),       [[0, 'p2',  1,    None, 'reference']]),
+    ]
+
+reportFiguresLiftBoomFlexible = [
+    ReportFigure('deltaEps', r'$\epsilon$, $\mu$m',  (-30, 20),          [[0, 'strain', 1e6,  None, 'reference']]),
+    ReportFigure('deltaSig', r'$\sigma$, MPa',       (-15, 20),          [[0, 'stress', 1e-6, None, 'reference']]),
+    ]
+
+
+#comparison of two lift boom results (PlottingLB: default and optimised lift boom)
+def ComparisonSeries(channel, scale, label, style='comparison'):
+    return [[0, channel, scale, label + ' {0}', 'reference'], [1, channel, scale, label + ' {1}', style]]
+
+reportFiguresComparison = [
+    ReportFigure('inputU1',  'Control signal, V',    (-12, 12),          [[0, 'U', 1, 'Control', 'reference']],
+                 ['Control_signal', 'u']),
+    ReportFigure('s1',       's, mm',                (930, 1200),        ComparisonSeries('s', 1000, 's1')),
+    ReportFigure('dots1',    'v, m/s',               (-0.12, 0.12),      ComparisonSeries('ds', 1, 'dots1')),
+    ReportFigure('p1',       'p1, Pa',               (-0.1e7, 1.6e7),    ComparisonSeries('p1', 1, 'p1')),
+    ReportFigure('p2',       'p2, Pa',               (-1e6, 1e7),        ComparisonSeries('p2', 1, 'p2')),
+    ReportFigure('F',        'F, N',                 (-4e4, 9e4),        ComparisonSeries('F', 1, 'F'), ['force', 'F']),
+    ReportFigure('E',        'E, J',                 (0, 6500),          ComparisonSeries('E', 1, 'E'), ['E', 'E']),
+    ]
+
+reportFiguresComparisonFlexible = [
+    ReportFigure('deltaEps', r'$\epsilon$, $\mu$m',  (-15, 25),          ComparisonSeries('strain', 1e6, 'deltaEps', 'comparisonSolid')),
+    ReportFigure('deltaSig', r'$\sigma$, MPa',       (-55, 120),         ComparisonSeries('stress', 1e-6, 'deltaSig', 'comparisonSolid')),
+    ReportFigure('deflection', 'Deflection, m',      (-0.015, 0.015),    ComparisonSeries('deflection', 1, 'tip deflection', 'comparisonSolid'),
+                 ['deflection', 'deflectionY']),
+    ReportFigure('angle',    'Angle, °',             (-5, 50),           ComparisonSeries('angle', 1, 'angle', 'comparisonSolid'),
+                 ['angle', 'AngVel']),
+    ReportFigure('angVelocity', 'Angular velocity, °/s', (-20, 15),      ComparisonSeries('angVelocity', 1, 'angular velocity', 'comparisonSolid'),
+                 ['angVelocity', 'angVelocity']),
+    ]
+
+#rigid and flexible optimised lift boom (PlottingLB_OptRigidFlexComparison)
+reportFiguresRigidFlexible = [
+    ReportFigure('inputU1',  'Control signal, V',    (-12, 12),          [[0, 'U', 1, 'Control', 'reference']],
+                 ['Control_signal', 'u']),
+    ReportFigure('s1',       's, mm',                (900, 1200),        ComparisonSeries('s', 1000, 's1')),
+    ReportFigure('dots1',    'v, m/s',               (-0.12, 0.12),      ComparisonSeries('ds', 1, 'dots1')),
+    ReportFigure('p1',       'p1, Pa',               (-0.1e7, 1.6e7),    ComparisonSeries('p1', 1, 'p1')),
+    ReportFigure('p2',       'p2, Pa',               (-1e6, 1e7),        ComparisonSeries('p2', 1, 'p2')),
+    ReportFigure('F',        'F, N',                 (-5.5e4, 1e5),      ComparisonSeries('F', 1, 'F'),
+                 ['ForceRxF_results', 'ForceRxF_results']),
+    ReportFigure('F_difference', 'F, N',             (-5.5e4, 1e5),
+                 [[[0, 1], 'F', 1, '{0} and {1} optimised lb difference', 'difference']]),
+    ReportFigure('E',        'E, J',                 (0, 6500),          ComparisonSeries('E', 1, 'E'), ['E_RxF', 'E']),
+    ReportFigure('angle',    'Angle, °',             (-5, 50),           ComparisonSeries('angle', 1, 'angle', 'comparisonSolid'),
+                 ['AngleRxF_results', 'AngleRxF_results']),
+    ]
+
+reportFiguresRigidFlexibleFlexible = [
+    ReportFigure('deltaSig', r'$\sigma$, MPa',       (-100, 100),        [[1, 'stress', 1e-6, 'deltaSig {1}', 'comparisonSolid']],
+                 ['optlbStress_results', 'optlbStress_results']),
+    ]
+
+
+#render jobs of figures for results (list of dicts of channels incl. 'time'), written to outputDir
+def ReportJobs(figures, results, outputDir, caseNames=[]):
+    time    = np.asarray(results[0]['time'], dtype=float)
+    jobs    = []
+    for figure in figures:
+        series = []
+        for [result, channel, scale, label, style] in figure['series']:
+            if isinstance(result, int):
+                values = scale*np.asarray(results[result][channel], dtype=float)
+            else:
+                values = scale*(np.asarray(results[result[0]][channel], dtype=float) -
+                                np.asarray(results[result[1]][channel], dtype=float))
+            series += [[values, None if label is None else label.format(*caseNames), style]]
+
+        mat = None if figure['mat'] is None else [os.path.join(outputDir, figure['mat'][0] + '.mat'), figure['mat'][1]]
+        jobs += [{'file': os.path.join(outputDir, figure['name'] + '.png'), 'time': time, 'xlim': (0, time[-1]),
+                  'ylabel': figure['ylabel'], 'ylim': figure['ylim'], 'series': series, 'mat': mat}]
+    return jobs
+
+
+def RenderFigureJob(job):
+    os.makedirs(os.path.dirname(job['file']) or '.', exist_ok=True)
+    fig     = Figure(figsize=reportFigureSize)
+    ax      = fig.subplots()
+    for [values, label, style] in job['series']:
+        ax.plot(job['time'], values, label=label, linewidth=1, markersize=2, **reportLineStyles[style])
+    ax.set_xlabel('Time, s')
+    ax.set_ylabel(job['ylabel'])
+    ax.grid(True)
+    ax.set_xlim(*job['xlim'])
+    ax.set_ylim(*job['ylim'])
+    if any(label is not None for values, label, style in job['series']):
+        ax.legend()
+    fig.savefig(job['file'])
+
+    if job['mat'] is not None:
+        scipy.io.savemat(job['mat'][0], {job['mat'][1]: np.column_stack([job['time']] +
+                                                                        [values for values, label, style in job['series']])})
+
+
+def ReadReportIndex(directory):
+    try:
+        with open(os.path.join(directory, reportIndexFile), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def WriteReportIndex(directory, index):
+    try:
+        os.makedirs(directory or '.', exist_ok=True)
+        indexFile   = os.path.join(directory, reportIndexFile)
+        tmpFile     = indexFile + '.%d.tmp' % os.getpid()
+        with open(tmpFile, 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmpFile, indexFile)
+    except OSError:
+        pass    # read-only output directory: figures are rendered again next time
+
+
+#render jobs whose data or spec changed since the last report in their directory, in nWorkers processes
+#(default: one per CPU); returns the list of rendered figure files
+def RenderFigures(jobs, nWorkers=None):
+    indices = {}
+    changed = []
+    for job in jobs:
+        directory = os.path.dirname(job['file'])
+        if directory not in indices:
+            indices[directory] = ReadReportIndex(directory)
+        key     = HashValues(reportVersion, job)
+        outputs = [job['file']] + ([job['mat'][0]] if job['mat'] is not None else [])
+        if indices[directory].get(os.path.basename(job['file'])) != key or not all(map(os.path.isfile, outputs)):
+            changed += [[job, key]]
+
+    if nWorkers is None:
+        nWorkers = os.cpu_count() or 1
+    nWorkers = min(nWorkers, len(changed))
+    if nWorkers <= 1:
+        for job, key in changed:
+            RenderFigureJob(job)
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            list(executor.map(RenderFigureJob, [job for job, key in changed],
+                              chunksize=max(1, len(changed)//(4*nWorkers))))
+
+    for job, key in changed:
+        indices[os.path.dirname(job['file'])][os.path.basename(job['file'])] = key
+    for directory, index in indices.items():
+        WriteReportIndex(directory, index)
+    return [job['file'] for job, key in changed]
@@ -0,0 +1,79 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #RESULT CACHE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Persistent cache of ComputeModel results (NNHydraulics(resultCache=True)).
+# Entries are keyed by a hash of the input vector, all model settings of the
+# run (variant, Flexible, nModes, payload, steps, initial pressures, valve
+# schedule, stress sensors, output profile, ...), the model source code and the
+# mesh files, so solver settings changed in ExudynModels.py or a new mesh
+# invalidate entries automatically. Entries are SimulationResults with their
+# provenance (date, host, exudyn version, key inputs) and are loaded
+# memory-mapped; the cache is bounded in size and evicts least recently used
+# entries, see FileCache in Cache.py.
+
+from Models.Container import *
+import functools, inspect, platform
+
+
+resultCacheDir          = 'solution/ResultCache'
+resultCacheMaxBytes     = 2*1024**3
+resultCacheVersion      = 1
+
+# model attributes which determine the result of a run
+resultCacheModelAttributes = ['nStepsTotal', 'endTime', 'Flexible', 'nModes', 'maxModeFrequency', 'mL',
+                              'p1Init', 'p2Init', 'p3Init', 'p4Init', 'ValveSchedule', 'strokeCheckSteps',
+                              'EquilibriumCache', 'StressSensors', 'SensorPostProcessingModes']
+
+resultCache             = FileCache(resultCacheDir, resultCacheMaxBytes)
+
+
+def ResultCacheKey(self, inputData, system, OptimisedLB, outputProfile):
+    options = OutputProfileOptions(self.OutputProfile, outputProfile)
+    return HashValues(resultCacheVersion, exu.__version__, ModelSourceKey(),
+                      np.asarray(inputData, dtype=float), bool(system), bool(OptimisedLB) and not system,
+                      {name: getattr(self, name) for name in resultCacheModelAttributes},
+                      [options['channels'], int(options['decimation'])])
+
+
+def ResultProvenance(result, key):
+    metadata = result.metadata
+    return {'key': key, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'host': platform.node(),
+            'python': platform.python_version(), 'exudynVersion': exu.__version__, 'sourceKey': ModelSourceKey(),
+            **{name: metadata.get(name) for name in ['variant', 'Flexible', 'nModes', 'mL', 'nStepsTotal', 'endTime']},
+            'computeTime': metadata.get('profile', {}).get('totalTime')}
+
+
+#decorator for NNHydraulics.ComputeModel: with self.ResultCache, results of identical runs are taken from the
+#result cache (result.metadata['resultCache'] tells if it was a hit); runs with solutionViewer are always simulated;
+#after a hit, self.profile is that of the cached run and accessors of the system state raise, see CheckSimulatedRun
+def CachedRun(ComputeModel):
+    signature = inspect.signature(ComputeModel)
+
+    @functools.wraps(ComputeModel)
+    def CachedComputeModel(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = arguments.arguments
+        self.cachedResultKey = None
+        if not getattr(self, 'ResultCache', False) or arguments['solutionViewer']:
+            return ComputeModel(self, *args, **kwargs)
+
+        key     = ResultCacheKey(self, arguments['inputData'], arguments['system'], arguments['OptimisedLB'],
+                                 arguments['outputProfile'])
+        path    = resultCache.Lookup(key)
+        if path is not None:
+            result = LoadSimulationResult(os.path.join(path, 'result'))
+            result.metadata['resultCache'] = {'key': key, 'hit': True}
+            self.cachedResultKey    = key
+            self.profile            = result.metadata.get('profile')
+            if arguments['verboseMode']:
+                print('result loaded from cache:', key)
+            return result
+
+        result = ComputeModel(self, *args, **kwargs)
+        result.metadata['provenance'] = ResultProvenance(result, key)
+        resultCache.Store(key, lambda entryPath: result.Save(os.path.join(entryPath, 'result')),
+                          info=result.metadata['provenance'])
+        result.metadata['resultCache'] = {'key': key, 'hit': False}
+        return result
+    return CachedComputeModel
@@ -0,0 +1,126 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #RESULTS
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Simulation results with named float64 channels, time axis and metadata
+# (model variant, mL, nModes, solver settings). Results are stored as array
+# store (one .npy file per channel, JSON manifest, no pickle) and loaded
+# memory-mapped, so tools only read the channels they use. For existing code a
+# result still behaves like the former [inputData, outputData] list.
+
+from Models.Container import *
+
+
+resultExtension         = '.result'
+
+# output channels in the order of the former flat outputData, each of length nStepsTotal
+outputChannelsLiftBoom  = ['s', 'ds', 'p1', 'p2', 'F', 'E', 'strain', 'stress', 'angle', 'angVelocity', 'deflection']
+outputChannelsPatu      = ['s1', 's2', 'ds1', 'ds2', 'p1', 'p2', 'p3', 'p4', 'strain1', 'strain2', 'stress1', 'stress2']
+
+
+class SimulationResult():
+    # channels: dict name -> array over time; inputData: flat input vector of ComputeModel
+    def __init__(self, time, channels, channelNames, inputData, metadata={}, outputData=None):
+        self.time           = time
+        self.channels       = channels
+        self.channelNames   = channelNames
+        self.inputData      = inputData
+        self.metadata       = metadata
+        self.outputData     = outputData        # flat array the channels are views of, if available
+
+    def Channel(self, name):
+        return self.channels[name]
+
+    #flat outputData in the former layout (channel k at k*nStepsTotal)
+    def OutputData(self):
+        if self.outputData is None:
+            self.outputData = np.concatenate([self.channels[name] for name in self.channelNames])
+        return self.outputData
+
+    def ToList(self):
+        return [self.inputData, self.OutputData()]
+
+    #result[0], result[1] as for [inputData, outputData]; result['name'] gives a channel
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.channels[key]
+        return self.ToList()[key]
+
+    def __iter__(self):
+        return iter(self.ToList())
+
+    def __len__(self):
+        return 2
+
+    def Save(self, filePath):
+        SaveArrayStore(filePath + resultExtension,
+                       {'format': 'SimulationResult', 'time': np.asarray(self.time, dtype=float),
+                        'channelNames': list(self.channelNames),
+                        'channels': {name: np.asarray(self.channels[name], dtype=float) for name in self.channelNames},
+                        'inputData': np.asarray(self.inputData, dtype=float), 'metadata': self.metadata})
+
+
+#create result from flat input/output vectors; channels are views of outputData
+def ResultFromOutputData(time, inputData, outputData, channelNames, metadata={}):
+    n           = len(time)
+    outputData  = np.asarray(outputData, dtype=float)
+    channels    = {name: outputData[k*n:(k+1)*n] for k, name in enumerate(channelNames)}
+    return SimulationResult(time, channels, channelNames, np.asarray(inputData, dtype=float), metadata, outputData)
+
+
+#convert [inputData, outputData] of a former ComputeModel call (e.g. loaded from .npy) into a result
+def AsSimulationResult(data, time, system=False):
+    if isinstance(data, SimulationResult):
+        return data
+    return ResultFromOutputData(time, data[0], data[1], outputChannelsPatu if system else outputChannelsLiftBoom)
+
+
+#variant (system) and step count n of a legacy [inputData, outputData]: n is taken from the input vector (one arm:
+#3n inputs, Patu: 6n) or given as nStepsTotal; if the input length fits both variants, system must be given; the
+#outputs must be all channels of the variant with n steps each, other layouts raise ValueError
+def LegacyResultLayout(inputData, outputData, system=None, nStepsTotal=None):
+    layouts = []
+    for [patu, nInputs] in [[False, 3], [True, 6]]:
+        n = len(inputData)//nInputs if nStepsTotal is None else int(nStepsTotal)
+        if (system is None or bool(system) == patu) and n > 0 and len(inputData) == nInputs*n:
+            layouts += [[patu, n]]
+    if len(layouts) != 1:
+        raise ValueError('LegacyResultLayout: %d inputs fit %s variant, give system or nStepsTotal'
+                         % (len(inputData), 'more than one' if layouts else 'no'))
+
+    [patu, n]       = layouts[0]
+    channelNames    = outputChannelsPatu if patu else outputChannelsLiftBoom
+    if len(outputData) != len(channelNames)*n:
+        raise ValueError('LegacyResultLayout: %d outputs are not the %d channels of %s with %d steps'
+                         % (len(outputData), len(channelNames), 'PatuCrane' if patu else 'LiftBoom', n))
+    return [patu, n]
+
+
+#load result from filePath+'.result' memory-mapped; a legacy pickled filePath+'.npy' is converted once
+#(its time axis is not stored, give endTime to reconstruct it; system or nStepsTotal if the layout is ambiguous),
+#the .result is only written for a validated layout, see LegacyResultLayout
+def LoadSimulationResult(filePath, mmapMode='r', endTime=np.nan, system=None, nStepsTotal=None):
+    storePath = filePath + resultExtension
+    if not IsArrayStore(storePath) and os.path.isfile(filePath + '.npy'):
+        [inputData, outputData] = np.load(filePath + '.npy', allow_pickle=True)
+        [system, n] = LegacyResultLayout(inputData, outputData, system, nStepsTotal)
+        channelNames= outputChannelsPatu if system else outputChannelsLiftBoom
+        ResultFromOutputData(np.arange(1, n+1)/n*endTime, inputData, outputData, channelNames,
+                             {'convertedFrom': filePath + '.npy'}).Save(filePath)
+
+    data = LoadArrayStore(storePath, mmapMode)
+    return SimulationResult(data['time'], data['channels'], data['channelNames'], data['inputData'], data['metadata'])
+
+
+#check the legacy [inputData, outputData] .npy files in directory without converting them;
+#returns file name -> [system, n] or the error message
+def CheckLegacyResultFiles(directory='solution/OneArm', system=False):
+    report = {}
+    for fileName in sorted(f for f in os.listdir(directory) if f.endswith('.npy')):
+        try:
+            data = np.load(os.path.join(directory, fileName), allow_pickle=True)
+            if data.dtype != object or len(data) != 2:
+                raise ValueError('no [inputData, outputData] file')
+            report[fileName] = LegacyResultLayout(data[0], data[1], system)
+        except ValueError as e:
+            report[fileName] = str(e)
+    return report
@@ -0,0 +1,137 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #SOLUTION FILE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# Solution recording mode: instead of the decimal text file coordinatesSolution.txt
+# the solver streams the coordinates into Exudyn's binary solution file
+# (binarySolutionFile), optionally as float32, only for selected column groups and
+# at the model's solution write period or every stride-th of it. Rows of the binary file have a fixed size, so the
+# file is opened as a NumPy memory map: playback (SolutionViewer) and
+# post-processing read only the rows and columns they use, also of a file which
+# is still being written or of an interrupted run.
+
+from Models.Container import *
+
+
+solutionFileText        = 'coordinatesSolution.txt'     # Exudyn default, written if solutionRecording is None
+
+# column groups of a solution row in file order (after the time), as columnsExported of LoadSolutionFile;
+# ODE2 and ODE1 coordinates are always written, the others can be selected by their export flag
+solutionColumnGroups    = ['ODE2', 'ODE2_t', 'ODE2_tt', 'ODE1', 'ODE1_t', 'AE', 'Data']
+solutionExportFlags     = {'ODE2_t': 'exportVelocities', 'ODE2_tt': 'exportAccelerations', 'ODE1_t': 'exportODE1Velocities',
+                           'AE': 'exportAlgebraicCoordinates', 'Data': 'exportDataCoordinates'}
+
+# NNHydraulics(solutionRecording=True) uses these, a dict overrides single entries
+solutionRecordingDefaults = {'fileName':    'coordinatesSolution.sol',
+                             'float32':     False,              # 4 instead of 8 bytes per value
+                             'columns':     solutionColumnGroups,
+                             'stride':      1}                  # write period: stride*solutionWritePeriod of the model
+
+
+#solution options of self.SolutionRecording (None: text file as before, True: defaults, dict: overrides)
+def SolutionRecordingOptions(recording):
+    if recording is None or recording is False:
+        return None
+    options = {**solutionRecordingDefaults, **(recording if isinstance(recording, dict) else {})}
+    unknown = set(options['columns']) - set(solutionColumnGroups)
+    if unknown:
+        raise ValueError('SolutionRecordingOptions: unknown column groups ' + str(sorted(unknown)))
+    return options
+
+
+#set solution file options of self.simulationSettings according to self.SolutionRecording
+def ConfigureSolutionFile(self):
+    options = SolutionRecordingOptions(self.SolutionRecording)
+    if options is None:
+        return
+
+    solutionSettings = self.simulationSettings.solutionSettings
+    solutionSettings.writeSolutionToFile            = True
+    solutionSettings.binarySolutionFile             = True
+    solutionSettings.coordinatesSolutionFileName    = options['fileName']
+    solutionSettings.solutionWritePeriod           *= options['stride']     # of the new simulationSettings of the model
+    for group, flag in solutionExportFlags.items():
+        setattr(solutionSettings, flag, group in options['columns'])
+    #real type of binary files: float32 if outputPrecision < 8 (this also sets the precision of console output)
+    self.simulationSettings.outputPrecision         = 6 if options['float32'] else 16
+
+
+#remove the binary solution file of the previous run before a new run writes it: the solver truncates an existing
+#file, which would invalidate solutions of the previous run still memory-mapped; an unlinked file stays readable
+def ReleaseSolutionFile(self):
+    options = SolutionRecordingOptions(self.SolutionRecording)
+    if options is None:
+        return
+    try:
+        os.remove(options['fileName'])
+    except OSError:
+        pass
+
+
+#read the header of a binary solution file; returns dict with the NumPy dtype of a row record and its file offset
+def ReadSolutionFileHeader(fileName):
+    with open(fileName, 'rb') as f:
+        if f.read(6) != b'EXUBIN':
+            raise ValueError('ReadSolutionFileHeader: ' + fileName + ' is no binary solution file')
+        sizes       = f.read(10)
+        byteOrder   = '>' if sizes[4] else '<'
+        intType     = np.dtype(byteOrder + 'i%d' % sizes[1])
+        realType    = np.dtype(byteOrder + 'f%d' % sizes[2])
+
+        def ReadIndex():
+            return int(np.frombuffer(f.read(intType.itemsize), intType)[0])
+        def ReadString():
+            return f.read(ReadIndex()).decode()
+        def ReadArray():
+            n = ReadIndex()
+            return [int(i) for i in np.frombuffer(f.read(n*intType.itemsize), intType)]
+
+        header = {'version': ReadString(), 'mode': ReadString(), 'solver': ReadString(), 'date': ReadString(),
+                  'systemSizes': ReadArray(), 'columnsExported': ReadArray(), 'totalCoordinates': ReadIndex(),
+                  'numberOfSteps': ReadIndex(), 'solutionInformation': ReadString()}
+        if ReadString() != 'EndOfHeader':
+            raise ValueError('ReadSolutionFileHeader: EndOfHeader not found in ' + fileName)
+        header['offset']    = f.tell()
+
+    header['nColumns']  = sum(header['columnsExported'])
+    header['rowType']   = np.dtype([('size', intType), ('row', realType, (header['nColumns'] + 1,))])
+    return header
+
+
+#load a solution file as LoadSolutionFile does, but binary files memory-mapped: 'data' is a read-only view
+#of the file (nRows x 1+nColumns, float32 or float64); 'columns' gives the slice of each column group in a row;
+#rows of a file which is still written or was not finished are read up to the last complete row; repeatedRows:
+#the file has rows of steps which were integrated again (see SolveModelStepwise), only the last row of a time is kept
+def LoadSolutionFileMapped(fileName, repeatedRows=False):
+    with open(fileName, 'rb') as f:
+        binary = f.read(6) == b'EXUBIN'
+    if not binary:
+        solution = LoadSolutionFile(fileName, verbose=False)
+    else:
+        header      = ReadSolutionFileHeader(fileName)
+        rowType     = header['rowType']
+        nRecords    = (os.path.getsize(fileName) - header['offset'])//rowType.itemsize
+        if nRecords > 0:
+            records = np.memmap(fileName, dtype=rowType, mode='r', offset=header['offset'], shape=(nRecords,))
+        else:
+            records = np.zeros(0, dtype=rowType)
+        invalid     = np.flatnonzero(records['size'] != header['nColumns'] + 1)     # footer starts with -1
+        nRows       = int(invalid[0]) if len(invalid) else nRecords
+        solution    = {'data': records['row'][:nRows], 'columnsExported': header['columnsExported'],
+                       'nColumns': header['nColumns'], 'nRows': nRows, 'header': header}
+
+    if repeatedRows and len(solution['data']):
+        times               = np.asarray(solution['data'][:, 0])
+        later               = np.minimum.accumulate(times[::-1])[::-1]
+        solution['data']    = solution['data'][np.append(times[:-1] < later[1:], True)]
+        solution['nRows']   = len(solution['data'])
+
+    bounds = np.cumsum([1] + list(solution['columnsExported'])).tolist()
+    solution['columns'] = {group: slice(bounds[i], bounds[i+1]) for i, group in enumerate(solutionColumnGroups)}
+    return solution
+
+
+#time (nRows) and coordinates of a column group (nRows x n) of a solution loaded with LoadSolutionFileMapped;
+#rows: slice or index array, e.g. slice(None, None, 10) for playback of every 10th row
+def SolutionCoordinates(solution, group, rows=slice(None)):
+    data = solution['data'][rows]
+    return data[:, 0], data[:, solution['columns'][group]]
@@ -0,0 +1,11 @@
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+                            #MODELS PACKAGE
+#%%++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# The modules share one namespace through 'from Models.Container import *' and
+# use names of the modules imported before them in Container.py at import time
+# (decorators such as Profiled and CachedRun, the FileCache instances). Loading
+# Container first gives every entry point this order: 'import Models.Cache' or
+# a spawned worker process unpickling a function of Models.Benchmark gets the
+# same fully populated modules as a script starting with the star import.
+
+import Models.Container
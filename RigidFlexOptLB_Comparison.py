@@ -37,11 +37,8 @@ inputVec_flexible   = model_flexible.CreateInputVector( ns,  angleInit1,angleIni
 data1 = model_rigid.ComputeModel(inputVec_rigid,system=Patu,  solutionViewer = True, OptimisedLB = True) #solutionViewer: for visualization
 data2 = model_flexible.ComputeModel(inputVec_flexible,system=Patu,  solutionViewer = True, OptimisedLB = True) #solutionViewer: for visualization
     
-data_array1 = np.array(data1, dtype=object)
-data_array2 = np.array(data2, dtype=object)
-
-np.save(dataFile1, data_array1)
-np.save(dataFile2, data_array2)
+data1.Save(dataFile1)
+data2.Save(dataFile2)
     
-model_flexible.PlottingLB_OptRigidFlexComparison(data_array1,data_array2)   
+model_flexible.PlottingLB_OptRigidFlexComparison(data1,data2)   
          